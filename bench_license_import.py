@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Import-cost benchmark for the cached-license fast path.
+
+Runs check_license against a cached license whose signed token is verified
+locally, in fresh interpreters, and fails if it pulls in anything outside
+the standard library and cryptography or if the import cost exceeds the
+budget. The cache, machine fingerprint and key pair live in a temporary
+directory, so nothing is written next to license_client.py.
+
+Usage:
+    python bench_license_import.py [--runs N] [--budget-ms MS] [--importtime-budget-ms MS]
+"""
+import os
+import sys
+import json
+import time
+import base64
+import shutil
+import argparse
+import tempfile
+import subprocess
+import statistics
+from unittest import mock
+
+# Takes the cache file and the base64 public key as arguments
+FAST_PATH = (
+    "import sys, license_client\n"
+    "cache_file, public_key = sys.argv[1:]\n"
+    "license_client.get_cache_file_path = lambda: cache_file\n"
+    "def contacted_server(*args):\n"
+    "    raise AssertionError('the cached-license path contacted the server')\n"
+    "license_client.validate_license_with_server = contacted_server\n"
+    "assert license_client.check_license('http://127.0.0.1:9/unreachable', public_key=public_key)\n"
+)
+
+# Modules of this repo that the fast path may load
+LOCAL_MODULES = {'license_client', 'license_revocation', 'machine_fingerprint', 'license_metrics',
+                 'license_public_key'}
+# Verifying the token needs cryptography, which registers its OpenSSL and cffi bindings at top level
+ALLOWED_THIRD_PARTY = {'cryptography', '_openssl', '_cffi_backend'}
+
+def _run(code, extra_args=(), args=()):
+    here = os.path.dirname(os.path.abspath(__file__))
+    return subprocess.run([sys.executable, *extra_args, '-c', code, *args], cwd=here,
+                          capture_output=True, text=True, check=True)
+
+def make_signed_cache(cache_dir, license_key='BENCH-KEY'):
+    """Write a cached license with a fresh signed token into cache_dir; returns (cache file, public key)"""
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+    from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+    import license_client
+
+    private_key = Ed25519PrivateKey.generate()
+    public_key = base64.b64encode(private_key.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw))
+    cache_file = os.path.join(cache_dir, 'license_cache.json')
+    with mock.patch.object(license_client, 'get_cache_file_path', lambda: cache_file):
+        # Also saves the fingerprint, so the benchmark measures its warm path
+        machine_id = license_client.get_machine_id()
+        now = time.time()
+        payload = json.dumps({'license_key': license_key, 'machine_id': machine_id,
+                              'exp': now + 86400, 'refresh_after': now + 86400})
+        encoded = base64.urlsafe_b64encode(payload.encode('utf-8')).rstrip(b'=')
+        signature = base64.urlsafe_b64encode(private_key.sign(encoded)).rstrip(b'=')
+        token = (encoded + b'.' + signature).decode('ascii')
+        license_client.save_license_cache(license_key, machine_id, 'http://127.0.0.1:9/unreachable',
+                                          {'status': 'valid', 'token': token})
+    return cache_file, public_key.decode('ascii')
+
+def loaded_third_party_modules(fast_path_args):
+    """Top-level non-stdlib modules the fast path loads, beyond what site already loaded"""
+    baseline = set(json.loads(_run("import sys, json; print(json.dumps(list(sys.modules)))").stdout))
+    # check_license prints its outcome first, the module list is the last line
+    loaded = json.loads(_run(FAST_PATH + "import json; print(json.dumps(list(sys.modules)))",
+                             args=fast_path_args).stdout.splitlines()[-1])
+    new = {name.split('.')[0] for name in loaded if name not in baseline}
+    return sorted(new - set(sys.stdlib_module_names) - LOCAL_MODULES - ALLOWED_THIRD_PARTY)
+
+def importtime_ms():
+    """Cumulative import time of license_client as reported by -X importtime"""
+    stderr = _run("import license_client", ('-X', 'importtime')).stderr
+    for line in stderr.splitlines():
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) == 3 and parts[2] == 'license_client':
+            return int(parts[1]) / 1000
+    raise RuntimeError("license_client not found in -X importtime output")
+
+def wall_clock_ms(code, runs, args=()):
+    """Median wall-clock time of a fresh interpreter running code"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        _run(code, args=args)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the license fast-path import cost")
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--budget-ms', type=float, default=60.0,
+                        help="Maximum median wall-clock cost of the fast path over a bare interpreter")
+    parser.add_argument('--importtime-budget-ms', type=float, default=40.0,
+                        help="Maximum cumulative -X importtime cost of license_client")
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp(prefix="license-bench-")
+    try:
+        return _benchmark(args, make_signed_cache(cache_dir))
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+def _benchmark(args, fast_path_args):
+    ok = True
+    third_party = loaded_third_party_modules(fast_path_args)
+    if third_party:
+        print(f"❌ Fast path imports non-stdlib modules: {', '.join(third_party)}")
+        ok = False
+    else:
+        print("✅ Fast path imports only the standard library and cryptography")
+
+    # Best of a few runs, the first one may include writing .pyc files
+    cumulative = min(importtime_ms() for _ in range(3))
+    status = "✅" if cumulative <= args.importtime_budget_ms else "❌"
+    print(f"{status} -X importtime license_client: {cumulative:.1f} ms (budget {args.importtime_budget_ms:.1f} ms)")
+    ok = ok and cumulative <= args.importtime_budget_ms
+
+    bare = wall_clock_ms("pass", args.runs)
+    fast_path = wall_clock_ms(FAST_PATH, args.runs, fast_path_args)
+    overhead = fast_path - bare
+    status = "✅" if overhead <= args.budget_ms else "❌"
+    print(f"{status} Fast path wall clock: {fast_path:.1f} ms vs bare interpreter {bare:.1f} ms "
+          f"(+{overhead:.1f} ms, budget {args.budget_ms:.1f} ms)")
+    ok = ok and overhead <= args.budget_ms
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
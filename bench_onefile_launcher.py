@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Launch-time benchmark for the cached one-file launcher.
+
+Builds a synthetic payload shaped like the onedir bundle (a few large
+shared libraries, many small modules), appends it to a stand-in executable
+the way build_app.py --cached-onefile does, and times in fresh interpreters:
+
+    plain onefile   unpack everything into a new temp dir and delete it
+                    afterwards, as PyInstaller's --onefile does on every launch
+    cached cold     first launch of a build: extract once into the runtime dir
+    cached warm     later launches: take the in-use lock and verify the copy
+
+Each launch runs in a new interpreter; an interpreter that only imports the
+launcher is timed as the baseline.
+
+Usage:
+    python bench_onefile_launcher.py [--size-mb MB] [--files N] [--runs N]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import struct
+import zipfile
+import argparse
+import tempfile
+import subprocess
+import statistics
+
+import onefile_launcher
+from user_cache import sha256_file
+
+LAUNCH = (
+    "import sys, shutil, tempfile, onefile_launcher as launcher\n"
+    "exe, mode = sys.argv[1:]\n"
+    "if mode == 'plain':\n"
+    "    offset, size, _ = launcher.read_trailer(exe)\n"
+    "    temp_dir = tempfile.mkdtemp(prefix='_MEI')\n"
+    "    launcher.extract(exe, offset, size, temp_dir)\n"
+    "    shutil.rmtree(temp_dir)\n"
+    "elif mode == 'cached':\n"
+    "    in_use = launcher.ensure_extracted(exe)[2]\n"
+    "    in_use and in_use.release()\n"
+)
+
+def make_payload_exe(work_dir, size_mb, num_files):
+    """Write a stand-in launcher with an appended payload; returns its path"""
+    # Roughly a torch bundle: 10% of the files hold 90% of the bytes
+    large = max(1, num_files // 10)
+    large_size = int(size_mb * 1e6 * 0.9) // large
+    small_size = int(size_mb * 1e6 * 0.1) // max(1, num_files - large)
+    zip_path = os.path.join(work_dir, 'payload.zip')
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=6) as zip_ref:
+        for i in range(num_files):
+            size = large_size if i < large else small_size
+            name = f"KeszAudio/_internal/lib{i}.so" if i < large else f"KeszAudio/_internal/pkg{i % 50}/mod{i}.pyc"
+            # Half random, half zeros: binaries compress about 2:1
+            zip_ref.writestr(name, os.urandom(size // 2) + bytes(size - size // 2))
+        zip_ref.comment = json.dumps({'entry': 'KeszAudio/KeszAudio'}).encode('utf-8')
+
+    build_hash = sha256_file(zip_path)[:32]
+    exe_path = os.path.join(work_dir, 'KeszAudio-cached')
+    with open(exe_path, 'wb') as out, open(zip_path, 'rb') as payload:
+        out.write(os.urandom(8 * 1024 * 1024))  # The frozen launcher itself
+        shutil.copyfileobj(payload, out, 1024 * 1024)
+        out.write(struct.pack(onefile_launcher.TRAILER_FORMAT, onefile_launcher.TRAILER_MAGIC,
+                              os.path.getsize(zip_path), build_hash.encode('ascii')))
+    os.remove(zip_path)
+    return exe_path
+
+def launch_seconds(exe_path, mode, env):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', LAUNCH, exe_path, mode], env=env, check=True,
+                   cwd=os.path.dirname(os.path.abspath(__file__)))
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cached one-file launches against plain one-file")
+    parser.add_argument('--size-mb', type=float, default=300, help="Uncompressed payload size")
+    parser.add_argument('--files', type=int, default=3000, help="Number of files in the payload")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--output', help="Write the results as JSON")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="keszaudio_launch_bench_")
+    try:
+        exe_path = make_payload_exe(work_dir, args.size_mb, args.files)
+        env = dict(os.environ, KESZAUDIO_RUNTIME_DIR=os.path.join(work_dir, 'runtime'))
+        plain = [launch_seconds(exe_path, 'plain', env) for _ in range(args.runs)]
+        cold = launch_seconds(exe_path, 'cached', env)
+        warm = [launch_seconds(exe_path, 'cached', env) for _ in range(args.runs)]
+        # Interpreter start and import alone, to show what unpacking adds on top
+        baseline = [launch_seconds(exe_path, 'none', env) for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {
+        'payload_mb': args.size_mb,
+        'files': args.files,
+        'interpreter_s': statistics.median(baseline),
+        'plain_onefile_s': statistics.median(plain),
+        'cached_cold_s': cold,
+        'cached_warm_s': statistics.median(warm),
+    }
+    print(f"\n⏱️  Launch of a {args.size_mb:.0f} MB, {args.files}-file payload (median of {args.runs}):")
+    print(f"  interpreter only             {results['interpreter_s']:7.3f}s")
+    print(f"  plain onefile (every launch) {results['plain_onefile_s']:7.3f}s")
+    print(f"  cached, first launch         {results['cached_cold_s']:7.3f}s")
+    print(f"  cached, later launches       {results['cached_warm_s']:7.3f}s  "
+          f"({results['plain_onefile_s'] / results['cached_warm_s']:.0f}x faster than plain)")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved benchmark to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,173 +4,350 @@ import sys
 import subprocess
 import shutil
 import tempfile
-import site
 import importlib
 from pathlib import Path
 import glob
 import platform
 import datetime
 import urllib.request
+import urllib.error
 import zipfile
 import tarfile
+import hashlib
+import json
+import time
+import contextlib
+import functools
+import threading
+import concurrent.futures
 from PyInstaller.utils.win32.versioninfo import VSVersionInfo, FixedFileInfo, StringFileInfo, StringTable, StringStruct, VarFileInfo, VarStruct
+from user_cache import user_cache_dir, sha256_file
 
-def download_ffmpeg():
-    """Download FFmpeg for the current platform and return the path to the executable."""
-    print("Downloading FFmpeg for bundling with the application...")
-    temp_dir = tempfile.mkdtemp(prefix="ffmpeg_temp_")
-    ffmpeg_dir = os.path.join(temp_dir, "ffmpeg")
-    os.makedirs(ffmpeg_dir, exist_ok=True)
-    
+_build_stages = []  # Stages of the current build, in order
+
+@contextlib.contextmanager
+def _stage(name):
+    """Time a build stage; set stage['status'] to 'hit' when cached output is reused."""
+    stage = {'name': name, 'status': 'run'}
+    start = time.perf_counter()
+    try:
+        yield stage
+    finally:
+        stage['seconds'] = time.perf_counter() - start
+        _build_stages.append(stage)
+
+def _fingerprint(*parts):
+    """Hash JSON-serializable build inputs into a cache key."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def _files_digest(paths):
+    """Hash the names and contents of files; missing files are skipped."""
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        if not os.path.isfile(path):
+            continue
+        digest.update(os.path.basename(path).encode('utf-8') + b'\0')
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+def _installed_packages():
+    """Name==version of every installed distribution."""
+    from importlib import metadata
+    return sorted(f"{dist.metadata['Name']}=={dist.version}" for dist in metadata.distributions())
+
+def _source_files():
+    """Project files that end up in the bundle."""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    return glob.glob(os.path.join(current_dir, '*.py')) + glob.glob(os.path.join(current_dir, '*.json'))
+
+def load_build_manifest(build_dir):
+    try:
+        with open(os.path.join(build_dir, 'build_manifest.json'), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_build_manifest(build_dir, manifest):
+    os.makedirs(build_dir, exist_ok=True)
+    with open(os.path.join(build_dir, 'build_manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+def print_build_report(total, clean_build_seconds=None):
+    """Print per-stage cache status and timings for the current build."""
+    print("\n📊 Build stages:")
+    for stage in _build_stages:
+        print(f"  {stage['name']:<20} {stage['status']:<5} {stage['seconds']:8.2f}s "
+              f"{100 * stage['seconds'] / max(total, 0.001):5.1f}%")
+        for detail, seconds in sorted(stage.get('details', {}).items(), key=lambda item: -item[1]):
+            print(f"    {detail:<32} {seconds:8.2f}s")
+    hits = sum(1 for stage in _build_stages if stage['status'] == 'hit')
+    # ffmpeg overlaps the package stages, so the stages can add up to more than the total
+    line = f"  Total {total:.2f}s (stages {sum(stage['seconds'] for stage in _build_stages):.2f}s), " \
+           f"{hits}/{len(_build_stages)} stages reused"
+    if clean_build_seconds:
+        line += f" (last clean build {clean_build_seconds:.2f}s, {clean_build_seconds / max(total, 0.001):.1f}x faster)"
+    print(line)
+
+FFMPEG_BINARIES = ('ffmpeg', 'ffprobe')
+
+def _default_cache_dir():
+    """Per-user artifact cache, shared between builds and checkouts."""
+    return os.environ.get('KESZAUDIO_CACHE_DIR') or user_cache_dir()
+
+def ffmpeg_download_url():
+    """Return the static FFmpeg archive URL for this platform, or None."""
     system = platform.system().lower()
-    is_64bit = sys.maxsize > 2**32
-    
     if system == 'windows':
-        # Download Windows static build
-        url = "https://github.com/BtbN/FFmpeg-Builds/releases/download/latest/ffmpeg-master-latest-win64-gpl.zip"
-        zip_path = os.path.join(temp_dir, "ffmpeg.zip")
-        
-        print(f"Downloading FFmpeg from {url}")
-        urllib.request.urlretrieve(url, zip_path)
-        
-        # Extract
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(temp_dir)
-        
-        # Find the extracted folder (it might have a version name)
-        extracted_dirs = [d for d in os.listdir(temp_dir) if d.startswith('ffmpeg-') and os.path.isdir(os.path.join(temp_dir, d))]
-        if extracted_dirs:
-            extracted_dir = os.path.join(temp_dir, extracted_dirs[0])
-            
-            # Copy the bin directory to our ffmpeg directory
-            bin_dir = os.path.join(extracted_dir, 'bin')
-            if os.path.exists(bin_dir):
-                for file in os.listdir(bin_dir):
-                    file_path = os.path.join(bin_dir, file)
-                    if file.endswith('.exe') and os.path.isfile(file_path):
-                        shutil.copy2(file_path, ffmpeg_dir)
-                
-                print(f"FFmpeg executables copied to {ffmpeg_dir}")
-                return ffmpeg_dir
-    
-    elif system == 'darwin':  # macOS
-        if platform.machine() == 'arm64':  # Apple Silicon
-            url = "https://evermeet.cx/ffmpeg/getrelease/zip"
-        else:  # Intel
-            url = "https://evermeet.cx/ffmpeg/getrelease/zip"
-        
-        zip_path = os.path.join(temp_dir, "ffmpeg.zip")
-        
-        print(f"Downloading FFmpeg from {url}")
-        urllib.request.urlretrieve(url, zip_path)
-        
-        # Extract
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(ffmpeg_dir)
-        
-        print(f"FFmpeg executables copied to {ffmpeg_dir}")
-        return ffmpeg_dir
-    
-    elif system == 'linux':
-        # For Linux, we'll use static builds
-        if is_64bit:
-            url = "https://johnvansickle.com/ffmpeg/releases/ffmpeg-release-amd64-static.tar.xz"
-        else:
-            url = "https://johnvansickle.com/ffmpeg/releases/ffmpeg-release-i686-static.tar.xz"
-        
-        tar_path = os.path.join(temp_dir, "ffmpeg.tar.xz")
-        
-        print(f"Downloading FFmpeg from {url}")
-        urllib.request.urlretrieve(url, tar_path)
-        
-        # Extract
-        with tarfile.open(tar_path, 'r:xz') as tar_ref:
-            tar_ref.extractall(temp_dir)
-        
-        # Find the extracted folder (it might have a version name)
-        extracted_dirs = [d for d in os.listdir(temp_dir) if d.startswith('ffmpeg-') and os.path.isdir(os.path.join(temp_dir, d))]
-        if extracted_dirs:
-            extracted_dir = os.path.join(temp_dir, extracted_dirs[0])
-            
-            # Copy the executables to our ffmpeg directory
-            for file in ['ffmpeg', 'ffprobe']:
-                file_path = os.path.join(extracted_dir, file)
-                if os.path.isfile(file_path):
-                    shutil.copy2(file_path, ffmpeg_dir)
-                    # Make sure they're executable
-                    os.chmod(os.path.join(ffmpeg_dir, file), 0o755)
-            
-            print(f"FFmpeg executables copied to {ffmpeg_dir}")
-            return ffmpeg_dir
-    
-    print("Warning: Could not download FFmpeg for your platform. Audio conversion may not work.")
+        return "https://github.com/BtbN/FFmpeg-Builds/releases/download/latest/ffmpeg-master-latest-win64-gpl.zip"
+    if system == 'darwin':
+        # Same universal build for Apple Silicon and Intel
+        return "https://evermeet.cx/ffmpeg/getrelease/zip"
+    if system == 'linux':
+        if sys.maxsize > 2**32:
+            return "https://johnvansickle.com/ffmpeg/releases/ffmpeg-release-amd64-static.tar.xz"
+        return "https://johnvansickle.com/ffmpeg/releases/ffmpeg-release-i686-static.tar.xz"
     return None
 
-def find_package_paths():
-    """Find paths to required packages."""
-    package_paths = {}
-    
-    # Get site-packages directory
-    site_packages = site.getsitepackages()[0]
-    
-    # Find speechbrain path
-    try:
-        import speechbrain
-        package_paths['speechbrain'] = os.path.dirname(speechbrain.__file__)
-    except ImportError:
-        print("Warning: speechbrain not found")
-    
-    # Find pyannote.audio path for speaker diarization
-    try:
-        import pyannote.audio
-        package_paths['pyannote.audio'] = os.path.dirname(pyannote.audio.__file__)
-        print("Found pyannote.audio package")
-    except ImportError:
-        print("Warning: pyannote.audio not found")
-    
-    # Find pyannote.core path
-    try:
-        import pyannote.core
-        package_paths['pyannote.core'] = os.path.dirname(pyannote.core.__file__)
-        print("Found pyannote.core package")
-    except ImportError:
-        print("Warning: pyannote.core not found")
-    
-    # Find torch path for PyTorch models
-    try:
-        import torch
-        package_paths['torch'] = os.path.dirname(torch.__file__)
-        print("Found torch package")
-    except ImportError:
-        print("Warning: torch not found")
-    
-    # Find torchaudio path
+def _download_resumable(url, dest, attempts=5):
+    """Download url to dest, resuming from dest + '.part' after interruptions."""
+    part_path = dest + '.part'
+    for attempt in range(attempts):
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        request = urllib.request.Request(url, headers={'User-Agent': 'KeszAudio-build'})
+        if offset:
+            request.add_header('Range', f'bytes={offset}-')
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                if offset and response.status != 206:
+                    # Server ignored the range; start over
+                    offset = 0
+                if offset:
+                    print(f"Resuming download at {offset / 1e6:.1f} MB")
+                length = response.headers.get('Content-Length')
+                with open(part_path, 'ab' if offset else 'wb') as f:
+                    shutil.copyfileobj(response, f, 1024 * 1024)
+            # A dropped connection can end the body early without an error
+            if length is not None and os.path.getsize(part_path) < offset + int(length):
+                raise ConnectionError(f"received {os.path.getsize(part_path)} of {offset + int(length)} bytes")
+            os.replace(part_path, dest)
+            return True
+        except urllib.error.HTTPError as e:
+            if e.code == 416 and offset:
+                # Range past the end: the partial file is complete or stale
+                os.remove(part_path)
+                continue
+            print(f"Download failed: {e}")
+            return False
+        except OSError as e:
+            print(f"Download interrupted ({e}), retrying ({attempt + 1}/{attempts})...")
+            time.sleep(min(2 ** attempt, 10))
+    return False
+
+def _extract_binaries(archive_path, dest_dir):
+    """Stream only the FFmpeg executables out of a zip or tar archive."""
+    os.makedirs(dest_dir, exist_ok=True)
+    extracted = []
+
+    def wanted(member_name):
+        name = os.path.basename(member_name)
+        return os.path.splitext(name)[0] in FFMPEG_BINARIES and (name.endswith('.exe') or '.' not in name)
+
+    def write(src, name):
+        target = os.path.join(dest_dir, name)
+        with open(target + '.tmp', 'wb') as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.chmod(target + '.tmp', 0o755)
+        os.replace(target + '.tmp', target)
+        extracted.append(name)
+
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+            for info in zip_ref.infolist():
+                if not info.is_dir() and wanted(info.filename):
+                    with zip_ref.open(info) as src:
+                        write(src, os.path.basename(info.filename))
+    else:
+        # 'r|*' reads the archive as a stream, without seeking or a member index
+        with tarfile.open(archive_path, 'r|*') as tar_ref:
+            for member in tar_ref:
+                if member.isfile() and wanted(member.name):
+                    write(tar_ref.extractfile(member), os.path.basename(member.name))
+    return extracted
+
+def download_ffmpeg(cache_dir=None, mirror=None, url=None, sha256=None):
+    """Fetch FFmpeg for the current platform and return the directory holding the executables.
+
+    Archives and extracted executables are cached in cache_dir by URL, and
+    reused as long as the archive matches sha256 (when one is given).
+    `mirror` is a local archive file, or a directory holding the archive
+    under the URL's file name, used instead of the network for offline builds.
+    The FFMPEG_URL, FFMPEG_SHA256 and FFMPEG_MIRROR environment variables
+    provide defaults.
+    """
+    url = url or os.environ.get('FFMPEG_URL') or ffmpeg_download_url()
+    sha256 = (sha256 or os.environ.get('FFMPEG_SHA256') or '').lower() or None
+    mirror = mirror or os.environ.get('FFMPEG_MIRROR')
+    if not url:
+        print("Warning: Could not download FFmpeg for your platform. Audio conversion may not work.")
+        return None
+
+    entry_dir = os.path.join(cache_dir or _default_cache_dir(), 'ffmpeg',
+                             hashlib.sha256(url.encode('utf-8')).hexdigest()[:16])
+    archive_path = os.path.join(entry_dir, 'archive')
+    sha_path = os.path.join(entry_dir, 'archive.sha256')
+    bin_dir = os.path.join(entry_dir, 'bin')
+    os.makedirs(entry_dir, exist_ok=True)
+
     try:
-        import torchaudio
-        package_paths['torchaudio'] = os.path.dirname(torchaudio.__file__)
-        print("Found torchaudio package")
-    except ImportError:
-        print("Warning: torchaudio not found")
-    
-    # Find Azure Speech SDK path
+        with open(sha_path, 'r') as f:
+            cached_sha256 = f.read().strip()
+    except OSError:
+        cached_sha256 = None
+
+    if cached_sha256 and (sha256 is None or cached_sha256 == sha256) \
+            and os.path.isdir(bin_dir) and os.listdir(bin_dir):
+        print(f"Using cached FFmpeg from {bin_dir}")
+        return bin_dir
+
+    if not (cached_sha256 and os.path.exists(archive_path) and (sha256 is None or cached_sha256 == sha256)):
+        if mirror:
+            source = os.path.join(mirror, os.path.basename(url.rstrip('/'))) if os.path.isdir(mirror) else mirror
+            if not os.path.isfile(source):
+                print(f"Warning: FFmpeg archive not found in mirror: {source}")
+                return None
+            print(f"Copying FFmpeg archive from mirror {source}")
+            shutil.copyfile(source, archive_path + '.part')
+            os.replace(archive_path + '.part', archive_path)
+        else:
+            print(f"Downloading FFmpeg from {url}")
+            if not _download_resumable(url, archive_path):
+                print("Warning: Could not download FFmpeg. Audio conversion may not work.")
+                return None
+
+        actual_sha256 = sha256_file(archive_path)
+        if sha256 and actual_sha256 != sha256:
+            print(f"Warning: FFmpeg archive checksum mismatch (expected {sha256}, got {actual_sha256})")
+            os.remove(archive_path)
+            return None
+        with open(sha_path, 'w') as f:
+            f.write(actual_sha256)
+        shutil.rmtree(bin_dir, ignore_errors=True)
+
     try:
-        import azure.cognitiveservices.speech
-        package_paths['azure.cognitiveservices.speech'] = os.path.dirname(azure.cognitiveservices.speech.__file__)
-    except ImportError:
-        print("Warning: azure.cognitiveservices.speech not found")
-    
-    # Find lightning_fabric path
+        extracted = _extract_binaries(archive_path, bin_dir)
+    except (zipfile.BadZipFile, tarfile.TarError, OSError) as e:
+        print(f"Warning: Could not extract FFmpeg: {e}")
+        extracted = []
+    if not extracted:
+        # Drop the entry so the next build fetches the archive again
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        print("Warning: FFmpeg executables not found in the archive. Audio conversion may not work.")
+        return None
+
+    print(f"FFmpeg executables ({', '.join(sorted(extracted))}) cached in {bin_dir}")
+    return bin_dir
+
+# Packages whose directories the spec needs, with the message printed when found
+BUNDLED_PACKAGES = {
+    'speechbrain': None,
+    'pyannote.audio': "Found pyannote.audio package",
+    'pyannote.core': "Found pyannote.core package",
+    'torch': "Found torch package",
+    'torchaudio': "Found torchaudio package",
+    'azure.cognitiveservices.speech': None,
+    'lightning_fabric': None,
+}
+
+def _package_dir(spec):
+    if spec is None:
+        return None
+    if spec.origin and os.path.isfile(spec.origin):
+        return os.path.dirname(spec.origin)
+    locations = list(spec.submodule_search_locations or [])
+    return locations[0] if locations else None
+
+_packages_distributions_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=None)
+def _packages_distributions_cached():
+    from importlib import metadata
+    return metadata.packages_distributions()
+
+def _packages_distributions():
+    # Scanning every installed distribution is slow; do it once for all lookups
+    with _packages_distributions_lock:
+        return _packages_distributions_cached()
+
+def locate_package(name):
+    """Directory of an installed package, found without executing it.
+
+    The top-level package is looked up with importlib.util.find_spec, which
+    only imports parents of dotted names; submodules are then resolved with
+    PathFinder inside the parent's directories so no __init__ runs. If that
+    fails the distribution metadata is searched for the package's files.
+    """
+    import importlib.util
+    import importlib.machinery
+    parts = name.split('.')
     try:
-        import lightning_fabric
-        package_paths['lightning_fabric'] = os.path.dirname(lightning_fabric.__file__)
-    except ImportError:
-        print("Warning: lightning_fabric not found")
+        spec = importlib.util.find_spec(parts[0])
+        for i in range(1, len(parts)):
+            if spec is None or spec.submodule_search_locations is None:
+                spec = None
+                break
+            spec = importlib.machinery.PathFinder.find_spec('.'.join(parts[:i + 1]),
+                                                             list(spec.submodule_search_locations))
+    except (ImportError, ValueError):
+        spec = None
+    path = _package_dir(spec)
+    if path:
+        return path
+
+    from importlib import metadata
+    relative = os.path.join(*parts)
+    for dist_name in _packages_distributions().get(parts[0], []):
+        try:
+            files = metadata.distribution(dist_name).files or []
+        except metadata.PackageNotFoundError:
+            continue
+        for file in files:
+            if os.path.normpath(str(file)) == os.path.join(relative, '__init__.py'):
+                return os.path.dirname(str(file.locate()))
+    return None
+
+def find_package_paths(timings=None):
+    """Find paths to required packages without importing them.
+
+    The lookups run concurrently; timings, if given, receives the seconds
+    spent locating each package.
+    """
+    def lookup(name):
+        start = time.perf_counter()
+        path = locate_package(name)
+        return path, time.perf_counter() - start
+
+    package_paths = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(BUNDLED_PACKAGES)) as executor:
+        futures = {name: executor.submit(lookup, name) for name in BUNDLED_PACKAGES}
+        for name, future in futures.items():
+            path, seconds = future.result()
+            if timings is not None:
+                timings[name] = seconds
+            if path:
+                package_paths[name] = path
+                if BUNDLED_PACKAGES[name]:
+                    print(BUNDLED_PACKAGES[name])
+            else:
+                print(f"Warning: {name} not found")
     
     return package_paths
 
-def create_version_info():
+def create_version_info(temp_dir=None):
     """Create needed version files for libraries that might require them."""
-    temp_dir = tempfile.mkdtemp(prefix="build_temp_")
+    if temp_dir is None:
+        temp_dir = tempfile.mkdtemp(prefix="build_temp_")
     os.makedirs(os.path.join(temp_dir, "lightning_fabric"), exist_ok=True)
     
     # Create version_info.py for lightning_fabric
@@ -179,6 +356,34 @@ def create_version_info():
     
     return temp_dir
 
+def load_license_public_key(value):
+    """Base64 raw Ed25519 public key, given directly or as a file containing it."""
+    import base64
+    if os.path.isfile(value):
+        with open(value, 'r') as f:
+            value = f.read()
+    value = value.strip()
+    try:
+        raw = base64.b64decode(value, validate=True)
+    except ValueError:
+        raw = b''
+    if len(raw) != 32:
+        raise ValueError("Expected a base64-encoded 32-byte Ed25519 public key")
+    return value
+
+def create_license_key_module(temp_dir, public_key):
+    """Stamp the license token public key into the build as license_public_key.py."""
+    path = os.path.join(temp_dir, 'license_public_key.py')
+    if not public_key:
+        # An incremental staging directory may still hold the key of an earlier build
+        if os.path.exists(path):
+            os.remove(path)
+        return None
+    with open(path, 'w') as f:
+        f.write('# Generated by build_app.py; the key license tokens are verified against\n')
+        f.write(f'LICENSE_PUBLIC_KEY = {public_key!r}\n')
+    return path
+
 def create_speechbrain_utils_fix(temp_dir, package_paths):
     """Create a fixed version of speechbrain's importutils.py to avoid file system access."""
     if 'speechbrain' in package_paths and package_paths['speechbrain']:
@@ -214,8 +419,87 @@ def create_speechbrain_utils_fix(temp_dir, package_paths):
     else:
         print("Warning: SpeechBrain package not found, skipping patch")
 
-def generate_spec_file(temp_dir, package_paths, icon_path=None, ffmpeg_dir=None):
-    """Generate a PyInstaller spec file with all required configurations."""
+# Installed as dependencies but only bundled when the traced workload imports them
+PRUNE_EXCLUDE_CANDIDATES = [
+    'matplotlib', 'optuna', 'tensorboardX', 'pandas', 'sympy', 'alembic', 'sqlalchemy',
+    'IPython', 'tkinter', 'torch.utils.tensorboard', 'torch.testing', 'torch.onnx', 'torch._inductor',
+]
+
+def load_import_trace(trace_file):
+    try:
+        with open(trace_file, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read import trace {trace_file}: {e}")
+        return None
+
+def _pruned_spec_lists(trace):
+    """Turn an import trace into (hiddenimports, datas, binaries, excludes) for the spec."""
+    stdlib = set(sys.stdlib_module_names)
+    loaded = set(trace['modules'])
+    hiddenimports = sorted(name for name, path in trace['modules'].items()
+                           if path and name != '__main__' and name.split('.')[0] not in stdlib)
+
+    site_dirs = trace.get('site_dirs', [])
+
+    def destination(path):
+        # Keep the file at the same place relative to site-packages
+        for site_dir in site_dirs:
+            if os.path.normcase(path).startswith(site_dir + os.sep):
+                return os.path.dirname(os.path.relpath(path, site_dir)).replace('\\', '/') or '.'
+        return '.'
+
+    datas = [(path.replace('\\', '/'), destination(path)) for path in trace['data_files']]
+    binaries = [(path.replace('\\', '/'), destination(path)) for path in trace['libraries']]
+    excludes = [name for name in PRUNE_EXCLUDE_CANDIDATES
+                if not any(module == name or module.startswith(name + '.') for module in loaded)]
+    return hiddenimports, datas, binaries, excludes
+
+# The one-file EXE is built under its own target name, as both EXEs would
+# otherwise share the same intermediate PKG in the work dir; build_app then
+# moves it to ONEFILE_NAME, the name --onefile has always produced
+ONEFILE_TARGET = 'KeszAudio-onefile'
+ONEFILE_NAME = 'KeszAudio'
+
+# Spec settings per --profile; "default" keeps the original settings
+BUILD_PROFILES = {
+    'default': {'upx': True, 'upx_exclude_min_mb': None, 'strip': False, 'optimize': None, 'noarchive': False},
+    # Large native libraries load slower once UPX-packed, asserts are dropped from bytecode
+    'startup': {'upx': True, 'upx_exclude_min_mb': 5, 'strip': False, 'optimize': 1, 'noarchive': False},
+    'size': {'upx': True, 'upx_exclude_min_mb': None, 'strip': True, 'optimize': 1, 'noarchive': False},
+}
+
+NATIVE_LIBRARY_SUFFIXES = ('.dll', '.so', '.dylib', '.pyd')
+
+def _large_native_libraries(package_paths, min_mb):
+    """File names of shared libraries of at least min_mb in the bundled packages, for upx_exclude."""
+    names = set()
+    for path in package_paths.values():
+        if not path:
+            continue
+        # The Azure Speech SDK keeps its libraries next to the package directory
+        for root, _, files in os.walk(os.path.dirname(path) if path.endswith('speech') else path):
+            for name in files:
+                if name.endswith(NATIVE_LIBRARY_SUFFIXES) or '.so.' in name:
+                    try:
+                        if os.path.getsize(os.path.join(root, name)) >= min_mb * 1024 * 1024:
+                            names.add(name)
+                    except OSError:
+                        pass
+    return sorted(names)
+
+def generate_spec_file(temp_dir, package_paths, icon_path=None, ffmpeg_dir=None, trace=None,
+                       one_file=False, timings_file=None, profile='default', model_store_dir=None):
+    """Generate a PyInstaller spec file with all required configurations.
+
+    All targets (onedir, one-file, macOS bundle) share one Analysis, and the
+    time spent on each is written to timings_file as JSON. profile selects
+    the UPX, strip and bytecode settings from BUILD_PROFILES.
+
+    With an import trace (see trace_imports.py), the collect_all calls are
+    replaced by the modules, data files and libraries the workload loaded.
+    model_store_dir (see model_store.py) is bundled as models/.
+    """
     current_dir = os.path.dirname(os.path.abspath(__file__))
     main_script = os.path.join(current_dir, 'main.py')
     
@@ -245,6 +529,10 @@ def generate_spec_file(temp_dir, package_paths, icon_path=None, ffmpeg_dir=None)
     if ffmpeg_dir and os.path.exists(ffmpeg_dir):
         datas_list.append(f"('{ffmpeg_dir}', 'ffmpeg')")
     
+    # Add the pre-fetched model store for offline use
+    if model_store_dir and os.path.exists(model_store_dir):
+        datas_list.append(f"('{model_store_dir.replace(os.sep, '/')}', 'models')")
+
     # Add SpeechBrain patch
     if os.path.exists(os.path.join(temp_dir, "speechbrain")):
         datas_list.append(f"('{temp_dir}/speechbrain', 'speechbrain')")
@@ -312,6 +600,18 @@ def generate_spec_file(temp_dir, package_paths, icon_path=None, ffmpeg_dir=None)
     is_windows = sys.platform.startswith('win')
     is_macos = sys.platform == 'darwin'
     
+    # UPX, strip and bytecode settings of the build profile
+    build_profile = BUILD_PROFILES[profile]
+    upx = build_profile['upx']
+    upx_exclude = []
+    if upx and build_profile['upx_exclude_min_mb'] is not None:
+        upx_exclude = _large_native_libraries(package_paths, build_profile['upx_exclude_min_mb'])
+    strip = build_profile['strip'] and not is_windows
+    noarchive = build_profile['noarchive']
+    optimize_arg = ''
+    if build_profile['optimize'] is not None:
+        optimize_arg = f"\n    optimize={build_profile['optimize']},"
+
     # Set console mode based on platform (False for GUI apps)
     console_mode = True
     
@@ -356,6 +656,41 @@ VSVersionInfo(
 )
 '''
     
+    excludes = []
+    if trace:
+        traced_hiddenimports, traced_datas, traced_binaries, excludes = _pruned_spec_lists(trace)
+        collect_section = f'''# Pruned from an import trace of: {' '.join(trace.get('argv', []))}
+traced_hiddenimports.extend({traced_hiddenimports!r})
+traced_datas.extend({traced_datas!r})
+traced_binaries.extend({traced_binaries!r})'''
+    else:
+        collect_section = '''# Collect all for problematic modules
+for module_name in ['pytorch_lightning', 'lightning_fabric', 'torchaudio', 'speechbrain', 'azure.cognitiveservices.speech', 'pyannote.audio', 'pyannote.core', 'torch']:
+    try:
+        datas, binaries, hiddenimports = collect_all(module_name)
+        if module_name.startswith('torch'):
+            pytorch_datas.extend(datas)
+            pytorch_binaries.extend(binaries)
+            pytorch_hiddenimports.extend(hiddenimports)
+        elif module_name.startswith('speech'):
+            speechbrain_datas.extend(datas)
+            speechbrain_binaries.extend(binaries)
+            speechbrain_hiddenimports.extend(hiddenimports)
+        elif module_name.startswith('azure'):
+            azure_speech_datas.extend(datas)
+            azure_speech_binaries.extend(binaries)
+            azure_speech_hiddenimports.extend(hiddenimports)
+        elif module_name.startswith('pyannote'):
+            pyannote_datas.extend(datas)
+            pyannote_binaries.extend(binaries)
+            pyannote_hiddenimports.extend(hiddenimports)
+        else:
+            lightning_datas.extend(datas)
+            lightning_binaries.extend(binaries)
+            lightning_hiddenimports.extend(hiddenimports)
+    except Exception as e:
+        print(f"Warning: Could not collect all for {module_name}: {e}")'''
+
     # Create the spec file content
     spec_content = f'''# -*- mode: python ; coding: utf-8 -*-
 import sys
@@ -363,9 +698,21 @@ import os
 from PyInstaller.utils.hooks import collect_all, collect_submodules, copy_metadata
 import datetime
 from PyInstaller.utils.win32.versioninfo import VSVersionInfo, FixedFileInfo, StringFileInfo, StringTable, StringStruct, VarFileInfo, VarStruct
+import time
+import json
 
 block_cipher = None
 
+# Seconds spent on each target, read back by build_app.py
+_target_times = {{}}
+_mark = time.perf_counter()
+
+def _record(name):
+    global _mark
+    now = time.perf_counter()
+    _target_times[name] = now - _mark
+    _mark = now
+
 {version_info}
 
 # Collect all modules needed for complex dependencies
@@ -390,33 +737,11 @@ pyannote_datas = []
 pyannote_binaries = []
 pyannote_hiddenimports = []
 
-# Collect all for problematic modules
-for module_name in ['pytorch_lightning', 'lightning_fabric', 'torchaudio', 'speechbrain', 'azure.cognitiveservices.speech', 'pyannote.audio', 'pyannote.core', 'torch']:
-    try:
-        datas, binaries, hiddenimports = collect_all(module_name)
-        if module_name.startswith('torch'):
-            pytorch_datas.extend(datas)
-            pytorch_binaries.extend(binaries)
-            pytorch_hiddenimports.extend(hiddenimports)
-        elif module_name.startswith('speech'):
-            speechbrain_datas.extend(datas)
-            speechbrain_binaries.extend(binaries)
-            speechbrain_hiddenimports.extend(hiddenimports)
-        elif module_name.startswith('azure'):
-            azure_speech_datas.extend(datas)
-            azure_speech_binaries.extend(binaries)
-            azure_speech_hiddenimports.extend(hiddenimports)
-        elif module_name.startswith('pyannote'):
-            pyannote_datas.extend(datas)
-            pyannote_binaries.extend(binaries)
-            pyannote_hiddenimports.extend(hiddenimports)
-        else:
-            lightning_datas.extend(datas)
-            lightning_binaries.extend(binaries)
-            lightning_hiddenimports.extend(hiddenimports)
-    except Exception as e:
-        print(f"Warning: Could not collect all for {{module_name}}: {{e}}")
+traced_datas = []
+traced_binaries = []
+traced_hiddenimports = []
 
+{collect_section}
 # Additional imports for torch modules
 pytorch_hiddenimports.extend(['torch', 'torch.nn', 'torch.optim', 'torch.utils', 'torch.distributions'])
 lightning_hiddenimports.extend(['lightning_fabric', 'lightning_fabric.__version__'])
@@ -437,8 +762,8 @@ azure_speech_binaries.extend([{", ".join([str(item) for item in binaries_list])}
 
 a = Analysis(
     ['{main_script}'],
-    pathex=['{current_dir}'],
-    binaries=[*pytorch_binaries, *lightning_binaries, *speechbrain_binaries, *azure_speech_binaries, *pyannote_binaries],
+    pathex=['{temp_dir}', '{current_dir}'],
+    binaries=[*pytorch_binaries, *lightning_binaries, *speechbrain_binaries, *azure_speech_binaries, *pyannote_binaries, *traced_binaries],
     datas=[
         # Include all data files
         *pytorch_datas,
@@ -446,6 +771,7 @@ a = Analysis(
         *speechbrain_datas,
         *azure_speech_datas,
         *pyannote_datas,
+        *traced_datas,
         *hf_metadata,
         {", ".join([str(item) for item in datas_list])}
     ],
@@ -455,6 +781,7 @@ a = Analysis(
         *speechbrain_hiddenimports,
         *azure_speech_hiddenimports,
         *pyannote_hiddenimports,
+        *traced_hiddenimports,
         'numpy', 'librosa', 'soundfile', 'pyaudio', 'pydub', 'torch', 
         'wx', 'wx.adv', 'concurrent.futures', 'openai', 'requests', 
         'speechbrain', 'speechbrain.inference.interfaces', 'speechbrain.inference.classifiers',
@@ -472,19 +799,24 @@ a = Analysis(
         'json',
         'threading',
         'io',
-        'demjson3'
+        'demjson3',
+        'model_store',
+        'link_strategy',
+        'user_cache',
+        'license_public_key'
     ],
     hookspath=[],
     hooksconfig={{}},
-    runtime_hooks=['pyi_envfix.py'],
-    excludes=[],
+    runtime_hooks=['pyi_importprofile.py', 'pyi_envfix.py'],
+    excludes={excludes!r},
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
-    noarchive=False,
+    noarchive={noarchive},{optimize_arg}
 )
 
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
+_record('analysis')
 
 '''
 
@@ -501,8 +833,9 @@ exe = EXE(
     name='KeszAudio',
     debug=False,
     bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
+    strip={strip},
+    upx={upx},
+    upx_exclude={upx_exclude!r},
     console={console_mode},
     disable_windowed_traceback=False,
     argv_emulation=True,
@@ -511,17 +844,19 @@ exe = EXE(
     entitlements_file=None,
     {f"icon='{icon_path}'" if icon_path else ""}
 )
+_record('exe')
 
 coll = COLLECT(
     exe,
     a.binaries,
     a.zipfiles,
     a.datas,
-    strip=False,
-    upx=True,
-    upx_exclude=[],
+    strip={strip},
+    upx={upx},
+    upx_exclude={upx_exclude!r},
     name='KeszAudio'
 )
+_record('collect')
 
 # Create .app bundle structure
 app = BUNDLE(
@@ -543,6 +878,7 @@ app = BUNDLE(
         'LSMinimumSystemVersion': '10.14',
     }},
 )
+_record('bundle')
 '''
     elif is_windows:
         # For Windows, create a proper GUI .exe
@@ -556,14 +892,16 @@ exe = EXE(
     name='KeszAudio',
     debug=False,
     bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
+    strip={strip},
+    upx={upx},
+    upx_exclude={upx_exclude!r},
     console={console_mode},
     disable_windowed_traceback=False,
     target_arch=None,
     codesign_identity=None,
     entitlements_file=None,
 )
+_record('exe')
 
 # Create the directory structure with all dependencies
 coll = COLLECT(
@@ -571,11 +909,12 @@ coll = COLLECT(
     a.binaries,
     a.zipfiles,
     a.datas,
-    strip=False,
-    upx=True,
-    upx_exclude=[],
+    strip={strip},
+    upx={upx},
+    upx_exclude={upx_exclude!r},
     name='KeszAudio',
 )
+_record('collect')
 '''
     else:
         # For Linux and other platforms, use standard output format
@@ -589,8 +928,9 @@ exe = EXE(
     name='KeszAudio',
     debug=False,
     bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
+    strip={strip},
+    upx={upx},
+    upx_exclude={upx_exclude!r},
     console={console_mode},
     disable_windowed_traceback=False,
     target_arch=None,
@@ -598,6 +938,7 @@ exe = EXE(
     entitlements_file=None,
     {f"icon='{icon_path}'" if icon_path else ""}
 )
+_record('exe')
 
 # Create the collection
 coll = COLLECT(
@@ -605,13 +946,47 @@ coll = COLLECT(
     a.binaries,
     a.zipfiles,
     a.datas,
-    strip=False,
-    upx=True,
-    upx_exclude=[],
+    strip={strip},
+    upx={upx},
+    upx_exclude={upx_exclude!r},
     name='KeszAudio',
 )
+_record('collect')
 '''
     
+    if one_file and not is_macos:  # One-file not ideal for macOS
+        spec_content += f'''
+# Create the one-file executable from the same analysis
+exe_onefile = EXE(
+    pyz,
+    a.scripts,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    [],
+    name='{ONEFILE_TARGET}',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip={strip},
+    upx={upx},
+    upx_exclude={upx_exclude!r},
+    runtime_tmpdir=None,
+    console={console_mode},
+    disable_windowed_traceback=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    {f"icon='{icon_path}'" if icon_path else ""}
+)
+_record('onefile')
+'''
+
+    if timings_file:
+        spec_content += f'''
+with open(r'{timings_file}', 'w') as f:
+    json.dump(_target_times, f)
+'''
+
     # Write the spec file
     spec_file = os.path.join(temp_dir, 'app.spec')
     with open(spec_file, 'w') as f:
@@ -636,23 +1011,128 @@ def check_pyinstaller():
             print("Failed to install PyInstaller. Please install manually: pip install pyinstaller")
             return False
 
-def build_app(one_file=False):
-    """Build the application using PyInstaller."""
+def print_target_timings(timings_file):
+    """Print the time PyInstaller spent on each target of the shared analysis."""
+    try:
+        with open(timings_file, 'r') as f:
+            timings = json.load(f)
+    except (OSError, ValueError):
+        return
+    print("\n🎯 PyInstaller targets:")
+    for target, seconds in timings.items():
+        print(f"  {target:<20} {seconds:8.2f}s")
+
+def build_app(one_file=False, incremental=False, ffmpeg_mirror=None, trace_file=None, cached_onefile=False,
+              profile='default', prefetch_models=False, license_public_key=None):
+    """Build the application using PyInstaller.
+
+    With incremental=True the staging files, FFmpeg and PyInstaller's work
+    directory are kept in ./build, and each stage is skipped when the
+    fingerprint of its inputs matches the one recorded in build_manifest.json.
+    ffmpeg_mirror is passed to download_ffmpeg for offline builds, and
+    trace_file (from trace_imports.py) produces a pruned spec.
+    cached_onefile adds a one-file executable that extracts once per user
+    (see onefile_launcher.py) instead of on every launch. profile is a key
+    of BUILD_PROFILES. prefetch_models bundles the pinned models of
+    model_store.py so the app runs offline; the build fails if
+    model_pins.json is missing or does not pin commit hashes. license_public_key (base64) is
+    the key the app verifies signed license tokens against.
+    """
     if not check_pyinstaller():
         return False
-    
+    if prefetch_models:
+        import model_store
+        # Without pins there is nothing reproducible to bundle; stop before any work
+        try:
+            pinned = model_store.pinned_models()
+        except ValueError as e:
+            print(f"❌ --prefetch-models needs model pins: {e}")
+            return False
+
+    _build_stages.clear()
+    build_start = time.perf_counter()
+    build_dir = os.path.abspath('./build')
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    manifest = load_build_manifest(build_dir)
+    cached = manifest.get('stages', {}) if incremental else {}
+    stages = {}
+
     print("Setting up build environment...")
-    temp_dir = create_version_info()
-    print(f"Created temporary directory at: {temp_dir}")
-    
-    # Find package paths
-    package_paths = find_package_paths()
-    
-    # Create SpeechBrain utility fix
-    create_speechbrain_utils_fix(temp_dir, package_paths)
-    
-    # Download FFmpeg
-    ffmpeg_dir = download_ffmpeg()
+    # Incremental builds need stable paths so the generated spec does not change
+    temp_dir = create_version_info(os.path.join(build_dir, 'staging') if incremental else None)
+    print(f"Created {'staging' if incremental else 'temporary'} directory at: {temp_dir}")
+    create_license_key_module(temp_dir, license_public_key)
+    if not license_public_key and not os.path.exists(os.path.join(current_dir, 'license_public_key.py')):
+        print("⚠️ No --license-public-key given: this build will not verify signed license tokens")
+
+    # Download FFmpeg (cached per user, so clean builds reuse it too) while
+    # the packages are located and patched
+    def ffmpeg_stage():
+        with _stage('ffmpeg') as stage:
+            ffmpeg_dir = download_ffmpeg(mirror=ffmpeg_mirror)
+            if ffmpeg_dir:
+                # The cache entry records the verified archive checksum next to the executables
+                ffmpeg_key = _files_digest([os.path.join(os.path.dirname(ffmpeg_dir), 'archive.sha256')])
+                if cached.get('ffmpeg', {}).get('key') == ffmpeg_key:
+                    stage['status'] = 'hit'
+                stages['ffmpeg'] = {'key': ffmpeg_key}
+            return ffmpeg_dir
+
+    # Fetch the pinned models into the per-user cache once; later builds only check them
+    def models_stage():
+        with _stage('models') as stage:
+            store_dir = os.path.join(_default_cache_dir(), 'models')
+            manifest = model_store.load_manifest(store_dir) or {}
+            stored = [{'repo_id': m['repo_id'], 'revision': m['revision']} for m in manifest.get('models', [])]
+            if stored == pinned and model_store.verify_store(store_dir)[0]:
+                stage['status'] = 'hit'
+            else:
+                try:
+                    manifest = model_store.prefetch_models(store_dir, pinned)
+                except Exception as e:
+                    print(f"❌ Could not fetch the models: {e}")
+                    return None
+            if not model_store.check_offline(store_dir):
+                print("❌ The model store does not load offline")
+                return None
+            stages['models'] = {'key': _fingerprint(manifest['files'])}
+            return store_dir
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        ffmpeg_future = executor.submit(ffmpeg_stage)
+        models_future = executor.submit(models_stage) if prefetch_models else None
+
+        # Find package paths
+        with _stage('packages') as stage:
+            packages_key = _fingerprint(_files_digest([os.path.join(current_dir, 'requirements.txt')]),
+                                        _installed_packages())
+            package_paths = cached.get('packages', {}).get('package_paths')
+            if cached.get('packages', {}).get('key') == packages_key \
+                    and all(os.path.exists(path) for path in package_paths.values() if path):
+                stage['status'] = 'hit'
+            else:
+                package_paths = find_package_paths(stage.setdefault('details', {}))
+            stages['packages'] = {'key': packages_key, 'package_paths': package_paths}
+
+        # Create SpeechBrain utility fix
+        with _stage('speechbrain_patch') as stage:
+            speechbrain_utils = os.path.join(package_paths.get('speechbrain') or '', 'utils')
+            patch_key = _fingerprint(_files_digest([os.path.join(speechbrain_utils, '__init__.py'),
+                                                    os.path.join(speechbrain_utils, 'importutils.py')]))
+            if cached.get('speechbrain_patch', {}).get('key') == patch_key \
+                    and os.path.exists(os.path.join(temp_dir, 'speechbrain')):
+                stage['status'] = 'hit'
+            else:
+                create_speechbrain_utils_fix(temp_dir, package_paths)
+            stages['speechbrain_patch'] = {'key': patch_key}
+
+        ffmpeg_dir = ffmpeg_future.result()
+        model_store_dir = models_future.result() if models_future else None
+
+    if prefetch_models and not model_store_dir:
+        if not incremental:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        return False
     
     # Find icon file - use platform-specific icons if available
     icon_path = None
@@ -678,31 +1158,61 @@ def build_app(one_file=False):
         print("No icon file found. The application will use the default PyInstaller icon.")
     
     # Generate spec file
-    spec_file = generate_spec_file(temp_dir, package_paths, icon_path, ffmpeg_dir)
-    print(f"Generated spec file at: {spec_file}")
-    
+    with _stage('spec'):
+        trace = load_import_trace(trace_file) if trace_file else None
+        timings_file = os.path.join(build_dir, 'target_timings.json')
+        spec_file = generate_spec_file(temp_dir, package_paths, icon_path, ffmpeg_dir, trace,
+                                       one_file, timings_file, profile, model_store_dir)
+    print(f"Generated spec file at: {spec_file} ({profile} profile)")
+
+    # Everything that can change the bundle, apart from the spec itself
+    inputs_key = _fingerprint(_files_digest(_source_files()), icon_path, license_public_key,
+                              {name: stage.get('key') for name, stage in stages.items()})
+
     # Run PyInstaller
     print("\nBuilding application with PyInstaller (this may take a while)...")
     try:
         build_cmd = [
-            sys.executable, 
+            sys.executable,
             '-m', 'PyInstaller',
-            '--clean',
+            '--noconfirm',  # Replace an existing dist/KeszAudio instead of prompting
             '--distpath', './dist',
             '--workpath', './build',
         ]
-        
+        if not incremental:
+            build_cmd.insert(3, '--clean')
+
         # Add platform-specific options
         if is_macos:
             # For macOS, add --target-architecture if needed
             if platform.machine() == 'arm64':
                 build_cmd.append('--target-architecture=universal2')
-            
+
         build_cmd.append(spec_file)
-        
-        print(f"Running build command: {' '.join(build_cmd)}")
-        subprocess.run(build_cmd, check=True)
-        
+
+        with _stage('pyinstaller') as stage:
+            with open(spec_file, 'r') as f:
+                pyinstaller_key = _fingerprint(f.read(), inputs_key, build_cmd[3:-1])
+            output_paths = ['./dist/KeszAudio.app' if is_macos else './dist/KeszAudio']
+            build_one_file = one_file and not is_macos  # One-file not ideal for macOS
+            if build_one_file:
+                output_paths.append(f"./dist/{ONEFILE_NAME}{'.exe' if is_windows else ''}")
+            # Outside Windows the one-file executable takes the onedir folder's
+            # place, so the folder has to be built again
+            if cached.get('pyinstaller', {}).get('key') == pyinstaller_key \
+                    and os.path.isdir(output_paths[0]) and all(os.path.exists(path) for path in output_paths):
+                stage['status'] = 'hit'
+                print("Build inputs unchanged, reusing the previous PyInstaller output.")
+            else:
+                if os.path.exists(timings_file):
+                    os.remove(timings_file)
+                if os.path.isfile(output_paths[0]):
+                    os.remove(output_paths[0])
+                print(f"Running build command: {' '.join(build_cmd)}")
+                subprocess.run(build_cmd, check=True)
+                print_target_timings(timings_file)
+            stages['pyinstaller'] = {'key': pyinstaller_key}
+
         print("\nBuild completed successfully!")
         
         if is_macos:
@@ -742,77 +1252,430 @@ def build_app(one_file=False):
         else:
             print(f"Application files can be found in: {os.path.abspath('./dist/KeszAudio')}")
         
-        # Create a one-file version if requested
-        if one_file and (is_windows or not is_macos):  # One-file not ideal for macOS
-            print("\nCreating one-file executable version...")
-            onefile_spec = os.path.join(temp_dir, 'app_onefile.spec')
-            
-            # Read the spec file
-            with open(spec_file, 'r') as f:
-                spec_content = f.read()
-            
-            # Modify for one-file build
-            onefile_content = spec_content.replace(
-                "exclude_binaries=True",
-                "exclude_binaries=False"
-            )
-            
-            # Replace COLLECT section and BUNDLE section if it exists
-            import re
-            onefile_content = re.sub(
-                r'# Create the collection\ncoll = COLLECT\([^)]+\)',
-                '',
-                onefile_content
-            )
-            
-            # Remove BUNDLE section for macOS
-            onefile_content = re.sub(
-                r'# Create \.app bundle structure\napp = BUNDLE\([^)]+\)',
-                '',
-                onefile_content
-            )
-            
-            # Add runtime_tmpdir to EXE
-            onefile_content = onefile_content.replace(
-                f"console={str(not is_windows).lower()},",
-                f"console={str(not is_windows).lower()},\n    runtime_tmpdir=None,"
-            )
-            
-            # Write the onefile spec file
-            with open(onefile_spec, 'w') as f:
-                f.write(onefile_content)
-            
-            print(f"Generated one-file spec at: {onefile_spec}")
-            
-            # Build one-file version
-            onefile_cmd = [
-                sys.executable, 
-                '-m', 'PyInstaller',
-                '--clean',
-                '--distpath', './dist',
-                '--workpath', './build',
-                onefile_spec
-            ]
-            
-            print(f"Running one-file build command: {' '.join(onefile_cmd)}")
-            subprocess.run(onefile_cmd, check=True)
-            
-            print("\nOne-file build completed successfully!")
-            if is_windows:
-                print(f"One-file executable can be found at: {os.path.abspath('./dist/KeszAudio.exe')}")
-            else:
-                print(f"One-file executable can be found at: {os.path.abspath('./dist/KeszAudio')}")
-        
+        if cached_onefile and not is_macos:
+            with _stage('cached_onefile') as stage:
+                cached_onefile_key = _fingerprint(pyinstaller_key,
+                                                  _files_digest([os.path.join(current_dir, name)
+                                                                for name in ('onefile_launcher.py', 'user_cache.py')]))
+                cached_onefile_path = f"./dist/{CACHED_ONEFILE_NAME}{'.exe' if is_windows else ''}"
+                if cached.get('cached_onefile', {}).get('key') == cached_onefile_key \
+                        and os.path.isfile(cached_onefile_path):
+                    stage['status'] = 'hit'
+                else:
+                    build_cached_onefile(os.path.abspath('./dist/KeszAudio'), icon_path)
+                stages['cached_onefile'] = {'key': cached_onefile_key}
+
+        if build_one_file:
+            built_path = f"./dist/{ONEFILE_TARGET}{'.exe' if is_windows else ''}"
+            if os.path.isfile(built_path):
+                # Outside Windows this replaces the onedir folder, as the separate
+                # one-file build always did; the cached variant is packed by now
+                if os.path.isdir(output_paths[-1]):
+                    shutil.rmtree(output_paths[-1])
+                os.replace(built_path, output_paths[-1])
+            print(f"One-file executable can be found at: {os.path.abspath(output_paths[-1])}")
+
+        total = time.perf_counter() - build_start
+        if not incremental:
+            manifest['clean_build_seconds'] = total
+        print_build_report(total, manifest.get('clean_build_seconds') if incremental else None)
         return True
     except subprocess.SubprocessError as e:
         print(f"Build failed: {e}")
+        print_build_report(time.perf_counter() - build_start)
         return False
     finally:
-        print(f"Cleaning up temporary directory: {temp_dir}")
+        # Record only the stages that completed; a clean build leaves nothing to reuse
+        manifest['stages'] = stages if incremental else {}
+        manifest['last_build_timings'] = {stage['name']: {'status': stage['status'], 'seconds': stage['seconds'],
+                                                          **({'details': stage['details']} if 'details' in stage else {})}
+                                          for stage in _build_stages}
+        try:
+            save_build_manifest(build_dir, manifest)
+        except OSError as e:
+            print(f"Warning: Could not save build manifest: {e}")
+        if not incremental:
+            print(f"Cleaning up temporary directory: {temp_dir}")
+            try:
+                shutil.rmtree(temp_dir)
+            except Exception as e:
+                print(f"Warning: Could not clean up temporary directory: {e}")
+
+def trace_workload(workload_args, trace_file):
+    """Run main.py with workload_args under trace_imports.py, writing trace_file."""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    os.makedirs(os.path.dirname(trace_file), exist_ok=True)
+    cmd = [sys.executable, os.path.join(current_dir, 'trace_imports.py'), '--output', trace_file,
+           os.path.join(current_dir, 'main.py'), *workload_args]
+    print(f"Tracing workload: {' '.join(cmd)}")
+    result = subprocess.run(cmd)
+    if result.returncode != 0 or not os.path.exists(trace_file):
+        print(f"Traced workload failed with exit code {result.returncode}")
+        return False
+    return True
+
+def measure_bundle(bundle_dir, workload_args, runs=3):
+    """Size of a onedir bundle and the startup of the workload with it, or None if not built."""
+    exe_path = bundle_executable(bundle_dir)
+    if not os.path.isfile(exe_path):
+        return None
+    result = measure_startup([exe_path, *workload_args], runs)
+    result['size'] = bundle_contents(bundle_dir)['size']
+    return result
+
+def compare_build_profiles(workload_args, profiles=('default', 'startup', 'size'), runs=3,
+                           incremental=False, ffmpeg_mirror=None):
+    """Build each profile, run it headless and compare size and time to first output."""
+    bundle_name = 'KeszAudio.app' if sys.platform == 'darwin' else 'KeszAudio'
+    results = {}
+    for profile in profiles:
+        print(f"\n🔧 Building the {profile} profile...")
+        if not build_app(incremental=incremental, ffmpeg_mirror=ffmpeg_mirror, profile=profile):
+            results[profile] = {'error': 'build failed'}
+            continue
+        # Keep every variant so they can be compared side by side
+        variant_dir = os.path.abspath(os.path.join('./dist/profiles', profile))
+        shutil.rmtree(variant_dir, ignore_errors=True)
+        os.makedirs(variant_dir)
+        bundle_dir = os.path.join(variant_dir, bundle_name)
+        shutil.copytree(os.path.abspath(os.path.join('./dist', bundle_name)), bundle_dir, symlinks=True)
+
+        # The first launch of a freshly copied bundle is the closest to a cold
+        # start without dropping the OS file cache
+        startup = measure_startup([bundle_executable(bundle_dir), *workload_args], runs)
+        results[profile] = {
+            'settings': BUILD_PROFILES[profile],
+            'path': bundle_dir,
+            'size': bundle_contents(bundle_dir)['size'],
+            'cold_first_output': startup['cold_first_output'],
+            'warm_first_output': startup['warm_first_output'],
+            'warm_total': startup['warm_total'],
+            'returncode': startup['returncode'],
+        }
+
+    def fmt(seconds):
+        return f"{seconds:7.2f}s" if seconds is not None else "    n/a"
+    print(f"\n📊 Build profiles ({' '.join(workload_args)}), time to first output:")
+    print(f"  {'profile':<10} {'size':>10}  {'cold':>8}  {'warm':>8}  exit")
+    for profile, result in results.items():
+        if 'error' in result:
+            print(f"  {profile:<10} ❌ {result['error']}")
+            continue
+        print(f"  {profile:<10} {result['size'] / 1e6:8.1f}MB  {fmt(result['cold_first_output'])}  "
+              f"{fmt(result['warm_first_output'])}  {result['returncode']}")
+
+    report_file = os.path.abspath('./build/profile_comparison.json')
+    os.makedirs(os.path.dirname(report_file), exist_ok=True)
+    with open(report_file, 'w') as f:
+        json.dump({'workload': workload_args, 'runs': runs, 'results': results}, f, indent=2)
+    print(f"Saved comparison to {report_file}")
+    return all('error' not in result and result['returncode'] == 0 for result in results.values())
+
+CACHED_ONEFILE_NAME = 'KeszAudio-cached'
+
+def _write_payload_zip(bundle_dir, zip_path, entry):
+    """Zip the onedir bundle under KeszAudio/, recording the entry executable in the comment."""
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=6) as zip_ref:
+        for root, dirs, files in os.walk(bundle_dir):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                arcname = 'KeszAudio/' + os.path.relpath(path, bundle_dir).replace('\\', '/')
+                zip_ref.write(path, arcname)
+        zip_ref.comment = json.dumps({'entry': entry}).encode('utf-8')
+
+def build_cached_onefile(bundle_dir, icon_path=None):
+    """Build a one-file executable that extracts bundle_dir once per user and build.
+
+    The stdlib-only onefile_launcher.py is frozen on its own, then a zip of
+    the onedir bundle and a trailer with its hash are appended to it.
+    """
+    import struct
+    import onefile_launcher
+
+    is_windows = sys.platform.startswith('win')
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    launcher_dir = os.path.abspath('./build/launcher')
+    os.makedirs(launcher_dir, exist_ok=True)
+
+    launcher_cmd = [
+        sys.executable, '-m', 'PyInstaller', '--onefile', '--noconfirm',
+        '--name', 'KeszAudio-launcher',
+        '--distpath', os.path.join(launcher_dir, 'dist'),
+        '--workpath', os.path.join(launcher_dir, 'work'),
+        '--specpath', launcher_dir,
+    ]
+    if icon_path:
+        launcher_cmd += ['--icon', icon_path]
+    launcher_cmd.append(os.path.join(current_dir, 'onefile_launcher.py'))
+    print(f"Building launcher: {' '.join(launcher_cmd)}")
+    subprocess.run(launcher_cmd, check=True)
+    launcher_exe = os.path.join(launcher_dir, 'dist', 'KeszAudio-launcher' + ('.exe' if is_windows else ''))
+
+    print(f"Packing {bundle_dir} into the payload...")
+    payload_path = os.path.join(launcher_dir, 'payload.zip')
+    _write_payload_zip(bundle_dir, payload_path, 'KeszAudio/KeszAudio' + ('.exe' if is_windows else ''))
+    build_hash = sha256_file(payload_path)[:32]
+    payload_size = os.path.getsize(payload_path)
+
+    output_path = os.path.abspath(f"./dist/{CACHED_ONEFILE_NAME}{'.exe' if is_windows else ''}")
+    with open(output_path + '.tmp', 'wb') as out:
+        for part in (launcher_exe, payload_path):
+            with open(part, 'rb') as f:
+                shutil.copyfileobj(f, out, 1024 * 1024)
+        out.write(struct.pack(onefile_launcher.TRAILER_FORMAT, onefile_launcher.TRAILER_MAGIC,
+                              payload_size, build_hash.encode('ascii')))
+    os.chmod(output_path + '.tmp', 0o755)
+    os.replace(output_path + '.tmp', output_path)
+    os.remove(payload_path)
+    print(f"Cached one-file executable ({payload_size / 1e6:.1f} MB payload, build {build_hash}) "
+          f"can be found at: {output_path}")
+    return output_path
+
+def _time_to_first_output(cmd, env=None, timeout=600):
+    """Return (seconds to first output byte, seconds to exit, exit code) for cmd.
+
+    The child runs with PYTHONUNBUFFERED=1, since a block-buffered pipe would
+    hold its first line until exit. The output is read on a separate thread
+    so that a silent child is still killed after `timeout` seconds.
+    """
+    env = dict(os.environ if env is None else env, PYTHONUNBUFFERED='1')
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT, env=env)
+    first_output = []
+
+    def read_output():
+        if proc.stdout.read(1):
+            first_output.append(time.perf_counter() - start)
+        # Keep draining so the child never blocks on a full pipe
+        for _ in iter(lambda: proc.stdout.read(65536), b''):
+            pass
+
+    reader = threading.Thread(target=read_output, daemon=True)
+    reader.start()
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+    total = time.perf_counter() - start
+    # Processes the child started may still hold the pipe open
+    reader.join(timeout=5)
+    return first_output[0] if first_output else None, total, proc.returncode
+
+def measure_startup(cmd, runs=3, env=None):
+    """Time to first output of a first (cold) run and the median of `runs` more (warm).
+
+    'returncode' is the first non-zero exit code of any run, or 0 if all succeeded.
+    """
+    cold = _time_to_first_output(cmd, env)
+    warm = [_time_to_first_output(cmd, env) for _ in range(runs)]
+    failed = [result[2] for result in [cold, *warm] if result[2] != 0]
+    warm.sort(key=lambda r: r[0] if r[0] is not None else float('inf'))
+    warm_median = warm[len(warm) // 2] if warm else (None, None, None)
+    return {
+        'cold_first_output': cold[0],
+        'cold_total': cold[1],
+        'warm_first_output': warm_median[0],
+        'warm_total': warm_median[1],
+        'returncode': failed[0] if failed else 0,
+    }
+
+def benchmark_onefile_startup(workload_args, runs=3):
+    """Compare cold and warm starts of the cached and plain one-file executables."""
+    suffix = '.exe' if sys.platform.startswith('win') else ''
+    print(f"\n⏱️  One-file startup ({' '.join(workload_args)}), time to first output:")
+    found = False
+    for name in (CACHED_ONEFILE_NAME, ONEFILE_NAME):
+        exe_path = os.path.abspath(f"./dist/{name}{suffix}")
+        if not os.path.isfile(exe_path):
+            continue
+        found = True
+        # A fresh extraction root makes the first run a true cold start
+        runtime_dir = tempfile.mkdtemp(prefix="keszaudio_runtime_")
+        env = dict(os.environ, KESZAUDIO_RUNTIME_DIR=runtime_dir)
         try:
-            shutil.rmtree(temp_dir)
-        except Exception as e:
-            print(f"Warning: Could not clean up temporary directory: {e}")
+            startup = measure_startup([exe_path, *workload_args], runs, env)
+        finally:
+            shutil.rmtree(runtime_dir, ignore_errors=True)
+
+        def fmt(seconds):
+            return f"{seconds:7.2f}s" if seconds is not None else "    n/a"
+        print(f"  {name:<20} cold {fmt(startup['cold_first_output'])}  warm {fmt(startup['warm_first_output'])}  "
+              f"(exit {startup['returncode']}, total cold {startup['cold_total']:.2f}s / "
+              f"warm {startup['warm_total'] or 0:.2f}s)")
+    if not found:
+        print("  No one-file executables found in ./dist; build with --onefile and/or --cached-onefile")
+    return found
+
+BENCHMARK_HISTORY = os.path.join('build', 'benchmark_history.json')
+# Fail when a run is this much worse than the last passing run
+BENCHMARK_SIZE_THRESHOLD = 0.05
+BENCHMARK_STARTUP_THRESHOLD = 0.20
+
+def bundle_executable(bundle_dir):
+    """Path of the main executable in a onedir bundle or .app."""
+    if bundle_dir.rstrip('/\\').endswith('.app'):
+        return os.path.join(bundle_dir, 'Contents', 'MacOS', 'KeszAudio')
+    return os.path.join(bundle_dir, 'KeszAudio.exe' if sys.platform.startswith('win') else 'KeszAudio')
+
+def bundle_contents(bundle_dir):
+    """Total size, file count and size per top-level package of a bundle."""
+    size = 0
+    count = 0
+    packages = {}
+    for root, _, files in os.walk(bundle_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            if os.path.islink(path):
+                continue
+            file_size = os.path.getsize(path)
+            size += file_size
+            count += 1
+            parts = os.path.relpath(path, bundle_dir).split(os.sep)
+            # PyInstaller 6 puts everything but the executable in _internal
+            while parts[0] in ('_internal', 'Contents', 'Frameworks', 'Resources') and len(parts) > 1:
+                parts = parts[1:]
+            package = parts[0] if len(parts) > 1 else name
+            if package.endswith('.dist-info'):
+                package = package.split('-')[0]
+            package = package[:-len('.libs')] if package.endswith('.libs') else package
+            packages[package] = packages.get(package, 0) + file_size
+    return {'size': size, 'files': count, 'packages': packages}
+
+def _drop_file_cache(bundle_dir):
+    """Evict the bundle's files from the OS page cache where possible; True if done."""
+    if not hasattr(os, 'posix_fadvise'):
+        return False
+    for root, _, files in os.walk(bundle_dir):
+        for name in files:
+            try:
+                fd = os.open(os.path.join(root, name), os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            except OSError:
+                pass
+            finally:
+                os.close(fd)
+    return True
+
+def benchmark_bundle(bundle_dir, workload_args, runs=5, history_file=BENCHMARK_HISTORY,
+                     size_threshold=BENCHMARK_SIZE_THRESHOLD, startup_threshold=BENCHMARK_STARTUP_THRESHOLD):
+    """Measure a built bundle, append the result to the history and check it for regressions."""
+    bundle_dir = os.path.abspath(bundle_dir)
+    exe_path = bundle_executable(bundle_dir)
+    if not os.path.isfile(exe_path):
+        print(f"❌ No executable at {exe_path}; build first with --build")
+        return False
+
+    contents = bundle_contents(bundle_dir)
+    cache_dropped = _drop_file_cache(bundle_dir)
+    startup = measure_startup([exe_path, *workload_args], runs)
+    top_packages = sorted(contents['packages'].items(), key=lambda item: -item[1])[:15]
+    result = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'bundle': bundle_dir,
+        'workload': workload_args,
+        'size': contents['size'],
+        'files': contents['files'],
+        'top_packages': dict(top_packages),
+        'cold_first_output': startup['cold_first_output'],
+        'cold_cache_dropped': cache_dropped,
+        'warm_first_output': startup['warm_first_output'],
+        'warm_total': startup['warm_total'],
+        'returncode': startup['returncode'],
+    }
+
+    try:
+        with open(history_file, 'r') as f:
+            history = json.load(f)
+    except (OSError, ValueError):
+        history = []
+    baseline = next((entry for entry in reversed(history)
+                     if entry.get('passed') and entry.get('workload') == workload_args), None)
+
+    regressions = []
+    if result['returncode'] != 0:
+        regressions.append(f"workload exited with {result['returncode']}")
+    if result['cold_first_output'] is None or result['warm_first_output'] is None:
+        regressions.append("no output from the workload")
+    if baseline:
+        if result['size'] > baseline['size'] * (1 + size_threshold):
+            regressions.append(f"size {baseline['size'] / 1e6:.1f} MB -> {result['size'] / 1e6:.1f} MB "
+                               f"(more than {size_threshold:.0%})")
+        for key, label in (('cold_first_output', 'cold start'), ('warm_first_output', 'warm start')):
+            if result[key] is not None and baseline.get(key) \
+                    and result[key] > baseline[key] * (1 + startup_threshold):
+                regressions.append(f"{label} {baseline[key]:.2f}s -> {result[key]:.2f}s "
+                                   f"(more than {startup_threshold:.0%})")
+    result['passed'] = not regressions
+    result['regressions'] = regressions
+
+    def fmt(seconds):
+        return f"{seconds:.2f}s" if seconds is not None else "n/a"
+    print(f"\n📏 Bundle benchmark: {bundle_dir}")
+    print(f"  Size:        {contents['size'] / 1e6:.1f} MB in {contents['files']} files")
+    print("  Largest packages:")
+    for package, size in top_packages[:10]:
+        print(f"    {package:<32} {size / 1e6:9.1f} MB")
+    print(f"  Cold start:  {fmt(result['cold_first_output'])} to first output"
+          f"{'' if cache_dropped else ' (file cache not dropped)'}")
+    print(f"  Warm start:  {fmt(result['warm_first_output'])} to first output, "
+          f"{fmt(result['warm_total'])} total (median of {runs})")
+    if baseline:
+        print(f"  Baseline:    {baseline['timestamp']}, {baseline['size'] / 1e6:.1f} MB, "
+              f"cold {fmt(baseline.get('cold_first_output'))}, warm {fmt(baseline.get('warm_first_output'))}")
+
+    history.append(result)
+    os.makedirs(os.path.dirname(os.path.abspath(history_file)), exist_ok=True)
+    with open(history_file, 'w') as f:
+        json.dump(history, f, indent=2)
+    print(f"  Recorded in {os.path.abspath(history_file)}")
+
+    if regressions:
+        print("\n❌ BENCHMARK REGRESSION:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return False
+    print("  ✅ No regressions")
+    return True
+
+def build_pruned_app(workload_args, one_file=False, incremental=False, ffmpeg_mirror=None, profile='default',
+                     license_public_key=None):
+    """Trace the workload, build a bundle with only what it loaded, and smoke test it."""
+    trace_file = os.path.abspath('./build/import_trace.json')
+    if not trace_workload(workload_args, trace_file):
+        return False
+
+    bundle_dir = os.path.abspath('./dist/KeszAudio')
+    before = measure_bundle(bundle_dir, workload_args)
+    if not build_app(one_file, incremental, ffmpeg_mirror, trace_file, profile=profile,
+                     license_public_key=license_public_key):
+        return False
+    after = measure_bundle(bundle_dir, workload_args)
+
+    print("\n📦 Pruned bundle:")
+    if after is None:
+        print(f"  ❌ Bundle not found at {bundle_dir}")
+        return False
+    if before:
+        print(f"  Size:    {before['size'] / 1e6:9.1f} MB -> {after['size'] / 1e6:9.1f} MB "
+              f"({(after['size'] - before['size']) / 1e6:+.1f} MB)")
+        if before['warm_first_output'] and after['warm_first_output']:
+            print(f"  Startup: {before['warm_first_output']:9.2f} s  -> {after['warm_first_output']:9.2f} s  "
+                  f"({after['warm_first_output'] - before['warm_first_output']:+.2f} s to first output)")
+    else:
+        print(f"  Size:    {after['size'] / 1e6:.1f} MB (no previous bundle to compare with)")
+        if after['warm_first_output']:
+            print(f"  Startup: {after['warm_first_output']:.2f} s to first output")
+    if after['returncode'] != 0:
+        print(f"  ❌ Smoke test failed: workload exited with {after['returncode']}")
+        return False
+    print(f"  ✅ Smoke test passed: {' '.join(workload_args)}")
+    return True
 
 def main():
     # Set environment variables to bypass macOS GUI restrictions
@@ -827,16 +1690,80 @@ def main():
     # Handle both `--build` and combined `--build--onefile` cases
     should_build = False
     one_file = False
-    
+    incremental = False
+    ffmpeg_mirror = None
+    pruned = False
+    cached_onefile = False
+    bench_onefile = False
+    profile = 'default'
+    compare_profiles = False
+    prefetch_models = False
+    license_public_key = None
+    benchmark_dir = None
+    size_threshold = BENCHMARK_SIZE_THRESHOLD
+    startup_threshold = BENCHMARK_STARTUP_THRESHOLD
+    workload_args = ['--cli']
+
     for arg in sys.argv[1:]:
         if arg == '--build' or arg.startswith('--build'):
             should_build = True
         if '--onefile' in arg:
             one_file = True
-    
+        if '--incremental' in arg:
+            incremental = True
+        if arg.startswith('--ffmpeg-mirror='):
+            ffmpeg_mirror = arg.split('=', 1)[1]
+        if arg == '--pruned':
+            pruned = True
+        if arg == '--cached-onefile':
+            cached_onefile = True
+        if arg == '--bench-onefile':
+            bench_onefile = True
+        if arg.startswith('--profile='):
+            profile = arg.split('=', 1)[1]
+            if profile not in BUILD_PROFILES:
+                print(f"Unknown build profile '{profile}', expected one of: {', '.join(BUILD_PROFILES)}")
+                return 1
+        if arg.startswith('--license-public-key='):
+            try:
+                license_public_key = load_license_public_key(arg.split('=', 1)[1])
+            except (OSError, ValueError) as e:
+                print(f"Invalid --license-public-key: {e}")
+                return 1
+        if arg == '--prefetch-models':
+            prefetch_models = True
+        if arg == '--compare-profiles':
+            compare_profiles = True
+        if arg == '--benchmark' or arg.startswith('--benchmark='):
+            benchmark_dir = arg.split('=', 1)[1] if '=' in arg else \
+                ('./dist/KeszAudio.app' if sys.platform == 'darwin' else './dist/KeszAudio')
+        if arg.startswith('--size-threshold='):
+            size_threshold = float(arg.split('=', 1)[1]) / 100
+        if arg.startswith('--startup-threshold='):
+            startup_threshold = float(arg.split('=', 1)[1]) / 100
+        if arg.startswith('--workload='):
+            import shlex
+            workload_args = shlex.split(arg.split('=', 1)[1])
+
+    if compare_profiles:
+        return 0 if compare_build_profiles(workload_args, incremental=incremental, ffmpeg_mirror=ffmpeg_mirror) else 1
+    if should_build and pruned:
+        return 0 if build_pruned_app(workload_args, one_file, incremental, ffmpeg_mirror, profile,
+                                     license_public_key) else 1
     if should_build:
-        build_app(one_file)
-        return 0
+        built = build_app(one_file, incremental, ffmpeg_mirror, cached_onefile=cached_onefile, profile=profile,
+                          prefetch_models=prefetch_models, license_public_key=license_public_key)
+        if built and bench_onefile:
+            benchmark_onefile_startup(workload_args)
+        if built and benchmark_dir:
+            return 0 if benchmark_bundle(benchmark_dir, workload_args, size_threshold=size_threshold,
+                                         startup_threshold=startup_threshold) else 1
+        return 0 if built else 1
+    if bench_onefile:
+        return 0 if benchmark_onefile_startup(workload_args) else 1
+    if benchmark_dir:
+        return 0 if benchmark_bundle(benchmark_dir, workload_args, size_threshold=size_threshold,
+                                     startup_threshold=startup_threshold) else 1
     
     # Otherwise, run the app normally
     main_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""Diarize long recordings chunk by chunk in a pool of worker processes.
+
+The recording is cut into fixed-length chunks (600 s by default), and each
+chunk is diarized on its own, yielding local speakers and one embedding per
+local speaker. Chunks are independent, so they run in a ProcessPoolExecutor.
+Each worker loads the pyannote pipeline once, in its initializer, and
+limits torch to its share of the CPU threads. Results are merged in chunk
+order before the global clustering maps local speakers to "Speaker N".
+The output and logs are therefore the same whatever the number of workers
+or the order in which chunks finish.
+
+diarize_file() is the entry point the app calls; the number of workers
+comes from its argument or KESZAUDIO_DIARIZATION_WORKERS, and 1 runs the
+chunks one after another in the calling process. A pipeline with its own
+per-chunk step can parallelize just that step with run_chunk_stage().
+Global speakers are numbered in order of first appearance, so a speaker
+split by a chunk boundary keeps one label on both sides.
+
+Usage:
+    python chunk_diarization.py AUDIO [--workers N] [--chunk-seconds 600]
+    python chunk_diarization.py AUDIO --benchmark 1,2,4
+
+Environment:
+    HF_TOKEN                        Hugging Face token for the gated pyannote models
+    KESZAUDIO_DIARIZATION_WORKERS   Worker processes when none are passed
+"""
+import os
+import sys
+import json
+import math
+import time
+import logging
+import argparse
+import multiprocessing
+import concurrent.futures
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SECONDS = 600.0
+# A shorter tail is folded into the previous chunk
+MIN_CHUNK_SECONDS = 5.0
+DIARIZATION_MODEL = 'pyannote/speaker-diarization-3.1'
+# Cosine distance below which local speakers of different chunks are merged
+CLUSTER_THRESHOLD = 0.7
+# Each worker is a separate process with its own torch runtime and pyannote
+# pipeline (segmentation and embedding models), plus the chunk being
+# processed: a 600 s chunk read at 48 kHz stereo is ~230 MB of float32
+# before it is mixed down. Budget around 1 GB of RAM per worker, so the
+# default stays small even on many-core machines; pass workers to go higher.
+DEFAULT_WORKERS = 4
+
+def load_diarization_pipeline(model=DIARIZATION_MODEL, token=None):
+    """Default model loader; must be a module-level function so workers can import it"""
+    from pyannote.audio import Pipeline
+    return Pipeline.from_pretrained(model, use_auth_token=token or os.environ.get('HF_TOKEN'))
+
+def plan_chunks(duration, chunk_seconds=CHUNK_SECONDS):
+    """List of (index, start, end) covering duration"""
+    chunks = []
+    start = 0.0
+    while start < duration:
+        end = min(start + chunk_seconds, duration)
+        if chunks and end - start < MIN_CHUNK_SECONDS:
+            index, previous_start, _ = chunks.pop()
+            chunks.append((index, previous_start, end))
+        else:
+            chunks.append((len(chunks), start, end))
+        start = end
+    return chunks
+
+# Per-process state set up once by _init_worker
+_pipeline = None
+
+def _init_worker(loader, loader_kwargs, torch_threads):
+    global _pipeline
+    if torch_threads:
+        import torch
+        torch.set_num_threads(torch_threads)
+    _pipeline = loader(**loader_kwargs)
+
+def diarize_chunk(path, index, start, end):
+    """Diarize one chunk of path; returns plain data so it pickles cheaply"""
+    import numpy as np
+    import soundfile as sf
+    import torch
+
+    began = time.perf_counter()
+    info = sf.info(path)
+    audio, sample_rate = sf.read(path, start=int(round(start * info.samplerate)),
+                                 stop=int(round(end * info.samplerate)), dtype='float32', always_2d=True)
+    waveform = torch.from_numpy(np.ascontiguousarray(audio.mean(axis=1)))[None, :]
+    diarization, embeddings = _pipeline({'waveform': waveform, 'sample_rate': sample_rate},
+                                        return_embeddings=True)
+
+    segments = sorted((round(start + turn.start, 6), round(start + turn.end, 6), label)
+                      for turn, _, label in diarization.itertracks(yield_label=True))
+    speakers = {}
+    # Embeddings come in the order of diarization.labels()
+    for label, embedding in zip(diarization.labels(), embeddings):
+        if np.all(np.isfinite(embedding)):
+            speakers[label] = [float(x) for x in embedding]
+    return {
+        'index': index,
+        'start': start,
+        'end': end,
+        'segments': segments,
+        'embeddings': speakers,
+        'seconds': time.perf_counter() - began,
+    }
+
+def _log_chunk(result):
+    labels = sorted({label for _, _, label in result['segments']})
+    logger.info("Chunk %d: start=%.2f, end=%.2f, num_local_speakers=%d",
+                result['index'], result['start'], result['end'], len(labels))
+    for seg_start, seg_end, label in result['segments']:
+        logger.debug("  Local speaker: %s, segment=(%.2f, %.2f)", label, seg_start, seg_end)
+    for label in labels:
+        if label in result['embeddings']:
+            first = next(s for s in result['segments'] if s[2] == label)
+            logger.debug("    Embedding for (chunk=%d, local_speaker=%s, seg=(%.2f,%.2f))",
+                         result['index'], label, first[0], first[1])
+
+def merge_chunk_results(results):
+    """Order chunk results by index into segments and (chunk, local) embeddings
+
+    Returns (segments, keys, embeddings) where segments are
+    (start, end, chunk, local_label) and keys[i] labels embeddings[i].
+    """
+    segments = []
+    keys = []
+    embeddings = []
+    for result in sorted(results, key=lambda r: r['index']):
+        for seg_start, seg_end, label in result['segments']:
+            segments.append((seg_start, seg_end, result['index'], label))
+        for label in sorted(result['embeddings']):
+            keys.append((result['index'], label))
+            embeddings.append(result['embeddings'][label])
+    return segments, keys, embeddings
+
+def _cosine_distance(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return 1.0 - dot / norm if norm else 1.0
+
+def cluster_speakers(keys, embeddings, threshold=CLUSTER_THRESHOLD):
+    """Group keys by average-linkage agglomerative clustering of cosine distances
+
+    Clusters are merged while the closest pair is at most threshold apart,
+    ties going to the earliest keys. Returns a list of key lists. There are
+    at most a few dozen local speakers, so plain Python is fast enough.
+    """
+    distances = [[_cosine_distance(a, b) for b in embeddings] for a in embeddings]
+    clusters = [[i] for i in range(len(keys))]
+    while len(clusters) > 1:
+        best = None
+        for i in range(len(clusters)):
+            for j in range(i + 1, len(clusters)):
+                average = sum(distances[a][b] for a in clusters[i] for b in clusters[j]) \
+                    / (len(clusters[i]) * len(clusters[j]))
+                if best is None or average < best[0]:
+                    best = (average, i, j)
+        if best[0] > threshold:
+            break
+        _, i, j = best
+        clusters[i] = sorted(clusters[i] + clusters.pop(j))
+    return [[keys[i] for i in cluster] for cluster in clusters]
+
+def label_segments(results, threshold=CLUSTER_THRESHOLD):
+    """Merge chunk results in chunk order and give every segment a global speaker
+
+    Returns a list of (start, end, global_speaker, chunk, local_label)
+    sorted by time. Speakers are numbered by their first segment.
+    """
+    results = sorted(results, key=lambda r: r['index'])
+    for result in results:
+        _log_chunk(result)
+    segments, keys, embeddings = merge_chunk_results(results)
+    first_start = {}
+    for seg_start, _, chunk, label in segments:
+        first_start.setdefault((chunk, label), seg_start)
+    groups = sorted(cluster_speakers(keys, embeddings, threshold),
+                    key=lambda group: min(first_start.get(key, float('inf')) for key in group))
+    speakers = {key: f"Speaker {number}" for number, group in enumerate(groups, 1) for key in group}
+    for key in keys:
+        logger.info("  (chunk=%d, local=%s) -> %s", key[0], key[1], speakers[key])
+
+    # A local speaker without a usable embedding keeps a chunk-scoped name
+    diarized = [(seg_start, seg_end, speakers.get((chunk, label), f"Unknown {chunk}/{label}"), chunk, label)
+                for seg_start, seg_end, chunk, label in segments]
+    diarized.sort(key=lambda s: (s[0], s[1], s[3]))
+    logger.info("Total diarization segments: %d", len(diarized))
+    return diarized
+
+def diarization_workers(workers=None):
+    """Worker count from the argument, KESZAUDIO_DIARIZATION_WORKERS, or the default
+
+    The default is DEFAULT_WORKERS or the CPU count, whichever is lower;
+    see DEFAULT_WORKERS for the memory each worker costs.
+    """
+    if not workers and os.environ.get('KESZAUDIO_DIARIZATION_WORKERS'):
+        workers = int(os.environ['KESZAUDIO_DIARIZATION_WORKERS'])
+    return max(1, workers or min(DEFAULT_WORKERS, os.cpu_count() or 1))
+
+def run_chunk_stage(path, chunks, workers, process_chunk=diarize_chunk, initializer=None, initargs=()):
+    """Run process_chunk(path, index, start, end) for every chunk and return the results in chunk order
+
+    process_chunk and initializer must be module-level functions, and each
+    result a dict with the chunk's 'index'. With more than one worker they
+    run in a pool of spawned processes, each set up once by initializer;
+    with one, in this process.
+    """
+    if workers <= 1 or len(chunks) <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        return [process_chunk(path, index, start, end) for index, start, end in chunks]
+
+    results = []
+    # spawn: a forked copy of a process that already used torch can deadlock
+    context = multiprocessing.get_context('spawn')
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=context,
+                                                initializer=initializer, initargs=initargs) as executor:
+        futures = [executor.submit(process_chunk, path, index, start, end) for index, start, end in chunks]
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+            results.append(result)
+            logger.debug("Chunk %d finished", result['index'])
+    results.sort(key=lambda r: r['index'])
+    return results
+
+def diarize_file(path, workers=None, chunk_seconds=CHUNK_SECONDS, torch_threads=None,
+                 loader=load_diarization_pipeline, loader_kwargs=None, threshold=CLUSTER_THRESHOLD):
+    """Diarize path with chunks spread over workers processes
+
+    Returns a list of (start, end, global_speaker, chunk, local_label)
+    sorted by time. workers is resolved by diarization_workers() and capped
+    at the number of chunks; workers=1 runs in this process. torch_threads
+    defaults to an even share of the CPUs per worker.
+    """
+    import soundfile as sf
+
+    info = sf.info(path)
+    chunks = plan_chunks(info.duration, chunk_seconds)
+    logger.info("Total duration: %.2fs, Sample rate: %d, Num chunks: %d",
+                info.duration, info.samplerate, len(chunks))
+    workers = min(diarization_workers(workers), len(chunks))
+    torch_threads = torch_threads or max(1, (os.cpu_count() or 1) // workers)
+    results = run_chunk_stage(path, chunks, workers, diarize_chunk, _init_worker,
+                              (loader, loader_kwargs or {}, torch_threads))
+    return label_segments(results, threshold)
+
+def benchmark_workers(path, worker_counts=(1, 2, 4), chunk_seconds=CHUNK_SECONDS,
+                      loader=load_diarization_pipeline, loader_kwargs=None, output=None):
+    """Time diarize_file for each worker count and check that the output does not change"""
+    import soundfile as sf
+
+    duration = sf.info(path).duration
+    rows = []
+    reference = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        diarized = diarize_file(path, workers, chunk_seconds, loader=loader, loader_kwargs=loader_kwargs)
+        seconds = time.perf_counter() - start
+        if reference is None:
+            reference = diarized
+        rows.append({'workers': workers, 'seconds': seconds, 'realtime_factor': seconds / duration,
+                     'same_output': diarized == reference})
+
+    print(f"\n⏱️  Chunk diarization of {duration:.0f}s of audio:")
+    print(f"  {'workers':>7} {'wall time':>10} {'speedup':>8} {'x realtime':>10}  output")
+    for row in rows:
+        print(f"  {row['workers']:>7} {row['seconds']:9.1f}s {rows[0]['seconds'] / row['seconds']:7.2f}x "
+              f"{row['realtime_factor']:10.2f}  {'same' if row['same_output'] else 'DIFFERENT'}")
+    if output:
+        with open(output, 'w') as f:
+            json.dump({'audio': path, 'duration': duration, 'chunk_seconds': chunk_seconds,
+                       'cpu_count': os.cpu_count(), 'results': rows}, f, indent=2)
+        print(f"Saved benchmark to {output}")
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Diarize a recording in parallel chunks")
+    parser.add_argument('audio')
+    parser.add_argument('--workers', type=int, default=None, help=f"Worker processes, each needing about 1 GB of RAM "
+                        f"(default: $KESZAUDIO_DIARIZATION_WORKERS, else {DEFAULT_WORKERS} "
+                        f"or the CPU count, whichever is lower)")
+    parser.add_argument('--chunk-seconds', type=float, default=CHUNK_SECONDS)
+    parser.add_argument('--token', help="Hugging Face token (default: $HF_TOKEN)")
+    parser.add_argument('--benchmark', metavar='COUNTS', help="Comma-separated worker counts to compare")
+    parser.add_argument('--output', help="Write the segments (or benchmark results) as JSON")
+    parser.add_argument('--debug', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO,
+                        format='%(asctime)s %(levelname)s: %(message)s')
+    loader_kwargs = {'token': args.token} if args.token else None
+
+    if args.benchmark:
+        counts = [int(count) for count in args.benchmark.split(',') if count]
+        benchmark_workers(args.audio, counts, args.chunk_seconds, loader_kwargs=loader_kwargs, output=args.output)
+        return 0
+
+    diarized = diarize_file(args.audio, args.workers, args.chunk_seconds, loader_kwargs=loader_kwargs)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(diarized, f, indent=1)
+        print(f"Saved {len(diarized)} segments to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Local stand-in for the license API, used for benchmarks and load tests.
+
+Serves the single-key verify endpoint on any path and the multi-key batch
+endpoint on paths ending in /batch. Keys starting with "REVOKED" are
+reported as revoked; delay and failure rate can be injected. Given an
+Ed25519 private key, valid responses carry a signed token in the format
+license_client.verify_license_token expects.
+"""
+import sys
+import json
+import base64
+import time
+import random
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+class FakeLicenseServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, host='127.0.0.1', port=0, delay=0.0, fail_rate=0.0, signing_key=None,
+                 token_ttl=7 * 86400, refresh_after=86400):
+        super().__init__((host, port), FakeLicenseHandler)
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.signing_key = signing_key
+        self.token_ttl = token_ttl
+        self.refresh_after = refresh_after
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/license-api/verify_license.php"
+
+    @property
+    def batch_url(self):
+        return self.url + "/batch"
+
+    def start(self):
+        """Serve on a daemon thread and return self"""
+        threading.Thread(target=self.serve_forever, name="fake-license-server", daemon=True).start()
+        return self
+
+    def verify(self, license_key, machine_id):
+        if license_key.startswith('REVOKED'):
+            return {"status": "revoked", "reason": "License revoked"}
+        response = {"status": "valid", "license_key": license_key, "machine_id": machine_id}
+        if self.signing_key is not None:
+            response["token"] = self.sign_token(license_key, machine_id)
+        return response
+
+    def sign_token(self, license_key, machine_id):
+        """base64url(payload) + "." + base64url(Ed25519 signature over the encoded payload)"""
+        now = time.time()
+        payload = json.dumps({"license_key": license_key, "machine_id": machine_id,
+                              "exp": now + self.token_ttl, "refresh_after": now + self.refresh_after})
+        encoded = base64.urlsafe_b64encode(payload.encode('utf-8')).rstrip(b'=')
+        signature = base64.urlsafe_b64encode(self.signing_key.sign(encoded)).rstrip(b'=')
+        return (encoded + b'.' + signature).decode('ascii')
+
+class FakeLicenseHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        with server._count_lock:
+            server.request_count += 1
+        payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+
+        if server.delay:
+            time.sleep(server.delay)
+        if server.fail_rate and random.random() < server.fail_rate:
+            self._send_json(503, {"error": "injected failure"})
+            return
+
+        if self.path.endswith('/batch'):
+            results = [server.verify(item.get('license_key', ''), item.get('machine_id', ''))
+                       for item in payload.get('licenses', [])]
+            self._send_json(200, {"results": results})
+        else:
+            self._send_json(200, server.verify(payload.get('license_key', ''), payload.get('machine_id', '')))
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    server = FakeLicenseServer(port=port)
+    print(f"Fake license server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
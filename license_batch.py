@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Validate many licenses at once, e.g. when provisioning a lab of workstations.
+
+Usage:
+    python license_batch.py pairs.csv [--api-url URL] [--batch-url URL] [--workers N] [--output results.jsonl]
+    python license_batch.py --bench [NUM_PAIRS]
+
+Input is a CSV with license_key,machine_id columns (header optional) or a
+JSONL file with one {"license_key": ..., "machine_id": ...} object per line.
+Results are written as JSONL in completion order.
+"""
+import sys
+import csv
+import json
+import time
+import argparse
+
+from license_client import validate_licenses_batch
+
+DEFAULT_API_URL = "https://demo.freshlook.hu/license-api/verify_license.php"
+
+def read_pairs(path):
+    """Yield (license_key, machine_id) pairs from a CSV or JSONL file"""
+    with open(path, 'r', newline='') as f:
+        if path.lower().endswith(('.jsonl', '.ndjson')):
+            for line in f:
+                line = line.strip()
+                if line:
+                    item = json.loads(line)
+                    yield item['license_key'], str(item['machine_id'])
+        else:
+            for row in csv.reader(f):
+                if not row or row[0].strip().lower() == 'license_key':
+                    continue
+                yield row[0].strip(), row[1].strip()
+
+def run_batch(pairs, api_url, batch_url=None, workers=8, output=sys.stdout):
+    """Validate pairs and write one JSON result per line; return (valid, invalid, failed)"""
+    valid = invalid = failed = 0
+    for license_key, machine_id, success, data, error in validate_licenses_batch(
+            pairs, api_url, max_workers=workers, batch_url=batch_url):
+        if not success or not isinstance(data, dict):
+            failed += 1
+            status = "error"
+            data = None
+            error = error or "Malformed result entry"
+        elif data.get("status") == "valid":
+            valid += 1
+            status = "valid"
+        else:
+            invalid += 1
+            status = data.get("status", "invalid")
+        output.write(json.dumps({
+            "license_key": license_key,
+            "machine_id": machine_id,
+            "status": status,
+            "reason": (data or {}).get("reason") or error,
+        }) + "\n")
+    return valid, invalid, failed
+
+def run_benchmark(num_pairs=10000):
+    """Measure throughput against a local stand-in server"""
+    import io
+    from fake_license_server import FakeLicenseServer
+
+    server = FakeLicenseServer().start()
+    pairs = [(f"KEY-{i:06d}", f"{100000000000 + i}") for i in range(num_pairs)]
+    print(f"Validating {num_pairs} pairs against {server.url}")
+
+    runs = [("per-key, 1 worker", None, 1), ("per-key, 8 workers", None, 8),
+            ("per-key, 32 workers", None, 32), ("batch endpoint, 8 workers", server.batch_url, 8)]
+    for label, batch_url, workers in runs:
+        server.request_count = 0
+        start = time.perf_counter()
+        valid, invalid, failed = run_batch(pairs, server.url, batch_url, workers, io.StringIO())
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<28} {elapsed:6.2f}s  {num_pairs / elapsed:8.0f} pairs/s  "
+              f"{server.request_count} requests  ({valid} valid, {failed} failed)")
+    server.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch license validation")
+    parser.add_argument('input', nargs='?', help="CSV or JSONL file of license_key,machine_id pairs")
+    parser.add_argument('--api-url', default=DEFAULT_API_URL)
+    parser.add_argument('--batch-url', help="Multi-key endpoint, if the server supports one")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--output', help="Write results here instead of stdout")
+    parser.add_argument('--bench', nargs='?', type=int, const=10000, metavar='NUM_PAIRS',
+                        help="Run the throughput benchmark against a local fake server")
+    args = parser.parse_args()
+
+    if args.bench:
+        run_benchmark(args.bench)
+        return 0
+    if not args.input:
+        parser.error("an input file is required")
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        start = time.perf_counter()
+        valid, invalid, failed = run_batch(read_pairs(args.input), args.api_url,
+                                           args.batch_url, args.workers, output)
+        elapsed = time.perf_counter() - start
+    finally:
+        if args.output:
+            output.close()
+
+    total = valid + invalid + failed
+    print(f"Validated {total} licenses in {elapsed:.1f}s: {valid} valid, {invalid} invalid, {failed} failed",
+          file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
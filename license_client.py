@@ -1,13 +1,31 @@
-import uuid
-import requests
+# Only the standard library is imported here so that the cached-license
+# path stays fast; requests, wx and cryptography are imported on first use.
+import base64
 import sys
 import json
 import os
+import threading
+import time
 from datetime import datetime, timedelta
+from license_revocation import RevocationList
+from machine_fingerprint import get_machine_fingerprint
+import license_metrics
 
 def get_machine_id():
-    """Returns MAC address as integer"""
-    return str(uuid.getnode())
+    """Returns a stable fingerprint of this machine (see machine_fingerprint)
+    
+    Licenses activated with the old MAC-based ID keep working: that ID is
+    adopted on first run when the cached license was bound to one of this
+    machine's network cards. The cache file is read directly, so a cache
+    older than 30 days still hands over its ID.
+    """
+    def cached_machine_id():
+        try:
+            return _read_cache_file(get_cache_file_path()).get('machine_id')
+        except Exception:
+            return None
+    
+    return get_machine_fingerprint(get_fingerprint_file_path(), legacy_id=cached_machine_id)
 
 def get_cache_file_path():
     """Get the path to the license cache file"""
@@ -20,16 +38,117 @@ def get_cache_file_path():
     
     return os.path.join(base_path, "license_cache.json")
 
+def get_fingerprint_file_path():
+    """Get the path to the saved machine fingerprint, next to the license cache"""
+    return os.path.join(os.path.dirname(get_cache_file_path()), "machine_fingerprint.json")
+
+def get_revocation_file_path():
+    """Get the path to the local revocation list, next to the license cache"""
+    return os.path.join(os.path.dirname(get_cache_file_path()), "license_revocations.bin")
+
+# Bump when the cache layout changes; older layouts are still read
+CACHE_SCHEMA_VERSION = 2
+CACHE_LOCK_TIMEOUT = 10.0
+
+# Parsed cache keyed by (path, mtime_ns, size) so unchanged files are not re-read
+_cache_memo = {}
+_cache_memo_lock = threading.Lock()
+
+class _FileLock:
+    """Cross-process exclusive lock on a sidecar .lock file"""
+    
+    def __init__(self, path, timeout=CACHE_LOCK_TIMEOUT):
+        self.lock_path = path + '.lock'
+        self.timeout = timeout
+        self._file = None
+    
+    def __enter__(self):
+        self._file = open(self.lock_path, 'a+')
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                if os.name == 'nt':
+                    import msvcrt
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                else:
+                    import fcntl
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return self
+            except OSError:
+                if time.monotonic() >= deadline:
+                    self._file.close()
+                    raise TimeoutError(f"Timed out waiting for {self.lock_path}")
+                time.sleep(0.01)
+    
+    def __exit__(self, *exc):
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+
+def _atomic_write_json(path, data):
+    """Write JSON to a temp file in the same directory and rename it into place"""
+    import tempfile
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '-', dir=os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _read_cache_file(cache_file):
+    """Return the parsed cache file, reusing the last parse if it has not changed"""
+    stat = os.stat(cache_file)
+    memo_key = (cache_file, stat.st_mtime_ns, stat.st_size)
+    with _cache_memo_lock:
+        if memo_key in _cache_memo:
+            return _cache_memo[memo_key]
+    
+    with license_metrics.span('cache_read'):
+        with open(cache_file, 'r') as f:
+            text = f.read()
+    with license_metrics.span('json_parse'):
+        cache_data = json.loads(text)
+    with _cache_memo_lock:
+        _cache_memo.clear()
+        _cache_memo[memo_key] = cache_data
+    return cache_data
+
 def load_cached_license():
-    """Load cached license data if it exists and is still valid"""
+    """Load cached license data if it exists and is still valid
+    
+    Unreadable, expired or newer-schema caches are ignored rather than
+    deleted, so a concurrent writer's cache is never wiped; the next
+    successful save replaces them.
+    """
     cache_file = get_cache_file_path()
     
-    if not os.path.exists(cache_file):
+    try:
+        cache_data = _read_cache_file(cache_file)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Error reading cache: {e}")
         return None
     
     try:
-        with open(cache_file, 'r') as f:
-            cache_data = json.load(f)
+        if cache_data.get('schema', 1) > CACHE_SCHEMA_VERSION:
+            print("Cache was written by a newer version, ignoring it")
+            return None
         
         # Check if cache is still valid (not older than 30 days)
         cached_time_str = cache_data.get('cached_time', '2000-01-01')
@@ -37,19 +156,12 @@ def load_cached_license():
         current_time = datetime.now()
         
         if current_time - cached_time < timedelta(days=30):
-            return cache_data
+            return dict(cache_data)
         else:
-            # Cache expired, remove it
             print(f"Cache expired (cached: {cached_time}, current: {current_time})")
-            os.remove(cache_file)
             return None
     except Exception as e:
-        # If there's any error reading cache, remove it and return None
         print(f"Error reading cache: {e}")
-        try:
-            os.remove(cache_file)
-        except:
-            pass
         return None
 
 def save_license_cache(license_key, machine_id, api_url, server_response):
@@ -57,6 +169,7 @@ def save_license_cache(license_key, machine_id, api_url, server_response):
     cache_file = get_cache_file_path()
     
     cache_data = {
+        'schema': CACHE_SCHEMA_VERSION,
         'license_key': license_key,
         'machine_id': machine_id,
         'api_url': api_url,
@@ -66,19 +179,22 @@ def save_license_cache(license_key, machine_id, api_url, server_response):
     }
     
     try:
-        with open(cache_file, 'w') as f:
-            json.dump(cache_data, f, indent=2)
+        with _FileLock(cache_file):
+            _atomic_write_json(cache_file, cache_data)
         return True
-    except Exception:
+    except Exception as e:
+        print(f"Error saving cache: {e}")
         return False
 
 def clear_license_cache():
     """Clear the license cache file"""
     cache_file = get_cache_file_path()
+    _license_checked.clear()
     try:
-        if os.path.exists(cache_file):
-            os.remove(cache_file)
-            return True
+        with _FileLock(cache_file):
+            if os.path.exists(cache_file):
+                os.remove(cache_file)
+                return True
     except Exception:
         pass
     return False
@@ -177,30 +293,585 @@ def prompt_license_key_gui(machine_id):
             print("\nAborted.")
             sys.exit(1)
 
-def validate_license_with_server(license_key, machine_id, api_url):
-    """Validate license with the server and return response"""
+# HTTP transport settings for the license server
+HTTP_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+HTTP_MAX_RETRIES = 2  # Extra attempts after the first one
+HTTP_DEADLINE = 10.0  # Seconds for all attempts together, so a hung server cannot stall startup
+HTTP_BACKOFF_BASE = 0.5  # Seconds, doubled per attempt
+HTTP_BACKOFF_MAX = 4.0
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def get_http_session():
+    """Return the process-wide pooled session used for license requests"""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _http_session = session
+        return _http_session
+
+class CircuitBreaker:
+    """Fail fast after repeated server failures, then let one trial request through"""
+    
+    def __init__(self, failure_threshold=3, reset_timeout=60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+    
+    def allow_request(self):
+        """Return True if a request may be sent to the server now"""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Let a single trial request probe the server
+                self.state = 'half-open'
+                return True
+            return False
+    
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+    
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half-open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+# One breaker per endpoint, shared by every validation in this process
+_circuit_breakers = {}
+_circuit_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(url):
+    """Return the process-wide circuit breaker for an endpoint"""
+    with _circuit_breakers_lock:
+        breaker = _circuit_breakers.get(url)
+        if breaker is None:
+            breaker = _circuit_breakers[url] = CircuitBreaker()
+        return breaker
+
+# Hedging across mirror endpoints
+HEDGE_PERCENTILE = 0.95  # Send a hedged request once the fastest mirror exceeds this latency percentile
+HEDGE_DELAY_DEFAULT = 1.0  # Seconds, used until enough latencies have been observed
+HEDGE_MIN_SAMPLES = 5
+ENDPOINT_FAILURE_PENALTY = 10.0  # Seconds recorded as latency when an endpoint fails
+
+_endpoint_latencies = {}
+_endpoint_latencies_lock = threading.Lock()
+
+def record_endpoint_latency(url, seconds):
+    from collections import deque
+    with _endpoint_latencies_lock:
+        samples = _endpoint_latencies.get(url)
+        if samples is None:
+            samples = _endpoint_latencies[url] = deque(maxlen=50)
+        samples.append(seconds)
+
+def endpoint_latency_percentile(url, percentile):
+    """Return the observed latency percentile for an endpoint, or None if unknown"""
+    with _endpoint_latencies_lock:
+        samples = sorted(_endpoint_latencies.get(url, ()))
+    if not samples:
+        return None
+    return samples[min(len(samples) - 1, int(len(samples) * percentile))]
+
+def order_endpoints(urls):
+    """Sort endpoints by median latency; endpoints never measured follow in their given order"""
+    def key(indexed):
+        index, url = indexed
+        median = endpoint_latency_percentile(url, 0.5)
+        return (median is None, median or 0.0, index)
+    return [url for _, url in sorted(enumerate(urls), key=key)]
+
+def _hedge_delay(url):
+    with _endpoint_latencies_lock:
+        num_samples = len(_endpoint_latencies.get(url, ()))
+    if num_samples < HEDGE_MIN_SAMPLES:
+        return HEDGE_DELAY_DEFAULT
+    return endpoint_latency_percentile(url, HEDGE_PERCENTILE)
+
+def _backoff_delay(attempt):
+    """Full-jitter exponential backoff for the given retry attempt"""
+    import random
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * (2 ** attempt)))
+
+# url -> monotonic time before which the server asked us not to call again
+_retry_after_until = {}
+_retry_after_lock = threading.Lock()
+
+def _parse_retry_after(value):
+    """Parse a Retry-After header (delta seconds or HTTP date) into seconds"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def get_retry_after(url):
+    """Seconds until the server's last Retry-After hint for url expires (0 if none)"""
+    with _retry_after_lock:
+        until = _retry_after_until.get(url)
+    return max(0.0, until - time.monotonic()) if until else 0.0
+
+def _post_json(url, payload, cancel=None, max_retries=HTTP_MAX_RETRIES, deadline=HTTP_DEADLINE,
+               shared_breaker=True):
+    """POST JSON through the pooled session with retries and the circuit breaker
+    
+    Setting the optional `cancel` event stops the request before it is sent,
+    and drops the response unread if it is set while waiting. All attempts
+    and backoff sleeps together take at most `deadline` seconds: each
+    attempt's timeouts are capped by what is left of it. With
+    shared_breaker=False the request gets a breaker of its own, so its
+    failure neither trips nor is blocked by the endpoint's shared one.
+    """
+    if cancel is not None and cancel.is_set():
+        return False, None, "Cancelled"
+    breaker = get_circuit_breaker(url) if shared_breaker else CircuitBreaker()
+    if not breaker.allow_request():
+        license_metrics.count('license_http_requests', result='circuit_open')
+        return False, None, "License server unavailable (circuit open)"
+    retry_after = get_retry_after(url)
+    if retry_after:
+        license_metrics.count('license_http_requests', result='retry_after')
+        return False, None, f"License server asked to retry after {retry_after:.0f}s"
+    
+    import requests
+    session = get_http_session()
+    last_error = None
+    give_up_at = time.monotonic() + deadline
+    for attempt in range(max_retries + 1):
+        if attempt:
+            if cancel is not None and cancel.is_set():
+                breaker.record_failure()
+                return False, None, "Cancelled"
+            license_metrics.count('license_http_retries')
+            time.sleep(min(_backoff_delay(attempt - 1), max(0.0, give_up_at - time.monotonic())))
+        remaining = give_up_at - time.monotonic()
+        if remaining <= 0.05:
+            last_error = f"{last_error} (gave up after {deadline:.0f}s)" if last_error else "License request deadline exceeded"
+            break
+        try:
+            with license_metrics.span('network'):
+                resp = session.post(url, json=payload, stream=cancel is not None,
+                                    timeout=(min(HTTP_TIMEOUT[0], remaining), min(HTTP_TIMEOUT[1], remaining)))
+            license_metrics.count('license_http_requests', result=str(resp.status_code))
+            if cancel is not None and cancel.is_set():
+                # Another endpoint already answered; close without reading the body
+                resp.close()
+                if resp.status_code in RETRY_STATUS_CODES:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                return False, None, "Cancelled"
+            if resp.status_code in RETRY_STATUS_CODES:
+                resp.close()
+                last_error = f"{resp.status_code} Server Error for url: {url}"
+                retry_after = _parse_retry_after(resp.headers.get('Retry-After'))
+                if retry_after is not None:
+                    # The server told us when to come back; do not retry before then
+                    with _retry_after_lock:
+                        _retry_after_until[url] = time.monotonic() + retry_after
+                    # Counts as a failure so a half-open breaker re-opens instead of staying half-open
+                    breaker.record_failure()
+                    return False, None, f"{last_error} (retry after {retry_after:.0f}s)"
+                continue
+            resp.raise_for_status()
+            data = resp.json()
+            breaker.record_success()
+            return True, data, None  # Success, response data, no error
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            license_metrics.count('license_http_requests', result=type(e).__name__)
+            last_error = str(e)
+        except requests.exceptions.RequestException as e:
+            # Client errors are not retried, but the server did answer
+            breaker.record_success()
+            return False, None, str(e)  # Failed, no data, error message
+        except Exception as e:
+            breaker.record_failure()
+            return False, None, str(e)  # Failed, no data, error message
+    
+    breaker.record_failure()
+    return False, None, last_error  # Failed, no data, error message
+
+def _hedged_post_json(urls, payload, hedge_delay=None, shared_breaker=True):
+    """POST to mirror endpoints, hedging to the next one when the current one is slow
+    
+    The fastest known endpoint is tried first. If it has not answered within
+    hedge_delay (default: its HEDGE_PERCENTILE latency), or it fails, the
+    next endpoint is tried too. The first successful answer wins and the
+    remaining requests are cancelled. Hedging takes the place of retries,
+    so each endpoint gets a single attempt.
+    """
+    import queue
+    
+    endpoints = order_endpoints(list(dict.fromkeys(url for url in urls if url)))
+    if not endpoints:
+        return False, None, "No license endpoints configured"
+    if len(endpoints) == 1:
+        return _post_json(endpoints[0], payload, shared_breaker=shared_breaker)
+    results = queue.Queue()
+    cancel = threading.Event()
+    
+    def attempt(url):
+        start = time.monotonic()
+        result = _post_json(url, payload, cancel, max_retries=0, shared_breaker=shared_breaker)
+        if result[0]:
+            record_endpoint_latency(url, time.monotonic() - start)
+        elif not cancel.is_set():
+            record_endpoint_latency(url, ENDPOINT_FAILURE_PENALTY)
+        results.put(result)
+    
+    def launch(index):
+        threading.Thread(target=attempt, args=(endpoints[index],), name="license-hedge", daemon=True).start()
+        return index + 1
+    
+    launched = launch(0)
+    finished = 0
+    last_result = None
+    while finished < launched:
+        delay = hedge_delay if hedge_delay is not None else _hedge_delay(endpoints[launched - 1])
+        try:
+            result = results.get(timeout=delay if launched < len(endpoints) else None)
+        except queue.Empty:
+            license_metrics.count('license_hedged_requests')
+            launched = launch(launched)
+            continue
+        finished += 1
+        if result[0]:
+            cancel.set()
+            return result
+        last_result = result
+        if launched < len(endpoints):
+            launched = launch(launched)
+    return last_result
+
+def validate_license_with_server(license_key, machine_id, api_url, hedge_delay=None, shared_breaker=True):
+    """Validate license with the server and return response
+    
+    api_url may be a list of mirror endpoints, in which case slow or failing
+    mirrors are hedged against the others (see _hedged_post_json).
+    """
     payload = {
         "license_key": license_key,
         "machine_id": machine_id
     }
+    if isinstance(api_url, (list, tuple)):
+        return _hedged_post_json(api_url, payload, hedge_delay, shared_breaker)
+    return _post_json(api_url, payload, shared_breaker=shared_breaker)
+
+def _batch_result(key, mid, success, data, error):
+    """One result tuple; an answer that is not a JSON object fails just this pair"""
+    if success and not isinstance(data, dict):
+        return key, mid, False, None, "Malformed result entry"
+    return key, mid, success, data, error
+
+def _validate_chunk(chunk, api_url, batch_url):
+    """Validate a list of (license_key, machine_id) pairs and return result tuples
+    
+    Each request has its own circuit breaker, so a few failing pairs do not
+    fail the rest of the batch fast, nor the app's checks against the endpoint.
+    """
+    if batch_url is None:
+        return [_batch_result(key, mid, *validate_license_with_server(key, mid, api_url, shared_breaker=False))
+                for key, mid in chunk]
+    
+    payload = {"licenses": [{"license_key": key, "machine_id": mid} for key, mid in chunk]}
+    success, data, error = _post_json(batch_url, payload, shared_breaker=False)
+    results = data.get("results") if success and isinstance(data, dict) else None
+    if not isinstance(results, list) or len(results) != len(chunk):
+        error = error or "Malformed batch response"
+        return [(key, mid, False, None, error) for key, mid in chunk]
+    return [_batch_result(key, mid, True, result, None) for (key, mid), result in zip(chunk, results)]
+
+def validate_licenses_batch(pairs, api_url, max_workers=8, batch_url=None, batch_size=100):
+    """Validate many (license_key, machine_id) pairs concurrently
+    
+    Yields (license_key, machine_id, success, data, error) tuples as they
+    complete, so results stream back in completion order. At most
+    2 * max_workers requests are in flight, and `pairs` is consumed lazily.
+    When the server has a multi-key endpoint, pass it as batch_url and
+    pairs are sent batch_size at a time.
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    
+    chunk_size = batch_size if batch_url else 1
+    pairs = iter(pairs)
+    
+    def next_chunk():
+        chunk = []
+        for key, mid in pairs:
+            chunk.append((key, mid))
+            if len(chunk) >= chunk_size:
+                break
+        return chunk
+    
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="license-batch") as executor:
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_workers * 2:
+                chunk = next_chunk()
+                if not chunk:
+                    exhausted = True
+                    break
+                pending.add(executor.submit(_validate_chunk, chunk, api_url, batch_url))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+# Base64-encoded raw Ed25519 public key used to verify signed license tokens.
+# build_app.py --license-public-key stamps it into the build as the
+# license_public_key module; it is deliberately not read from the environment.
+# Without it, server responses and the cache are trusted as plain JSON.
+try:
+    from license_public_key import LICENSE_PUBLIC_KEY
+except ImportError:
+    LICENSE_PUBLIC_KEY = None
+
+def _b64url_decode(data):
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+def verify_license_token(token, license_key, machine_id, public_key=None):
+    """Verify a signed license token locally and return its payload, or None
+    
+    Tokens have the form base64url(payload_json) + "." + base64url(signature),
+    where the signature is Ed25519 over the encoded payload. The payload
+    carries license_key, machine_id, exp and refresh_after (Unix times).
+    """
+    public_key = public_key or LICENSE_PUBLIC_KEY
+    if not token or not public_key:
+        return None
+    
+    with license_metrics.span('token_verify'):
+        return _verify_license_token(token, license_key, machine_id, public_key)
+
+def _verify_license_token(token, license_key, machine_id, public_key):
+    try:
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+        from cryptography.exceptions import InvalidSignature
+        
+        encoded_payload, encoded_signature = token.split('.')
+        key = Ed25519PublicKey.from_public_bytes(base64.b64decode(public_key))
+        try:
+            key.verify(_b64url_decode(encoded_signature), encoded_payload.encode('ascii'))
+        except InvalidSignature:
+            print("❌ License token signature is invalid")
+            return None
+        payload = json.loads(_b64url_decode(encoded_payload))
+    except Exception as e:
+        print(f"Error verifying license token: {e}")
+        return None
     
+    if payload.get('license_key') != license_key or payload.get('machine_id') != machine_id:
+        print("❌ License token does not match this license")
+        return None
+    if time.time() >= payload.get('exp', 0):
+        print("License token expired")
+        return None
+    return payload
+
+def _token_accepted(server_data, license_key, machine_id, public_key=None):
+    """Return False if the server sent no token, or one that does not verify, while a key is configured"""
+    if not (public_key or LICENSE_PUBLIC_KEY):
+        return True
+    token = server_data.get('token')
+    if not token:
+        # A response without a token must not downgrade a signed setup to plain JSON
+        print("❌ License response is not signed")
+        return False
+    return verify_license_token(token, license_key, machine_id, public_key) is not None
+
+_revocation_list = None
+_revocation_lock = threading.Lock()
+
+def get_revocation_list():
+    """Return the local revocation list, loading it from disk once per process"""
+    global _revocation_list
+    with _revocation_lock:
+        if _revocation_list is None:
+            _revocation_list = RevocationList.load(get_revocation_file_path())
+        return _revocation_list
+
+def is_license_revoked_locally(license_key):
+    """Check the local revocation list without any network access"""
+    return get_revocation_list().is_revoked(license_key)
+
+def sync_revocation_list(revocation_url):
+    """Fetch revocations added or removed since our list version and persist them"""
+    global _revocation_list
+    revocations = get_revocation_list()
     try:
-        resp = requests.post(api_url, json=payload, timeout=10)
+        resp = get_http_session().post(revocation_url, json={"since": revocations.version}, timeout=HTTP_TIMEOUT)
         resp.raise_for_status()
-        data = resp.json()
-        return True, data, None  # Success, response data, no error
-    except requests.exceptions.RequestException as e:
-        return False, None, str(e)  # Failed, no data, error message
+        delta = resp.json()
+    except Exception as e:
+        print(f"⚠️ Could not sync revocation list: {e}")
+        return False
+    
+    # Apply to a copy so concurrent lookups keep seeing a consistent list
+    updated = revocations.copy()
+    try:
+        changed = updated.apply_delta(delta)
     except Exception as e:
-        return False, None, str(e)  # Failed, no data, error message
+        print(f"⚠️ Invalid revocation list update: {e}")
+        return False
+    if changed:
+        updated.save(get_revocation_file_path())
+        with _revocation_lock:
+            _revocation_list = updated
+    return True
+
+def start_background_revocation_sync(revocation_url):
+    """Sync the revocation list on a daemon thread and return the thread"""
+    thread = threading.Thread(
+        target=sync_revocation_list,
+        args=(revocation_url,),
+        name="license-revocation-sync",
+        daemon=True
+    )
+    thread.start()
+    return thread
+
+# Set when a background revalidation finds that the cached license was revoked
+license_revoked = threading.Event()
+
+def revalidate_cached_license(license_key, machine_id, api_url, on_revoked=None, public_key=None):
+    """Re-check a cached license with the server and handle revocation"""
+    server_success, server_data, server_error = validate_license_with_server(
+        license_key, machine_id, api_url
+    )
+    
+    if not server_success:
+        print(f"⚠️ Background revalidation failed ({server_error}), keeping cached license")
+        return None
+    
+    if server_data.get("status") == "valid" and _token_accepted(server_data, license_key, machine_id, public_key):
+        save_license_cache(license_key, machine_id, api_url, server_data)
+        return True
+    
+    reason = server_data.get('reason', 'unknown')
+    print(f"❌ License invalidated by server: {reason}")
+    clear_license_cache()
+    license_revoked.set()
+    _license_checked.clear()
+    if on_revoked:
+        try:
+            on_revoked(reason)
+        except Exception as e:
+            print(f"Error in revocation callback: {e}")
+    return False
+
+def start_background_revalidation(license_key, machine_id, api_url, on_revoked=None, public_key=None):
+    """Revalidate a cached license on a daemon thread and return the thread"""
+    thread = threading.Thread(
+        target=revalidate_cached_license,
+        args=(license_key, machine_id, api_url, on_revoked, public_key),
+        name="license-revalidation",
+        daemon=True
+    )
+    thread.start()
+    return thread
 
-def check_license(api_url):
-    """Main license validation function with all the requested logic"""
-    machine_id = get_machine_id()
+# api_url -> True once check_license has succeeded in this process
+_license_checked = {}
+
+def check_license(api_url, revalidate_in_background=False, on_revoked=None, public_key=None,
+                  revocation_url=None, scheduler=None):
+    """Main license validation function with all the requested logic
+    
+    api_url may be a single URL or a list of mirror endpoints to hedge across.
+    
+    With revalidate_in_background=True a valid cached license is accepted
+    immediately and the server check runs on a daemon thread. If the server
+    revokes the license, the cache is cleared, `license_revoked` is set and
+    on_revoked(reason) is called from that thread. Passing a
+    license_scheduler.RevalidationScheduler as `scheduler` replaces that
+    immediate check with jittered periodic ones, started once the license
+    has been accepted.
+    
+    When a public key is configured (argument or the LICENSE_PUBLIC_KEY
+    stamped into the build), a cached signed token is verified locally and
+    the server is only contacted once the token's refresh_after time has
+    passed. Without a valid token the cache is not trusted for offline use,
+    and server responses without a token are rejected.
+    
+    A cached license listed in the local revocation list is rejected without
+    a network call. With revocation_url set, that list is delta-synced in
+    the background.
+    
+    Once a check succeeds, later calls in the same process return True
+    without touching disk or network until the license is cleared or revoked.
+    """
+    memo_key = tuple(api_url) if isinstance(api_url, list) else api_url
+    if _license_checked.get(memo_key):
+        license_metrics.count('license_outcome', outcome='memoized')
+        return True
+    
+    with license_metrics.span('check_license'):
+        result = _check_license(api_url, revalidate_in_background, on_revoked, public_key, revocation_url,
+                                scheduler)
+    if result:
+        _license_checked[memo_key] = True
+        if scheduler is not None:
+            scheduler.start()
+    return result
+
+def _check_license(api_url, revalidate_in_background, on_revoked, public_key, revocation_url, scheduler):
+    with license_metrics.span('machine_id'):
+        machine_id = get_machine_id()
+    public_key = public_key or LICENSE_PUBLIC_KEY
+    
+    if revocation_url:
+        start_background_revocation_sync(revocation_url)
     
     # Step 1: Check if we have a valid cached license
     cached = load_cached_license()
+    if cached and cached.get('machine_id') == machine_id and is_license_revoked_locally(cached['license_key']):
+        print("❌ License found in local revocation list")
+        license_metrics.count('license_outcome', outcome='revoked_locally')
+        clear_license_cache()
+        cached = None
+    
     if cached and cached.get('machine_id') == machine_id:
+        offline_ok = True
+        if public_key:
+            token = (cached.get('server_response') or {}).get('token')
+            token_payload = verify_license_token(token, cached['license_key'], machine_id, public_key)
+            if token_payload and time.time() < token_payload.get('refresh_after', 0):
+                print("✅ License token verified locally")
+                license_metrics.count('license_outcome', outcome='token_offline')
+                return True
+            offline_ok = token_payload is not None
+        
+        if revalidate_in_background and offline_ok:
+            if scheduler is not None:
+                print("✅ Found cached license, revalidation scheduled")
+            else:
+                print("✅ Found cached license, revalidating in background")
+                start_background_revalidation(cached['license_key'], machine_id, api_url, on_revoked, public_key)
+            license_metrics.count('license_outcome', outcome='cached_background')
+            return True
+        
         print("✅ Found cached license, validating with server...")
         
         # Step 2: Always contact the server to check for revocation
@@ -210,27 +881,34 @@ def check_license(api_url):
         
         if server_success:
             # Server is reachable
-            if server_data.get("status") == "valid":
+            if server_data.get("status") == "valid" and _token_accepted(server_data, cached['license_key'], machine_id, public_key):
                 print("✅ License validated with server - using cached license")
                 # Update cache with fresh server response
                 save_license_cache(cached['license_key'], machine_id, api_url, server_data)
+                license_metrics.count('license_outcome', outcome='cached_server_valid')
                 return True
             else:
                 # License was revoked or invalidated
                 print(f"❌ License invalidated by server: {server_data.get('reason', 'unknown')}")
+                license_metrics.count('license_outcome', outcome='revoked')
                 clear_license_cache()
                 # Fall through to prompt for new license
-        else:
+        elif offline_ok:
             # Server is unreachable, but we have valid cache
             print(f"⚠️ Server unreachable ({server_error}), using cached license")
+            license_metrics.count('license_outcome', outcome='cached_offline')
             return True  # Allow app to run with cached license
+        else:
+            print(f"❌ Server unreachable ({server_error}) and cached license could not be verified offline")
     
     # Step 3: No valid cache or license was revoked - prompt for new license
     print("🔑 License validation required")
-    license_key = prompt_license_key_gui(machine_id)
+    with license_metrics.span('dialog'):
+        license_key = prompt_license_key_gui(machine_id)
     
     if not license_key:
         print("❌ No license key provided")
+        license_metrics.count('license_outcome', outcome='no_key')
         return False
     
     # Step 4: Validate new license with server
@@ -239,18 +917,21 @@ def check_license(api_url):
     )
     
     if server_success:
-        if server_data.get("status") == "valid":
+        if server_data.get("status") == "valid" and _token_accepted(server_data, license_key, machine_id, public_key):
             print("✅ License valid. Welcome!")
             # Save to cache for 30 days
             save_license_cache(license_key, machine_id, api_url, server_data)
+            license_metrics.count('license_outcome', outcome='activated')
             return True
         else:
             print(f"❌ License invalid: {server_data.get('reason', 'unknown error')}")
+            license_metrics.count('license_outcome', outcome='invalid_key')
             return False
     else:
         # Server is unreachable and no valid cache
         print(f"❌ Server unreachable ({server_error}) and no valid cached license")
         print("Please check your internet connection and try again.")
+        license_metrics.count('license_outcome', outcome='server_unreachable')
         return False
 
 # Example usage:
@@ -0,0 +1,142 @@
+"""Lightweight timing spans and counters for the license flow.
+
+Disabled by default, in which case span() returns a shared no-op context
+manager and count() returns immediately. Set LICENSE_METRICS to a file path
+to enable collection and export on exit: paths ending in .json get a
+Chrome/Perfetto trace, anything else gets OpenMetrics text.
+"""
+import os
+import json
+import time
+import atexit
+import threading
+
+_enabled = False
+_spans = []  # (name, start_ns, duration_ns, thread_id)
+_counters = {}  # (name, sorted label items) -> value
+_lock = threading.Lock()
+_epoch_ns = time.perf_counter_ns()
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ('name', 'start_ns')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        duration_ns = time.perf_counter_ns() - self.start_ns
+        with _lock:
+            _spans.append((self.name, self.start_ns, duration_ns, threading.get_ident()))
+        return False
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+def span(name):
+    """Time a phase: `with license_metrics.span('network'): ...`"""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+def count(name, value=1, **labels):
+    """Increment a counter, e.g. count('license_outcome', outcome='token_offline')"""
+    if not _enabled:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in labels)
+    return '{' + escaped + '}'
+
+def openmetrics_text():
+    """Render spans as per-phase summaries and counters as OpenMetrics text"""
+    with _lock:
+        spans = list(_spans)
+        counters = dict(_counters)
+
+    phases = {}
+    for name, _, duration_ns, _ in spans:
+        total, n = phases.get(name, (0, 0))
+        phases[name] = (total + duration_ns, n + 1)
+
+    lines = []
+    if phases:
+        lines.append('# TYPE license_phase_seconds summary')
+        lines.append('# HELP license_phase_seconds Time spent in each phase of the license check.')
+        for name in sorted(phases):
+            total, n = phases[name]
+            labels = _format_labels([('phase', name)])
+            lines.append(f'license_phase_seconds_sum{labels} {total / 1e9:.9f}')
+            lines.append(f'license_phase_seconds_count{labels} {n}')
+
+    for metric in sorted({name for name, _ in counters}):
+        lines.append(f'# TYPE {metric} counter')
+        for (name, labels), value in sorted(counters.items()):
+            if name == metric:
+                lines.append(f'{metric}_total{_format_labels(labels)} {value}')
+    lines.append('# EOF')
+    return '\n'.join(lines) + '\n'
+
+def chrome_trace():
+    """Render spans as a Chrome trace (load in chrome://tracing or Perfetto)"""
+    pid = os.getpid()
+    with _lock:
+        events = [{
+            'name': name,
+            'ph': 'X',
+            'ts': (start_ns - _epoch_ns) / 1000,
+            'dur': duration_ns / 1000,
+            'pid': pid,
+            'tid': tid,
+        } for name, start_ns, duration_ns, tid in _spans]
+        counters = {f'{name}{_format_labels(labels)}': value for (name, labels), value in _counters.items()}
+    return {'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': {'counters': counters}}
+
+def export(path):
+    """Write collected metrics to path, as a JSON trace or OpenMetrics text"""
+    try:
+        with open(path, 'w') as f:
+            if path.endswith('.json'):
+                json.dump(chrome_trace(), f)
+            else:
+                f.write(openmetrics_text())
+        return True
+    except OSError as e:
+        print(f"Warning: could not write license metrics: {e}")
+        return False
+
+if os.environ.get('LICENSE_METRICS'):
+    enable()
+    atexit.register(export, os.environ['LICENSE_METRICS'])
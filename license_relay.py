@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""Site-local license relay.
+
+Answers verify_license requests from machines on the LAN out of an in-memory
+LRU+TTL cache of upstream responses. Concurrent misses for the same
+(license_key, machine_id) share one upstream call, and negative answers are
+cached for a shorter time. Point the app's api_url at this relay.
+
+Usage:
+    python license_relay.py [--upstream URL] [--host HOST] [--port PORT]
+                            [--ttl SECONDS] [--negative-ttl SECONDS] [--max-entries N]
+"""
+import re
+import sys
+import json
+import time
+import argparse
+import threading
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from license_client import validate_license_with_server
+
+DEFAULT_UPSTREAM_URL = "https://demo.freshlook.hu/license-api/verify_license.php"
+# How validate_license_with_server reports a 4xx answer (requests' HTTPError message)
+_CLIENT_ERROR_RE = re.compile(r'^(4\d\d) Client Error')
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a per-entry TTL
+
+    Expired entries are kept for another `retention` seconds so they can
+    still be served stale, and are removed by prune().
+    """
+
+    def __init__(self, max_entries=100000, retention=0.0, prune_interval=60.0):
+        self.max_entries = max_entries
+        self.retention = retention
+        self.prune_interval = prune_interval
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_prune = time.monotonic()
+
+    def get(self, key, max_stale=0.0):
+        """Return (value, is_fresh), or (None, False) if missing or more than max_stale past expiry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+            value, expires_at = entry
+            now = time.monotonic()
+            if now >= expires_at + max_stale:
+                return None, False
+            self._entries.move_to_end(key)
+            return value, now < expires_at
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if time.monotonic() - self._last_prune >= self.prune_interval:
+                self._prune_locked()
+
+    def prune(self):
+        """Drop entries that are past their expiry plus the retention window"""
+        with self._lock:
+            self._prune_locked()
+
+    def _prune_locked(self):
+        now = time.monotonic()
+        self._last_prune = now
+        for key in [key for key, (_, expires_at) in self._entries.items() if now >= expires_at + self.retention]:
+            del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+class _InflightCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class LicenseRelay:
+    """Cache and coalesce license verifications in front of the upstream server"""
+
+    def __init__(self, upstream_url, ttl=300.0, negative_ttl=30.0, stale_if_error=3600.0, max_entries=100000):
+        self.upstream_url = upstream_url
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_if_error = stale_if_error
+        self.cache = TTLCache(max_entries, retention=stale_if_error)
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'stale': 0, 'upstream_errors': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def stats_snapshot(self):
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def verify(self, license_key, machine_id):
+        """Return (http_status, response_dict) for a verification request"""
+        key = (license_key, machine_id)
+        cached, fresh = self.cache.get(key)
+        if fresh:
+            self._count('hits')
+            return 200, cached
+
+        with self._inflight_lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _InflightCall()
+        if not leader:
+            self._count('coalesced')
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        self._count('misses')
+        try:
+            call.result = self._fetch(key)
+        except Exception as e:
+            # Followers raise the leader's error instead of returning no result
+            call.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            call.done.set()
+        return call.result
+
+    def _fetch(self, key):
+        success, data, error = validate_license_with_server(key[0], key[1], self.upstream_url)
+        if success:
+            ttl = self.ttl if data.get("status") == "valid" else self.negative_ttl
+            self.cache.set(key, data, ttl)
+            return 200, data
+
+        client_error = _CLIENT_ERROR_RE.match(error or '')
+        if client_error:
+            # Upstream answered and rejected the request; that is not a gateway failure
+            return int(client_error.group(1)), {"status": "error", "reason": error}
+
+        self._count('upstream_errors')
+        stale, _ = self.cache.get(key, max_stale=self.stale_if_error)
+        if stale is not None:
+            self._count('stale')
+            return 200, stale
+        return 502, {"status": "error", "reason": f"Upstream license server unavailable: {error}"}
+
+class RelayRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            license_key = payload['license_key']
+            machine_id = payload['machine_id']
+        except Exception:
+            self._send_json(400, {"status": "error", "reason": "Expected JSON with license_key and machine_id"})
+            return
+        try:
+            status, data = self.server.relay.verify(license_key, machine_id)
+        except Exception as e:
+            status, data = 500, {"status": "error", "reason": f"License relay error: {e}"}
+        self._send_json(status, data)
+
+    def do_GET(self):
+        relay = self.server.relay
+        self._send_json(200, {"entries": len(relay.cache), **relay.stats_snapshot()})
+
+class RelayServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, relay, host='0.0.0.0', port=8780):
+        super().__init__((host, port), RelayRequestHandler)
+        self.relay = relay
+
+def main():
+    parser = argparse.ArgumentParser(description="Site-local license relay")
+    parser.add_argument('--upstream', default=DEFAULT_UPSTREAM_URL)
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8780)
+    parser.add_argument('--ttl', type=float, default=300.0, help="Seconds to cache valid responses")
+    parser.add_argument('--negative-ttl', type=float, default=30.0, help="Seconds to cache invalid/revoked responses")
+    parser.add_argument('--stale-if-error', type=float, default=3600.0,
+                        help="Seconds an expired response may still be served while upstream is down")
+    parser.add_argument('--max-entries', type=int, default=100000)
+    args = parser.parse_args()
+
+    relay = LicenseRelay(args.upstream, args.ttl, args.negative_ttl, args.stale_if_error, args.max_entries)
+    server = RelayServer(relay, args.host, args.port)
+    print(f"License relay listening on http://{args.host}:{args.port}/ -> {args.upstream}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
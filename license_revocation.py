@@ -0,0 +1,241 @@
+import os
+import sys
+import math
+import time
+import struct
+import hashlib
+
+# File layout: header, Bloom filter bits, then sorted 16-byte key digests
+FILE_MAGIC = b'KALREV01'
+HEADER_FORMAT = '<8sQQIQ'  # magic, version, m_bits, k, count
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+DIGEST_SIZE = 16
+FALSE_POSITIVE_RATE = 0.001
+
+def revocation_key_hash(license_key):
+    """Digest used to identify a revoked license without storing the key itself"""
+    return hashlib.sha256(license_key.encode('utf-8')).digest()[:DIGEST_SIZE]
+
+def _digest_from_hex(value):
+    # The server publishes full SHA-256 hex digests of revoked keys
+    return bytes.fromhex(value)[:DIGEST_SIZE]
+
+class BloomFilter:
+    """Fixed-size Bloom filter keyed by pre-hashed digests"""
+
+    def __init__(self, m_bits, k, bits=None):
+        self.m_bits = m_bits
+        self.k = k
+        self.bits = bytearray(bits) if bits is not None else bytearray((m_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate=FALSE_POSITIVE_RATE):
+        capacity = max(capacity, 1024)
+        m_bits = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        k = max(1, int(round(m_bits / capacity * math.log(2))))
+        return cls(m_bits, k)
+
+    def _positions(self, digest):
+        # Double hashing over the two halves of the digest
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:16], 'little') | 1
+        m_bits = self.m_bits
+        return [(h1 + i * h2) % m_bits for i in range(self.k)]
+
+    def add(self, digest):
+        bits = self.bits
+        for pos in self._positions(digest):
+            bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, digest):
+        bits = self.bits
+        for pos in self._positions(digest):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+class RevocationList:
+    """Local set of revoked license digests with a Bloom filter in front"""
+
+    def __init__(self, version=0, digests=b'', bloom=None):
+        self.version = version
+        # Sorted, concatenated 16-byte digests; searched in place
+        self.digests = digests
+        self.count = len(digests) // DIGEST_SIZE
+        self.bloom = bloom or self._build_bloom(digests, self.count)
+
+    @staticmethod
+    def _build_bloom(digests, count):
+        bloom = BloomFilter.for_capacity(count * 2)
+        for offset in range(0, len(digests), DIGEST_SIZE):
+            bloom.add(digests[offset:offset + DIGEST_SIZE])
+        return bloom
+
+    def _contains_exact(self, digest):
+        digests = self.digests
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = mid * DIGEST_SIZE
+            current = digests[offset:offset + DIGEST_SIZE]
+            if current == digest:
+                return True
+            if current < digest:
+                lo = mid + 1
+            else:
+                hi = mid
+        return False
+
+    def contains_digest(self, digest):
+        return digest in self.bloom and self._contains_exact(digest)
+
+    def is_revoked(self, license_key):
+        """Return True if the license key is in the local revocation list"""
+        return self.contains_digest(revocation_key_hash(license_key))
+
+    def copy(self):
+        bloom = BloomFilter(self.bloom.m_bits, self.bloom.k, self.bloom.bits)
+        return RevocationList(self.version, self.digests, bloom)
+
+    def apply_delta(self, delta):
+        """Apply a server delta and return True if anything changed
+
+        The delta is a dict with "version", optional "full" (replace the
+        whole list) and "added"/"removed" lists of SHA-256 hex digests.
+        An incremental delta also carries "since", the version it was made
+        against, and is ignored unless that is our version; a delta never
+        takes the list back to an older version.
+        """
+        new_version = int(delta.get('version', self.version))
+        if new_version < self.version:
+            return False
+        if not delta.get('full'):
+            since = delta.get('since')
+            if since is None or int(since) != self.version:
+                return False
+        added = {_digest_from_hex(h) for h in delta.get('added', [])}
+        removed = {_digest_from_hex(h) for h in delta.get('removed', [])}
+
+        if delta.get('full'):
+            entries = added
+        else:
+            if new_version == self.version and not added and not removed:
+                return False
+            entries = {self.digests[i:i + DIGEST_SIZE] for i in range(0, len(self.digests), DIGEST_SIZE)}
+            entries |= added
+        entries -= removed
+
+        new_digests = b''.join(sorted(entries))
+        new_count = len(new_digests) // DIGEST_SIZE
+        if delta.get('full') or new_count > self._capacity():
+            # Removed keys only leave stale bits behind, which the exact
+            # lookup filters out; rebuild on full syncs or when overfull
+            bloom = self._build_bloom(new_digests, new_count)
+        else:
+            bloom = self.bloom
+            for digest in added:
+                bloom.add(digest)
+
+        self.version = new_version
+        self.digests = new_digests
+        self.count = new_count
+        self.bloom = bloom
+        return True
+
+    def _capacity(self):
+        # Inverse of BloomFilter.for_capacity
+        return int(self.bloom.m_bits * (math.log(2) ** 2) / -math.log(FALSE_POSITIVE_RATE))
+
+    def save(self, path):
+        """Write the list atomically so readers never see a partial file"""
+        header = struct.pack(HEADER_FORMAT, FILE_MAGIC, self.version,
+                             self.bloom.m_bits, self.bloom.k, self.count)
+        import tempfile
+        fd, tmp_path = tempfile.mkstemp(prefix='.revocations-', dir=os.path.dirname(path) or '.')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(header)
+                f.write(self.bloom.bits)
+                f.write(self.digests)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            print(f"Error saving revocation list: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved list, or return an empty one if missing or unreadable"""
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            magic, version, m_bits, k, count = struct.unpack_from(HEADER_FORMAT, data)
+            if magic != FILE_MAGIC:
+                raise ValueError("bad magic")
+            bloom_end = HEADER_SIZE + (m_bits + 7) // 8
+            digests = data[bloom_end:bloom_end + count * DIGEST_SIZE]
+            if len(digests) != count * DIGEST_SIZE:
+                raise ValueError("truncated file")
+            return cls(version, digests, BloomFilter(m_bits, k, data[HEADER_SIZE:bloom_end]))
+        except FileNotFoundError:
+            return cls()
+        except Exception as e:
+            print(f"Error reading revocation list: {e}")
+            return cls()
+
+def run_benchmark(num_keys=500000, num_lookups=100000):
+    """Measure build, load, lookup and delta sync cost for a synthetic list"""
+    print(f"Building revocation list with {num_keys} keys...")
+    keys = [f"KEY-{i:08d}" for i in range(num_keys)]
+    hex_digests = [hashlib.sha256(k.encode('utf-8')).hexdigest() for k in keys]
+
+    start = time.perf_counter()
+    revocations = RevocationList()
+    revocations.apply_delta({'version': 1, 'full': True, 'added': hex_digests})
+    print(f"  full sync:   {time.perf_counter() - start:.3f}s")
+
+    import tempfile
+    path = os.path.join(tempfile.mkdtemp(prefix="revocation_bench_"), 'license_revocations.bin')
+    revocations.save(path)
+    print(f"  file size:   {os.path.getsize(path) / 1e6:.1f} MB")
+
+    start = time.perf_counter()
+    revocations = RevocationList.load(path)
+    print(f"  load:        {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    hits = keys[:num_lookups]
+    misses = [f"OTHER-{i:08d}" for i in range(num_lookups)]
+    for label, sample in (('hit', hits), ('miss', misses)):
+        start = time.perf_counter()
+        found = sum(1 for k in sample if revocations.is_revoked(k))
+        elapsed = time.perf_counter() - start
+        print(f"  lookup {label}:  {elapsed / len(sample) * 1e6:.2f} us/key ({found}/{len(sample)} revoked)")
+
+    delta = {
+        'version': 2,
+        'since': 1,
+        'added': [hashlib.sha256(f"NEW-{i}".encode('utf-8')).hexdigest() for i in range(1000)],
+    }
+    start = time.perf_counter()
+    revocations.apply_delta(delta)
+    print(f"  delta +1000: {time.perf_counter() - start:.3f}s")
+
+    delta = {'version': 3, 'since': 2, 'removed': hex_digests[:100]}
+    start = time.perf_counter()
+    revocations.apply_delta(delta)
+    print(f"  delta -100:  {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    revocations.save(path)
+    print(f"  save:        {(time.perf_counter() - start) * 1000:.1f} ms")
+    os.remove(path)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--bench':
+        run_benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 500000)
+    else:
+        print("Usage: python license_revocation.py --bench [NUM_KEYS]")
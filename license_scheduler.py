@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Jittered background revalidation of the cached license.
+
+Instead of contacting the license server on every launch, the app accepts
+the cached license and lets a RevalidationScheduler re-check it at
+randomized intervals:
+
+    scheduler = RevalidationScheduler(API_URL, on_revoked=handle_revocation)
+    check_license(API_URL, revalidate_in_background=True, scheduler=scheduler)
+    print(scheduler.next_run_time())
+
+Overdue checks at launch are spread over a window, failures back off
+exponentially with jitter, and server Retry-After hints are honored, so a
+fleet that starts up together does not hit the server together.
+
+Usage:
+    python license_scheduler.py --simulate [NUM_CLIENTS]
+"""
+import sys
+import time
+import random
+import threading
+from datetime import datetime
+
+from license_client import load_cached_license, revalidate_cached_license, get_retry_after
+
+DEFAULT_INTERVAL = 24 * 3600  # Seconds between revalidations, before jitter
+DEFAULT_JITTER = 0.5  # Interval is scaled by a uniform factor in [1 - jitter, 1 + jitter]
+OVERDUE_SPREAD = 4 * 3600  # Overdue checks at launch are spread over this many seconds
+MIN_DELAY = 60  # Never check sooner than this after launch
+MAX_BACKOFF = 6 * 3600
+
+def jittered_interval(interval, jitter, rng=random):
+    return interval * rng.uniform(1 - jitter, 1 + jitter)
+
+def initial_delay(cache_age, interval=DEFAULT_INTERVAL, jitter=DEFAULT_JITTER, rng=random):
+    """Delay before the first check after launch, given how old the cache is"""
+    due_in = jittered_interval(interval, jitter, rng) - cache_age
+    if due_in > MIN_DELAY:
+        return due_in
+    # Overdue (e.g. first launch after a weekend): spread over a window
+    return MIN_DELAY + rng.uniform(0, OVERDUE_SPREAD)
+
+def failure_delay(failures, interval=DEFAULT_INTERVAL, rng=random):
+    """Full-jitter exponential backoff after consecutive failures"""
+    return MIN_DELAY + rng.uniform(0, min(MAX_BACKOFF, interval, MIN_DELAY * (2 ** failures)))
+
+class RevalidationScheduler:
+    """Revalidates the cached license on a daemon thread at jittered intervals"""
+
+    def __init__(self, api_url, interval=DEFAULT_INTERVAL, jitter=DEFAULT_JITTER,
+                 on_revoked=None, public_key=None):
+        self.api_url = api_url
+        self.interval = interval
+        self.jitter = jitter
+        self.on_revoked = on_revoked
+        self.public_key = public_key
+        self.failures = 0
+        self.next_run = None  # Unix time of the next check
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Schedule the first check from the cache age and start the thread"""
+        if self._thread is not None:
+            return self
+        cached = load_cached_license()
+        cache_age = 0.0
+        if cached:
+            try:
+                cache_age = time.time() - datetime.fromisoformat(cached['cached_time']).timestamp()
+            except (KeyError, ValueError):
+                cache_age = float('inf')
+        self._schedule(initial_delay(cache_age, self.interval, self.jitter))
+        self._thread = threading.Thread(target=self._run, name="license-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def next_run_time(self):
+        """Local datetime of the next scheduled check, or None if stopped"""
+        if self.next_run is None or self._stop.is_set():
+            return None
+        return datetime.fromtimestamp(self.next_run)
+
+    def _schedule(self, delay):
+        self.next_run = time.time() + delay
+
+    def _run(self):
+        while not self._stop.wait(max(0.0, self.next_run - time.time())):
+            cached = load_cached_license()
+            if not cached:
+                # Nothing to revalidate any more; check_license will prompt next launch
+                self.stop()
+                return
+
+            result = revalidate_cached_license(cached['license_key'], cached['machine_id'], self.api_url,
+                                               self.on_revoked, self.public_key)
+            if result is False:
+                self.stop()
+                return
+            if result:
+                self.failures = 0
+                delay = jittered_interval(self.interval, self.jitter)
+            else:
+                self.failures += 1
+                delay = failure_delay(self.failures, self.interval)
+
+            urls = self.api_url if isinstance(self.api_url, (list, tuple)) else [self.api_url]
+            retry_after = min(get_retry_after(url) for url in urls)
+            if retry_after:
+                # Come back after the server's hint, jittered so clients do not return in lockstep
+                delay = max(delay, retry_after * random.uniform(1.0, 1.2))
+            self._schedule(delay)
+
+def simulate(num_clients=10000, days=7, seed=1):
+    """Simulate a fleet's request rate with revalidate-on-launch versus the scheduler
+
+    Clients launch the app around 09:00 on weekdays (normal, sigma 10 min)
+    and close it at 17:00. Returns per-minute request counts for both.
+    """
+    rng = random.Random(seed)
+    minutes = days * 24 * 60
+    before = [0] * minutes
+    after = [0] * minutes
+
+    for _ in range(num_clients):
+        last_check = -2 * 24 * 3600.0  # Seconds since simulation start
+        for day in range(days):
+            if day % 7 >= 5:
+                continue  # Weekend
+            launch = day * 86400 + 9 * 3600 + rng.gauss(0, 600)
+            close = day * 86400 + 17 * 3600
+            before[int(launch // 60)] += 1
+
+            next_check = launch + initial_delay(launch - last_check, rng=rng)
+            while next_check < close:
+                after[int(next_check // 60)] += 1
+                last_check = next_check
+                next_check += jittered_interval(DEFAULT_INTERVAL, DEFAULT_JITTER, rng)
+    return before, after
+
+def _print_histogram(label, counts, width=60):
+    hourly = [sum(counts[h * 60:(h + 1) * 60]) for h in range(len(counts) // 60)]
+    peak = max(hourly) or 1
+    print(f"\n{label}: total {sum(counts)}, peak {max(counts)} req/min, "
+          f"busiest hour {peak} req")
+    for hour, count in enumerate(hourly):
+        if count:
+            day, hod = divmod(hour, 24)
+            print(f"  day {day} {hod:02d}:00 {count:7d} {'#' * max(1, round(count / peak * width))}")
+
+def main():
+    num_clients = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    if len(sys.argv) < 2 or sys.argv[1] != '--simulate':
+        print(__doc__)
+        return 1
+    before, after = simulate(num_clients)
+    _print_histogram("Revalidate on every launch", before)
+    _print_histogram("Jittered scheduler", after)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
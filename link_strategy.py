@@ -0,0 +1,265 @@
+"""Link files without duplicating their data, whatever the platform allows.
+
+The model caches link large weight files into place (Hugging Face snapshots,
+speechbrain savedirs). Where symlinks fail, as they do on Windows without
+developer mode, pyi_envfix.py routes the link through Linker, which tries
+in order:
+
+    symlink     os.symlink
+    hardlink    os.link (same volume)
+    reflink     copy-on-write clone: FICLONE on Linux, clonefile on macOS
+    cas         content-addressed copy: each unique file is stored once in
+                a per-user store and hardlinked from there; skipped when
+                the store is on another volume than the destination
+    copy        plain copy, when nothing else works
+
+and counts the bytes each strategy saved over a plain copy. Blobs that no
+file links to any more are removed with prune_cas(), or
+`python link_strategy.py --prune`. Strategies are
+(name, function) pairs, so a test can inject failing ones:
+
+    def fail(src, dst, target_is_directory):
+        raise PermissionError("injected")
+    linker = Linker([('symlink', fail), ('hardlink', hardlink)])
+
+Environment:
+    KESZAUDIO_CAS_DIR   Override the content-addressed store location
+"""
+import os
+import sys
+import errno
+import shutil
+import argparse
+import threading
+
+from user_cache import user_cache_dir, sha256_file
+
+# Errors that mean "not this way", as opposed to a bad source or destination
+_PROPAGATE = (FileExistsError, FileNotFoundError, IsADirectoryError, NotADirectoryError)
+
+def cas_root():
+    """Per-user content-addressed store"""
+    return os.environ.get('KESZAUDIO_CAS_DIR') or user_cache_dir('cas')
+
+def symlink(src, dst, target_is_directory=False):
+    # The original function, in case os.symlink has been patched to use this module
+    original = getattr(os, '_original_symlink', os.symlink)
+    original(src, dst, target_is_directory=target_is_directory)
+    return 0
+
+def hardlink(src, dst, target_is_directory=False):
+    if target_is_directory:
+        raise IsADirectoryError(errno.EISDIR, "Cannot hardlink a directory", src)
+    os.link(src, dst)
+    return os.path.getsize(dst)
+
+def reflink(src, dst, target_is_directory=False):
+    if target_is_directory:
+        raise IsADirectoryError(errno.EISDIR, "Cannot reflink a directory", src)
+    if sys.platform.startswith('linux'):
+        import fcntl
+        FICLONE = 0x40049409
+        with open(src, 'rb') as fsrc:
+            fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            try:
+                fcntl.ioctl(fd, FICLONE, fsrc.fileno())
+            except OSError:
+                os.close(fd)
+                os.remove(dst)
+                raise
+            os.close(fd)
+    elif sys.platform == 'darwin':
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        if libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) != 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), src)
+    else:
+        # ReFS block cloning needs a volume handle per extent; not worth it here
+        raise OSError(errno.ENOTSUP, "Reflinks are not supported on this platform", src)
+    shutil.copystat(src, dst)
+    return os.path.getsize(dst)
+
+def _device(path):
+    """st_dev of path, or of its nearest existing parent"""
+    path = os.path.abspath(path)
+    while not os.path.exists(path) and os.path.dirname(path) != path:
+        path = os.path.dirname(path)
+    return os.stat(path).st_dev
+
+def content_addressed_copy(src, dst, target_is_directory=False, root=None):
+    """Store src once under its SHA-256 and hardlink dst to it"""
+    if target_is_directory:
+        raise IsADirectoryError(errno.EISDIR, "Directories are linked file by file", src)
+    root = root or cas_root()
+    # Checked before hashing: a blob dst cannot be hardlinked to would only cost an extra copy
+    if _device(root) != _device(os.path.dirname(os.path.abspath(dst))):
+        raise OSError(errno.EXDEV, "Content-addressed store is on another volume", root)
+    digest = sha256_file(src)
+    blob = os.path.join(root, digest[:2], digest)
+    for _ in range(2):
+        saved = 0
+        if os.path.exists(blob):
+            saved = os.path.getsize(blob)
+        else:
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            staging = f"{blob}.tmp-{os.getpid()}-{threading.get_ident()}"
+            shutil.copy2(src, staging)
+            os.replace(staging, blob)
+        try:
+            os.link(blob, dst)
+            return saved
+        except FileNotFoundError:
+            # prune_cas removed the blob in between; store it again
+            if os.path.exists(blob) or not os.path.isdir(os.path.dirname(os.path.abspath(dst))):
+                raise
+    raise FileNotFoundError(errno.ENOENT, "Blob keeps disappearing from the store", blob)
+
+def copy(src, dst, target_is_directory=False):
+    if target_is_directory:
+        raise IsADirectoryError(errno.EISDIR, "Directories are linked file by file", src)
+    if os.path.lexists(dst):
+        raise FileExistsError(errno.EEXIST, "File exists", dst)
+    shutil.copy2(src, dst)
+    return 0
+
+def prune_cas(root=None):
+    """Remove blobs no file links to any more (st_nlink == 1); returns (files, bytes) removed"""
+    root = root or cas_root()
+    removed = freed = 0
+    if not os.path.isdir(root):
+        return removed, freed
+    for shard in os.scandir(root):
+        if not shard.is_dir(follow_symlinks=False):
+            continue
+        for entry in os.scandir(shard.path):
+            # Staging files belong to a copy in progress
+            if '.tmp-' in entry.name or not entry.is_file(follow_symlinks=False):
+                continue
+            stat = entry.stat(follow_symlinks=False)
+            if stat.st_nlink == 1:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    continue
+                removed += 1
+                freed += stat.st_size
+        try:
+            os.rmdir(shard.path)
+        except OSError:
+            pass  # Not empty
+    return removed, freed
+
+DEFAULT_STRATEGIES = [
+    ('symlink', symlink),
+    ('hardlink', hardlink),
+    ('reflink', reflink),
+    ('cas', content_addressed_copy),
+    ('copy', copy),
+]
+
+class Linker:
+    """Tries each strategy in turn and keeps per-strategy counts and bytes saved"""
+
+    def __init__(self, strategies=None):
+        self.strategies = list(DEFAULT_STRATEGIES if strategies is None else strategies)
+        self.stats = {}  # strategy name -> {'files': n, 'bytes_saved': n}
+        self.failures = {}  # strategy name -> number of times it was skipped
+        self._lock = threading.Lock()
+
+    def _record(self, table, name, **counts):
+        with self._lock:
+            entry = table.setdefault(name, {key: 0 for key in counts})
+            for key, value in counts.items():
+                entry[key] += value
+
+    def link(self, src, dst, target_is_directory=False):
+        """Make dst refer to src's data; returns the name of the strategy used
+
+        src may be relative to dst's directory, as for os.symlink. A
+        directory is symlinked if possible and otherwise recreated with each
+        file linked individually.
+        """
+        src, dst = os.fspath(src), os.fspath(dst)
+        resolved = src if os.path.isabs(src) else os.path.join(os.path.dirname(os.path.abspath(dst)), src)
+        target_is_directory = target_is_directory or os.path.isdir(resolved)
+        last_error = None
+        for name, strategy in self.strategies:
+            # Only a symlink can stand in for a whole directory
+            if target_is_directory and name != 'symlink':
+                continue
+            try:
+                saved = strategy(src if name == 'symlink' else resolved, dst, target_is_directory)
+            except _PROPAGATE:
+                raise
+            except OSError as e:
+                last_error = e
+                self._record(self.failures, name, count=1)
+                continue
+            if name == 'symlink':
+                saved = _tree_size(resolved)
+            self._record(self.stats, name, files=1, bytes_saved=saved)
+            return name
+        if target_is_directory:
+            self.link_tree(resolved, dst)
+            return 'tree'
+        raise last_error or OSError(errno.ENOTSUP, "No link strategy available", src)
+
+    def link_tree(self, src, dst):
+        """Recreate directory src at dst, linking every file"""
+        os.makedirs(dst, exist_ok=True)
+        for entry in os.scandir(src):
+            target = os.path.join(dst, entry.name)
+            if entry.is_dir(follow_symlinks=True):
+                self.link_tree(entry.path, target)
+            else:
+                self.link(entry.path, target)
+
+    def bytes_saved(self):
+        with self._lock:
+            return sum(entry['bytes_saved'] for entry in self.stats.values())
+
+    def report(self):
+        """One-line summary, or None if nothing was linked"""
+        with self._lock:
+            if not self.stats:
+                return None
+            parts = [f"{name} {entry['files']}" for name, entry in self.stats.items()]
+            skipped = [f"{name} {entry['count']}" for name, entry in self.failures.items()]
+        line = f"Linked files ({', '.join(parts)}), {self.bytes_saved() / 1e6:.1f} MB saved over copying"
+        if skipped:
+            line += f"; strategies that failed: {', '.join(skipped)}"
+        return line
+
+def _tree_size(path):
+    try:
+        if not os.path.isdir(path):
+            return os.path.getsize(path)
+        return sum(os.path.getsize(os.path.join(root, name))
+                   for root, _, files in os.walk(path) for name in files)
+    except OSError:
+        return 0
+
+_default_linker = None
+_default_lock = threading.Lock()
+
+def default_linker():
+    """Process-wide Linker used by the runtime symlink shim"""
+    global _default_linker
+    with _default_lock:
+        if _default_linker is None:
+            _default_linker = Linker()
+        return _default_linker
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the content-addressed store")
+    parser.add_argument('--prune', action='store_true', required=True,
+                        help="Remove blobs that no file links to any more")
+    parser.add_argument('root', nargs='?', help=f"Store to prune (default: {cas_root()})")
+    args = parser.parse_args()
+    removed, freed = prune_cas(args.root)
+    print(f"Removed {removed} unreferenced blobs, {freed / 1e6:.1f} MB freed")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+
+FINGERPRINT_VERSION = 1
+
+# Sources in order of preference; the ID is derived from the first one present
+LINUX_FILE_SOURCES = [
+    ('machine_id', '/etc/machine-id'),
+    ('machine_id', '/var/lib/dbus/machine-id'),
+    ('product_uuid', '/sys/class/dmi/id/product_uuid'),
+    ('board_serial', '/sys/class/dmi/id/board_serial'),
+    ('product_serial', '/sys/class/dmi/id/product_serial'),
+]
+SOURCE_PRIORITY = ['machine_id', 'windows_machine_guid', 'macos_hardware_uuid',
+                   'product_uuid', 'board_serial', 'product_serial', 'mac']
+
+_fingerprint = None
+_fingerprint_lock = threading.Lock()
+
+def _read_text(path):
+    try:
+        with open(path, 'r') as f:
+            value = f.read().strip()
+    except OSError:
+        return None
+    # Placeholder values some vendors ship instead of real serials
+    if not value or value.lower() in ('none', 'to be filled by o.e.m.', 'default string', '0') \
+            or set(value) <= set('0-:'):
+        return None
+    return value
+
+def _interface_macs(stable_only=True):
+    """MAC addresses of network interfaces, read from sysfs
+
+    With stable_only, virtual interfaces and locally administered
+    (randomized) addresses are skipped.
+    """
+    macs = []
+    try:
+        interfaces = os.listdir('/sys/class/net')
+    except OSError:
+        return macs
+    for name in interfaces:
+        # Virtual interfaces (lo, docker0, veth*, bridges) have no backing device
+        if stable_only and not os.path.exists(os.path.join('/sys/class/net', name, 'device')):
+            continue
+        mac = _read_text(os.path.join('/sys/class/net', name, 'address'))
+        if not mac or (stable_only and int(mac.split(':')[0], 16) & 0x02):
+            continue
+        macs.append(mac.lower())
+    return sorted(macs)
+
+def _windows_machine_guid():
+    try:
+        import winreg
+        key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Cryptography",
+                             0, winreg.KEY_READ | winreg.KEY_WOW64_64KEY)
+        try:
+            return winreg.QueryValueEx(key, "MachineGuid")[0]
+        finally:
+            winreg.CloseKey(key)
+    except Exception:
+        return None
+
+def _macos_hardware_uuid():
+    try:
+        import ctypes
+        import uuid
+        libc = ctypes.CDLL('/usr/lib/libSystem.B.dylib')
+        buf = ctypes.create_string_buffer(16)
+        timeout = (ctypes.c_long * 2)(1, 0)
+        if libc.gethostuuid(buf, timeout) != 0:
+            return None
+        return str(uuid.UUID(bytes=buf.raw))
+    except Exception:
+        return None
+
+def collect_sources():
+    """Read the machine identifiers available on this platform, without subprocesses"""
+    sources = {}
+    if sys.platform.startswith('win'):
+        guid = _windows_machine_guid()
+        if guid:
+            sources['windows_machine_guid'] = guid
+    elif sys.platform == 'darwin':
+        hardware_uuid = _macos_hardware_uuid()
+        if hardware_uuid:
+            sources['macos_hardware_uuid'] = hardware_uuid
+    else:
+        for name, path in LINUX_FILE_SOURCES:
+            if name not in sources:
+                value = _read_text(path)
+                if value:
+                    sources[name] = value
+        macs = _interface_macs()
+        if macs:
+            sources['mac'] = macs[0]
+    return sources
+
+def _hash_source(name, value):
+    return hashlib.sha256(f"keszaudio-fp{FINGERPRINT_VERSION}:{name}:{value}".encode('utf-8')).hexdigest()
+
+def compute_fingerprint(sources):
+    """Derive a stable ID from the most reliable source available"""
+    for name in SOURCE_PRIORITY:
+        if name in sources:
+            return f"fp{FINGERPRINT_VERSION}-{_hash_source(name, sources[name])[:32]}"
+    return None
+
+def legacy_machine_ids():
+    """IDs in the old str(uuid.getnode()) format that belong to this machine, or None if unknown
+
+    Only Linux lists interface MACs without a subprocess. Elsewhere
+    uuid.getnode() may run ifconfig or netstat, which is too slow for startup.
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+    # uuid.getnode() may have picked any interface, virtual ones included
+    return {str(int(mac.replace(':', ''), 16)) for mac in _interface_macs(stable_only=False)}
+
+def _is_legacy_id(value):
+    """True for a str(uuid.getnode()) value: a decimal 48-bit number"""
+    return value.isdigit() and int(value) < 1 << 48
+
+def _load_record(path):
+    try:
+        with open(path, 'r') as f:
+            record = json.load(f)
+        if record.get('version') == FINGERPRINT_VERSION and record.get('id'):
+            return record
+    except (OSError, ValueError):
+        pass
+    return None
+
+def _save_record(path, record):
+    try:
+        import tempfile
+        fd, tmp_path = tempfile.mkstemp(prefix='.fingerprint-', dir=os.path.dirname(path) or '.')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(record, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Warning: could not save machine fingerprint: {e}")
+
+def get_machine_fingerprint(path=None, legacy_id=None):
+    """Return this machine's stable ID, memoized per process and in `path`
+
+    A saved ID is reused as long as at least one of the sources it was
+    derived from still matches, so replacing a network card does not change
+    it. `legacy_id` is an optional callable returning an ID issued by an
+    older version; it is adopted on first run if it belongs to this machine,
+    or, where that cannot be checked cheaply, if it has the old format.
+    """
+    global _fingerprint
+    with _fingerprint_lock:
+        if _fingerprint is not None:
+            return _fingerprint
+
+        sources = collect_sources()
+        source_hashes = {name: _hash_source(name, value) for name, value in sources.items()}
+
+        record = _load_record(path) if path else None
+        if record and set(record.get('sources', {}).items()) & set(source_hashes.items()):
+            if record['sources'] != source_hashes and path:
+                # Track hardware changes so the ID follows the current sources
+                record['sources'] = source_hashes
+                _save_record(path, record)
+            _fingerprint = record['id']
+            return _fingerprint
+
+        fingerprint = None
+        if legacy_id is not None:
+            previous = legacy_id()
+            if isinstance(previous, str) and previous:
+                ids = legacy_machine_ids()
+                if (previous in ids) if ids is not None else _is_legacy_id(previous):
+                    fingerprint = previous
+        if fingerprint is None:
+            fingerprint = compute_fingerprint(sources)
+        if fingerprint is None:
+            # Nothing readable on this system; fall back to the MAC address
+            import uuid
+            fingerprint = str(uuid.getnode())
+
+        if path:
+            _save_record(path, {'version': FINGERPRINT_VERSION, 'id': fingerprint, 'sources': source_hashes})
+        _fingerprint = fingerprint
+        return _fingerprint
+
+def run_benchmark(runs=200):
+    """Measure cold, warm-from-disk and memoized fingerprint cost"""
+    global _fingerprint
+    import uuid
+
+    import tempfile
+    path = os.path.join(tempfile.mkdtemp(prefix="fingerprint_bench_"), 'machine_fingerprint.json')
+
+    def measure(label, setup):
+        total = 0.0
+        for _ in range(runs):
+            setup()
+            start = time.perf_counter()
+            get_machine_fingerprint(path)
+            total += time.perf_counter() - start
+        print(f"  {label:<24} {total / runs * 1e6:9.1f} us")
+
+    def cold():
+        global _fingerprint
+        _fingerprint = None
+        if os.path.exists(path):
+            os.remove(path)
+
+    def warm_disk():
+        global _fingerprint
+        _fingerprint = None
+
+    print(f"Machine fingerprint: {get_machine_fingerprint(path)}")
+    print(f"Sources: {', '.join(sorted(collect_sources())) or 'none'}")
+    measure("cold (no saved record)", cold)
+    measure("warm (saved record)", warm_disk)
+    measure("memoized", lambda: None)
+
+    uuid._node = None
+    start = time.perf_counter()
+    uuid.getnode()
+    print(f"  {'uuid.getnode() cold':<24} {(time.perf_counter() - start) * 1e6:9.1f} us")
+    os.remove(path)
+    _fingerprint = None
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--bench':
+        run_benchmark()
+    else:
+        print(get_machine_fingerprint())
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""Pre-fetched model store so the frozen app never downloads weights.
+
+build_app.py --build --prefetch-models downloads the models pinned in
+model_pins.json, each at a fixed commit, into a Hugging Face cache layout, writes manifest.json with the SHA-256 and size of
+every file and bundles the store as models/. At startup pyi_envfix.py calls
+activate_offline_store(), which points the Hugging Face, pyannote and
+speechbrain caches at the store and switches them to offline mode, so
+Pipeline.from_pretrained and from_hparams resolve from disk.
+
+model_pins.json is written by --pin, which resolves the current commit of
+every repository in MODEL_REPOS; commit it to move the pins forward. Until
+the file is committed, --prefetch-models is an error: the build stops
+before doing any work instead of shipping an app without its models.
+
+Usage:
+    python model_store.py --pin [--token TOKEN]
+    python model_store.py --prefetch STORE [--token TOKEN]
+    python model_store.py --verify STORE [--full]
+    python model_store.py --check-offline STORE
+
+Environment:
+    KESZAUDIO_MODEL_STORE   Store to use instead of the bundled one
+"""
+import os
+import sys
+import json
+import re
+import argparse
+import subprocess
+
+from user_cache import sha256_file
+
+# pyannote/speaker-diarization-3.1 loads the segmentation and embedding models itself
+MODEL_REPOS = [
+    'pyannote/speaker-diarization-3.1',
+    'pyannote/segmentation-3.0',
+    'pyannote/wespeaker-voxceleb-resnet34-LM',
+    'speechbrain/spkrec-ecapa-voxceleb',
+]
+PINS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model_pins.json')
+_COMMIT_RE = re.compile(r'^[0-9a-f]{40}$')
+
+MANIFEST_NAME = 'manifest.json'
+HUB_DIR = 'hub'
+
+def default_store_dir():
+    """Store bundled next to the app, or KESZAUDIO_MODEL_STORE"""
+    if os.environ.get('KESZAUDIO_MODEL_STORE'):
+        return os.environ['KESZAUDIO_MODEL_STORE']
+    base = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base, 'models')
+
+def _store_files(store_dir):
+    """Relative paths of the regular files in the store; snapshot symlinks point at blobs"""
+    hub_dir = os.path.join(store_dir, HUB_DIR)
+    for root, dirs, files in os.walk(hub_dir):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            if not os.path.islink(path) and not name.endswith('.lock'):
+                yield os.path.relpath(path, store_dir).replace(os.sep, '/')
+
+def pin_models(path=PINS_FILE, repos=MODEL_REPOS, branch='main', token=None):
+    """Resolve each repository's branch to its current commit and write the pins file"""
+    from huggingface_hub import HfApi
+
+    api = HfApi()
+    pins = []
+    for repo_id in repos:
+        commit = api.model_info(repo_id, revision=branch, token=token or os.environ.get('HF_TOKEN')).sha
+        print(f"{repo_id}@{branch} -> {commit}")
+        pins.append({'repo_id': repo_id, 'revision': commit})
+    with open(path, 'w') as f:
+        json.dump(pins, f, indent=2)
+        f.write('\n')
+    return pins
+
+def pinned_models(path=PINS_FILE):
+    """The pinned [{'repo_id', 'revision'}] list; ValueError unless every revision is a commit hash"""
+    try:
+        with open(path, 'r') as f:
+            pins = json.load(f)
+    except FileNotFoundError:
+        raise ValueError(f"No model pins in {path}; run python model_store.py --pin") from None
+    for pin in pins:
+        if not _COMMIT_RE.match(pin.get('revision') or ''):
+            raise ValueError(f"{pin.get('repo_id')} is pinned to {pin.get('revision')!r}, not a commit hash")
+    return pins
+
+def load_manifest(store_dir):
+    try:
+        with open(os.path.join(store_dir, MANIFEST_NAME), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def prefetch_models(store_dir, models=None, token=None):
+    """Download models (default: the pins) into store_dir and write the manifest; returns the manifest"""
+    models = pinned_models() if models is None else models
+    for model in models:
+        if not _COMMIT_RE.match(model['revision']):
+            raise ValueError(f"{model['repo_id']} is pinned to {model['revision']!r}, not a commit hash")
+    from huggingface_hub import snapshot_download
+    hub_dir = os.path.join(store_dir, HUB_DIR)
+    os.makedirs(hub_dir, exist_ok=True)
+    resolved = []
+    for model in models:
+        print(f"Fetching {model['repo_id']}@{model['revision']}...")
+        snapshot = snapshot_download(model['repo_id'], revision=model['revision'], cache_dir=hub_dir,
+                                     token=token or os.environ.get('HF_TOKEN'))
+        # The snapshot directory is named after the commit that was downloaded
+        commit = os.path.basename(snapshot)
+        if commit != model['revision']:
+            raise ValueError(f"{model['repo_id']}: got commit {commit}, pinned {model['revision']}")
+        # pyannote loads a pipeline's sub-models without a revision, i.e. through refs/main
+        ref_path = os.path.join(hub_dir, 'models--' + model['repo_id'].replace('/', '--'), 'refs', 'main')
+        os.makedirs(os.path.dirname(ref_path), exist_ok=True)
+        with open(ref_path, 'w') as f:
+            f.write(commit)
+        resolved.append(dict(model, commit=commit))
+
+    files = {}
+    for name in _store_files(store_dir):
+        path = os.path.join(store_dir, *name.split('/'))
+        files[name] = {'sha256': sha256_file(path), 'size': os.path.getsize(path)}
+    manifest = {'models': resolved, 'files': files}
+    with open(os.path.join(store_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    total = sum(entry['size'] for entry in files.values())
+    print(f"Model store ready: {len(resolved)} models, {len(files)} files, {total / 1e6:.1f} MB in {store_dir}")
+    return manifest
+
+def verify_store(store_dir, full=False):
+    """Return (ok, problems); sizes are always checked, SHA-256 only with full=True"""
+    manifest = load_manifest(store_dir)
+    if manifest is None:
+        return False, [f"No {MANIFEST_NAME} in {store_dir}"]
+    problems = []
+    for name, entry in manifest['files'].items():
+        path = os.path.join(store_dir, *name.split('/'))
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            problems.append(f"Missing: {name}")
+            continue
+        if size != entry['size']:
+            problems.append(f"Size mismatch: {name} ({size} != {entry['size']})")
+        elif full and sha256_file(path) != entry['sha256']:
+            problems.append(f"Checksum mismatch: {name}")
+    return not problems, problems
+
+def activate_offline_store(store_dir=None):
+    """Point the model caches at the store and go offline; False if there is no usable store"""
+    store_dir = store_dir or default_store_dir()
+    hub_dir = os.path.join(store_dir, HUB_DIR)
+    if not os.path.isfile(os.path.join(store_dir, MANIFEST_NAME)) or not os.path.isdir(hub_dir):
+        return False
+    os.environ['HF_HUB_CACHE'] = hub_dir
+    os.environ['HUGGINGFACE_HUB_CACHE'] = hub_dir
+    os.environ['PYANNOTE_CACHE'] = hub_dir
+    os.environ['HF_HUB_OFFLINE'] = '1'
+    os.environ['TRANSFORMERS_OFFLINE'] = '1'
+    os.environ['HF_DATASETS_OFFLINE'] = '1'
+    os.environ['HF_HUB_DISABLE_TELEMETRY'] = '1'
+    return True
+
+def model_file(repo_id, filename, revision=None, store_dir=None):
+    """Path of a file of a stored model, resolved from the cache layout without huggingface_hub
+
+    revision defaults to the commit the store's manifest pins for repo_id.
+    """
+    store_dir = store_dir or default_store_dir()
+    if revision is None:
+        pinned = {m['repo_id']: m['revision'] for m in (load_manifest(store_dir) or {}).get('models', [])}
+        revision = pinned.get(repo_id, 'main')
+    repo_dir = os.path.join(store_dir, HUB_DIR, 'models--' + repo_id.replace('/', '--'))
+    commit = revision
+    ref = os.path.join(repo_dir, 'refs', revision)
+    if os.path.isfile(ref):
+        with open(ref, 'r') as f:
+            commit = f.read().strip()
+    path = os.path.join(repo_dir, 'snapshots', commit, *filename.split('/'))
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{repo_id}/{filename} is not in the model store")
+    return path
+
+# Runs in a child process with sockets disabled, so any download attempt fails
+_OFFLINE_CHECK = r'''
+import os, sys, json, socket
+
+def _no_network(*args, **kwargs):
+    raise OSError("network access attempted during offline check")
+
+socket.socket.connect = _no_network
+socket.create_connection = _no_network
+socket.getaddrinfo = _no_network
+
+import model_store
+store_dir = sys.argv[1]
+if not model_store.activate_offline_store(store_dir):
+    sys.exit("No model store at " + store_dir)
+from huggingface_hub import snapshot_download
+failed = 0
+for model in model_store.load_manifest(store_dir)['models']:
+    try:
+        # No revision, as pyannote asks for it: must resolve to the pinned commit via refs/main
+        snapshot = snapshot_download(model['repo_id'])
+        if os.path.basename(os.path.normpath(snapshot)) != model['revision']:
+            raise RuntimeError("resolves to " + snapshot + ", not the pinned " + model['revision'])
+        print("ok      " + model['repo_id'])
+    except Exception as e:
+        failed += 1
+        print("failed  " + model['repo_id'] + ": " + str(e))
+sys.exit(1 if failed else 0)
+'''
+
+def check_offline(store_dir):
+    """Resolve every stored model in a subprocess that cannot open sockets; True if all resolve"""
+    env = dict(os.environ)
+    for name in ('HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy'):
+        env.pop(name, None)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [os.path.dirname(os.path.abspath(__file__)),
+                                                      env.get('PYTHONPATH')]))
+    result = subprocess.run([sys.executable, '-c', _OFFLINE_CHECK, os.path.abspath(store_dir)], env=env)
+    return result.returncode == 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the offline model store")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--pin', action='store_true', help=f"Pin MODEL_REPOS to their current commits in {PINS_FILE}")
+    group.add_argument('--prefetch', metavar='STORE')
+    group.add_argument('--verify', metavar='STORE')
+    group.add_argument('--check-offline', metavar='STORE')
+    parser.add_argument('--token', help="Hugging Face token for gated models (default: $HF_TOKEN)")
+    parser.add_argument('--full', action='store_true', help="Verify SHA-256 checksums, not just sizes")
+    args = parser.parse_args()
+
+    if args.pin:
+        pin_models(token=args.token)
+        return 0
+    if args.prefetch:
+        prefetch_models(args.prefetch, token=args.token)
+        return 0
+    if args.verify:
+        ok, problems = verify_store(args.verify, full=args.full)
+        for problem in problems:
+            print(f"❌ {problem}")
+        if ok:
+            print("✅ Model store verified")
+        return 0 if ok else 1
+    return 0 if check_offline(args.check_offline) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
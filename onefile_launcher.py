@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""One-file launcher that extracts the app once into a persistent cache.
+
+build_app.py --build --cached-onefile freezes this script as a small
+PyInstaller one-file executable and appends a zip of the onedir bundle,
+followed by a trailer (magic, payload size, build hash). On launch the
+payload is extracted to a per-user directory keyed by the build hash,
+unless a verified copy is already there, and the bundled executable is run
+from it. Only the standard library and the stdlib-only user_cache module
+are used, so the launcher itself unpacks in milliseconds.
+
+Environment:
+    KESZAUDIO_RUNTIME_DIR   Override the extraction root
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import struct
+import zipfile
+import subprocess
+import concurrent.futures
+
+from user_cache import user_cache_dir
+
+TRAILER_MAGIC = b'KAPAYLD1'
+TRAILER_FORMAT = '<8sQ32s'  # magic, payload size, build hash (hex)
+TRAILER_SIZE = struct.calcsize(TRAILER_FORMAT)
+MARKER_NAME = '.complete'
+EXTRACT_WORKERS = 4
+
+def runtime_root():
+    """Per-user directory holding one extracted copy per build"""
+    return os.environ.get('KESZAUDIO_RUNTIME_DIR') or user_cache_dir('runtime')
+
+def read_trailer(path):
+    """Return (payload_offset, payload_size, build_hash) from the end of path"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        if end < TRAILER_SIZE:
+            raise ValueError("No payload trailer")
+        f.seek(end - TRAILER_SIZE)
+        magic, size, build_hash = struct.unpack(TRAILER_FORMAT, f.read(TRAILER_SIZE))
+    if magic != TRAILER_MAGIC or size > end - TRAILER_SIZE:
+        raise ValueError("No payload trailer")
+    return end - TRAILER_SIZE - size, size, build_hash.decode('ascii')
+
+class _PayloadFile:
+    """Read-only view of a byte range of a file, enough for zipfile"""
+
+    def __init__(self, path, offset, size):
+        self._f = open(path, 'rb')
+        self._offset = offset
+        self._size = size
+        self._f.seek(offset)
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._f.tell() - self._offset
+
+    def seek(self, pos, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            pos += self.tell()
+        elif whence == os.SEEK_END:
+            pos += self._size
+        self._f.seek(self._offset + max(0, min(pos, self._size)))
+        return self.tell()
+
+    def read(self, n=-1):
+        remaining = self._size - self.tell()
+        return self._f.read(remaining if n is None or n < 0 else min(n, remaining))
+
+    def close(self):
+        self._f.close()
+
+class _Lock:
+    """Inter-process lock on a sidecar file; shared locks are POSIX only"""
+
+    def __init__(self, path, shared=False, blocking=True):
+        self.path = path
+        self.shared = shared
+        self.blocking = blocking
+        self._fd = None
+
+    def acquire(self):
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if sys.platform.startswith('win'):
+                import msvcrt
+                mode = msvcrt.LK_LOCK if self.blocking else msvcrt.LK_NBLCK
+                while True:
+                    try:
+                        msvcrt.locking(self._fd, mode, 1)
+                        break
+                    except OSError:
+                        if not self.blocking:
+                            raise
+                        time.sleep(0.1)  # LK_LOCK gives up after 10 attempts
+            else:
+                import fcntl
+                flags = fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX
+                fcntl.flock(self._fd, flags | (0 if self.blocking else fcntl.LOCK_NB))
+        except OSError:
+            os.close(self._fd)
+            self._fd = None
+            raise
+        return self
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            if sys.platform.startswith('win'):
+                import msvcrt
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+def _load_marker(target_dir):
+    try:
+        with open(os.path.join(target_dir, MARKER_NAME), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def verify(target_dir):
+    """True if every file recorded at extraction time is present with its size"""
+    marker = _load_marker(target_dir)
+    if not marker:
+        return False
+    try:
+        return all(os.stat(os.path.join(target_dir, name)).st_size == size
+                   for name, size in marker['files'].items())
+    except OSError:
+        return False
+
+def _extract_members(exe_path, offset, size, names, dest):
+    payload = _PayloadFile(exe_path, offset, size)
+    try:
+        with zipfile.ZipFile(payload) as archive:
+            for name in names:
+                if name.startswith('/') or '..' in name.split('/'):
+                    raise ValueError(f"Unsafe path in payload: {name}")
+                info = archive.getinfo(name)
+                target = os.path.join(dest, *name.split('/'))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with archive.open(info) as src, open(target, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+                mode = (info.external_attr >> 16) & 0o777
+                if mode:
+                    os.chmod(target, mode)
+    finally:
+        payload.close()
+
+def extract(exe_path, offset, size, dest, workers=EXTRACT_WORKERS):
+    """Extract the payload into dest with several threads; returns the zip metadata"""
+    payload = _PayloadFile(exe_path, offset, size)
+    try:
+        with zipfile.ZipFile(payload) as archive:
+            infos = [info for info in archive.infolist() if not info.is_dir()]
+            metadata = json.loads(archive.comment.decode('utf-8') or '{}')
+    finally:
+        payload.close()
+
+    # Spread the members over the workers by size, largest first
+    buckets = [[] for _ in range(workers)]
+    loads = [0] * workers
+    for info in sorted(infos, key=lambda i: -i.file_size):
+        i = loads.index(min(loads))
+        buckets[i].append(info.filename)
+        loads[i] += info.file_size
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(_extract_members, exe_path, offset, size, bucket, dest)
+                       for bucket in buckets if bucket]:
+            future.result()
+
+    files = {info.filename: info.file_size for info in infos}
+    with open(os.path.join(dest, MARKER_NAME), 'w') as f:
+        json.dump({'files': files, 'metadata': metadata, 'extracted': time.time()}, f)
+    return metadata
+
+def _in_use_lock(root, build_hash):
+    """Shared lock held while a copy is checked or run; clean_stale needs it exclusively"""
+    return _Lock(os.path.join(root, build_hash + '.lock'), shared=True)
+
+def _extract_lock(root, build_hash):
+    """Serializes extraction of one build between launchers"""
+    return _Lock(os.path.join(root, build_hash + '.extract.lock'))
+
+def ensure_extracted(exe_path):
+    """Return (target_dir, metadata, in_use), extracting on first launch of this build
+
+    in_use is the acquired shared lock that keeps clean_stale in other
+    launchers from removing target_dir; release it once the app has exited.
+    It is None on Windows, which has no shared locks, but where the open
+    files make the rename in clean_stale fail instead.
+    """
+    offset, size, build_hash = read_trailer(exe_path)
+    root = runtime_root()
+    os.makedirs(root, exist_ok=True)
+    target_dir = os.path.join(root, build_hash)
+
+    # Taken before the check, so the verified copy cannot be cleaned away in between
+    in_use = None if sys.platform.startswith('win') else _in_use_lock(root, build_hash).acquire()
+    try:
+        if verify(target_dir):
+            return target_dir, _load_marker(target_dir)['metadata'], in_use
+
+        # Only one process extracts; the others wait here and then reuse its copy
+        with _extract_lock(root, build_hash):
+            if verify(target_dir):
+                return target_dir, _load_marker(target_dir)['metadata'], in_use
+            shutil.rmtree(target_dir, ignore_errors=True)
+            staging = f"{target_dir}.tmp-{os.getpid()}"
+            shutil.rmtree(staging, ignore_errors=True)
+            metadata = extract(exe_path, offset, size, staging)
+            os.replace(staging, target_dir)
+        return target_dir, metadata, in_use
+    except BaseException:
+        if in_use is not None:
+            in_use.release()
+        raise
+
+def clean_stale(root, keep):
+    """Remove extracted builds other than keep that no running launcher is using
+
+    The lock files are left in place: a launcher may already have opened
+    one, and deleting it would let the next launcher lock a new file with
+    the same name while the old one is still held. They are empty.
+    """
+    try:
+        entries = os.listdir(root)
+    except OSError:
+        return
+    for name in entries:
+        path = os.path.join(root, name)
+        if name == keep or name.endswith('.lock') or not os.path.isdir(path):
+            continue
+        if '.stale-' in name:
+            shutil.rmtree(path, ignore_errors=True)
+            continue
+        if '.tmp-' in name:
+            # Leftover from an interrupted extraction, unless it is still running
+            build_hash = name.split('.tmp-')[0]
+        else:
+            build_hash = name
+        try:
+            with _Lock(os.path.join(root, build_hash + '.lock'), blocking=False), \
+                    _Lock(os.path.join(root, build_hash + '.extract.lock'), blocking=False):
+                # Renaming first means a half-deleted copy never looks complete;
+                # on Windows it also fails while the files are in use
+                doomed = f"{path}.stale-{os.getpid()}"
+                os.rename(path, doomed)
+                shutil.rmtree(doomed, ignore_errors=True)
+        except OSError:
+            continue
+
+def main():
+    exe_path = sys.executable if getattr(sys, 'frozen', False) else os.path.abspath(sys.argv[0])
+    try:
+        target_dir, metadata, in_use = ensure_extracted(exe_path)
+    except (OSError, ValueError, zipfile.BadZipFile) as e:
+        print(f"Error: could not unpack the application: {e}", file=sys.stderr)
+        return 1
+
+    try:
+        clean_stale(os.path.dirname(target_dir), os.path.basename(target_dir))
+        entry = os.path.join(target_dir, *metadata.get('entry', 'KeszAudio/KeszAudio').split('/'))
+        try:
+            return subprocess.call([entry, *sys.argv[1:]])
+        except KeyboardInterrupt:
+            return 130
+    finally:
+        if in_use is not None:
+            in_use.release()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,18 +2,38 @@ import os
 import platform
 import sys
 import pathlib
-import shutil
 import warnings
 
-# Force copy strategy for all libraries that might use symlinks
-os.environ['SB_LINK_STRATEGY'] = 'copy'  # For SpeechBrain
-os.environ['HF_HUB_DISABLE_SYMLINKS'] = '1'  # For HuggingFace Hub
-os.environ['HF_HUB_OFFLINE'] = '0'
-os.environ['TRANSFORMERS_OFFLINE'] = '0'
-os.environ['HF_DATASETS_OFFLINE'] = '0'
+# Let SpeechBrain and HuggingFace Hub link model files instead of copying
+# them; where symlinks fail, the patches below fall back to hardlinks,
+# reflinks or a deduplicated copy (see link_strategy.py)
+os.environ.setdefault('SB_LINK_STRATEGY', 'symlink')
+
+# Load models from the bundled store without network access when the build
+# included one (build_app.py --prefetch-models); otherwise fetch on first use
+try:
+    from model_store import activate_offline_store
+    models_offline = activate_offline_store()
+except ImportError:
+    models_offline = False
+if not models_offline:
+    os.environ['HF_HUB_OFFLINE'] = '0'
+    os.environ['TRANSFORMERS_OFFLINE'] = '0'
+    os.environ['HF_DATASETS_OFFLINE'] = '0'
 
 # --- Robust symlink patching for Windows ---
 if platform.system().lower() == 'windows':
+    import atexit
+    from link_strategy import Linker, DEFAULT_STRATEGIES
+    # Symlinks were already tried when a fallback is needed
+    link_fallback = Linker([strategy for strategy in DEFAULT_STRATEGIES if strategy[0] != 'symlink'])
+
+    def report_links():
+        summary = link_fallback.report()
+        if summary:
+            print(summary)
+    atexit.register(report_links)
+
     # Only patch if not already patched
     if not hasattr(pathlib.Path, '_original_symlink_to'):
         pathlib.Path._original_symlink_to = pathlib.Path.symlink_to
@@ -22,13 +42,8 @@ if platform.system().lower() == 'windows':
                 return pathlib.Path._original_symlink_to(self, target, target_is_directory=target_is_directory)
             except OSError as e:
                 if e.winerror == 1314:
-                    warnings.warn(f"Symlink creation failed due to permissions, copying file instead: {target} -> {self}")
-                    if target.is_file():
-                        shutil.copy2(target, self)
-                    elif target.is_dir():
-                        shutil.copytree(target, self, dirs_exist_ok=True)
-                    else:
-                        raise e
+                    strategy = link_fallback.link(target, self, target_is_directory)
+                    warnings.warn(f"Symlink creation failed due to permissions, used {strategy} instead: {target} -> {self}")
                 else:
                     raise e
         pathlib.Path.symlink_to = safe_symlink_to
@@ -40,15 +55,8 @@ if platform.system().lower() == 'windows':
                 return os._original_symlink(src, dst, target_is_directory=target_is_directory)
             except OSError as e:
                 if e.winerror == 1314:
-                    warnings.warn(f"Symlink creation failed due to permissions, copying file instead: {src} -> {dst}")
-                    src_path = pathlib.Path(src)
-                    dst_path = pathlib.Path(dst)
-                    if src_path.is_file():
-                        shutil.copy2(src_path, dst_path)
-                    elif src_path.is_dir():
-                        shutil.copytree(src_path, dst_path, dirs_exist_ok=True)
-                    else:
-                        raise e
+                    strategy = link_fallback.link(src, dst, target_is_directory)
+                    warnings.warn(f"Symlink creation failed due to permissions, used {strategy} instead: {src} -> {dst}")
                 else:
                     raise e
         os.symlink = safe_os_symlink
@@ -0,0 +1,191 @@
+"""PyInstaller runtime hook that profiles imports inside the frozen app.
+
+Inert unless KESZAUDIO_IMPORT_PROFILE is set when the app starts:
+
+    KESZAUDIO_IMPORT_PROFILE=1                  -> import_profile.txt next to the executable
+    KESZAUDIO_IMPORT_PROFILE=profile.txt        -> sorted text report
+    KESZAUDIO_IMPORT_PROFILE=profile.json       -> Chrome trace (chrome://tracing or Perfetto)
+
+Every loader's exec_module is timed, so the report has self and cumulative
+time per module, totals per top-level package, and startup phases. The app
+can add phases with `import pyi_importprofile; pyi_importprofile.mark('ui shown')`
+and write the report early with `pyi_importprofile.write_report()`; it is
+written at exit otherwise. Registered first in runtime_hooks so the other
+hooks' imports are included.
+"""
+import os
+import sys
+
+def _install(target):
+    import time
+    import types
+    import atexit
+    import threading
+
+    origin = time.perf_counter()
+    records = []  # (name, start, cumulative, self_time, thread_id)
+    marks = [('runtime hooks', 0.0)]
+    local = threading.local()
+    lock = threading.Lock()
+    patched = set()
+
+    def timed_exec_module(original):
+        def exec_module(self, module):
+            stack = getattr(local, 'stack', None)
+            if stack is None:
+                stack = local.stack = []
+            start = time.perf_counter()
+            stack.append(0.0)
+            try:
+                return original(self, module)
+            finally:
+                elapsed = time.perf_counter() - start
+                children = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                with lock:
+                    records.append((module.__name__, start - origin, elapsed, elapsed - children,
+                                    threading.get_ident()))
+        exec_module._import_profiled = True
+        return exec_module
+
+    def patch_loader_class(cls):
+        if cls in patched:
+            return
+        patched.add(cls)
+        original = getattr(cls, 'exec_module', None)
+        if original is None or getattr(original, '_import_profiled', False):
+            return
+        try:
+            cls.exec_module = timed_exec_module(original)
+        except (TypeError, AttributeError):
+            pass  # Built-in loader types cannot be patched
+
+    class ProfilingFinder:
+        """Delegates to the rest of sys.meta_path and times whichever loader is returned"""
+
+        @classmethod
+        def find_spec(cls, name, path=None, target=None):
+            for finder in sys.meta_path:
+                if finder is cls or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    loader = spec.loader
+                    if loader is not None and not isinstance(loader, type):
+                        patch_loader_class(type(loader))
+                    return spec
+            return None
+
+    sys.meta_path.insert(0, ProfilingFinder)
+
+    def mark(name):
+        """Record a startup phase boundary"""
+        with lock:
+            marks.append((name, time.perf_counter() - origin))
+
+    def _process_start_offset():
+        """Seconds between process creation and this hook (bootloader and unpacking), if known"""
+        try:
+            if sys.platform.startswith('linux'):
+                with open('/proc/self/stat') as f:
+                    start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+                with open('/proc/uptime') as f:
+                    uptime = float(f.read().split()[0])
+                age = uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+                return age - (time.perf_counter() - origin)
+            if sys.platform.startswith('win'):
+                import ctypes
+                from ctypes import wintypes
+                creation, exit_, kernel, user = (wintypes.FILETIME() for _ in range(4))
+                ctypes.windll.kernel32.GetProcessTimes(ctypes.windll.kernel32.GetCurrentProcess(),
+                                                      ctypes.byref(creation), ctypes.byref(exit_),
+                                                      ctypes.byref(kernel), ctypes.byref(user))
+                created = ((creation.dwHighDateTime << 32) + creation.dwLowDateTime) / 1e7 - 11644473600
+                return time.time() - created - (time.perf_counter() - origin)
+        except Exception:
+            pass
+        return None
+
+    bootloader_seconds = _process_start_offset()
+
+    def report_path():
+        path = target if target not in ('1', 'true', 'yes') else 'import_profile.txt'
+        if not os.path.isabs(path):
+            path = os.path.join(os.path.dirname(os.path.abspath(sys.executable)), path)
+        return path
+
+    def text_report(elapsed):
+        with lock:
+            rows = list(records)
+            phases = list(marks)
+        lines = [f"Import profile of {sys.executable}", ""]
+        if bootloader_seconds is not None:
+            lines.append(f"Bootloader and unpacking before Python: {bootloader_seconds:9.3f}s")
+        lines.append(f"Python startup to report:               {elapsed:9.3f}s")
+        lines.append(f"Time spent importing (self, all threads): {sum(r[3] for r in rows):7.3f}s "
+                     f"in {len(rows)} modules")
+        lines += ["", "Phases (offset from the first runtime hook):"]
+        for (name, offset), following in zip(phases, phases[1:] + [('report', elapsed)]):
+            lines.append(f"  {offset:9.3f}s  {name:<30} {following[1] - offset:9.3f}s")
+
+        packages = {}
+        for name, _, _, self_time, _ in rows:
+            top = name.split('.')[0]
+            packages[top] = packages.get(top, 0.0) + self_time
+        lines += ["", "Top-level packages by total self time:"]
+        for top, seconds in sorted(packages.items(), key=lambda item: -item[1])[:25]:
+            lines.append(f"  {seconds:9.3f}s  {top}")
+
+        lines += ["", "Modules by cumulative time:", f"  {'cumulative':>10} {'self':>9}  module"]
+        for name, _, cumulative, self_time, _ in sorted(rows, key=lambda r: -r[2])[:100]:
+            lines.append(f"  {cumulative:9.3f}s {self_time:8.3f}s  {name}")
+        lines += ["", "Modules by self time:"]
+        for name, _, _, self_time, _ in sorted(rows, key=lambda r: -r[3])[:50]:
+            lines.append(f"  {self_time:9.3f}s  {name}")
+        return '\n'.join(lines) + '\n'
+
+    def chrome_trace(elapsed):
+        import json
+        pid = os.getpid()
+        with lock:
+            events = [{'name': name, 'cat': 'import', 'ph': 'X', 'ts': start * 1e6, 'dur': cumulative * 1e6,
+                       'pid': pid, 'tid': tid, 'args': {'self_ms': self_time * 1000}}
+                      for name, start, cumulative, self_time, tid in records]
+            events += [{'name': name, 'cat': 'phase', 'ph': 'i', 's': 'g', 'ts': offset * 1e6, 'pid': pid, 'tid': 0}
+                       for name, offset in marks]
+        if bootloader_seconds is not None:
+            events.append({'name': 'bootloader', 'cat': 'phase', 'ph': 'X', 'ts': -bootloader_seconds * 1e6,
+                           'dur': bootloader_seconds * 1e6, 'pid': pid, 'tid': 0})
+        return json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms',
+                           'otherData': {'executable': sys.executable, 'elapsed_seconds': elapsed}})
+
+    written = []
+
+    def write_report():
+        """Write the report now; later calls overwrite it with more data"""
+        elapsed = time.perf_counter() - origin
+        path = report_path()
+        content = chrome_trace(elapsed) if path.endswith('.json') else text_report(elapsed)
+        for candidate in (path, os.path.join(os.path.expanduser('~'), os.path.basename(path))):
+            try:
+                with open(candidate, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                if not written:
+                    print(f"Import profile written to {candidate}")
+                written.append(candidate)
+                return candidate
+            except OSError:
+                continue
+        return None
+
+    atexit.register(lambda: (mark('exit'), write_report()))
+
+    # Make the profiler importable by the app while it is active
+    module = types.ModuleType('pyi_importprofile')
+    module.mark = mark
+    module.write_report = write_report
+    sys.modules['pyi_importprofile'] = module
+
+if os.environ.get('KESZAUDIO_IMPORT_PROFILE'):
+    _install(os.environ['KESZAUDIO_IMPORT_PROFILE'])
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Load test for license_relay.py.
+
+Usage:
+    python relay_load_test.py [--url RELAY_URL] [--requests N] [--keys N]
+                              [--processes N] [--threads N] [--upstream-delay SECONDS]
+
+Without --url, a fake upstream server and a relay are started as
+subprocesses on localhost. Clients run in several processes with
+keep-alive connections and report throughput and latency percentiles.
+"""
+import os
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import subprocess
+import http.client
+import multiprocessing
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+def _client_thread(url, num_requests, num_keys, seed):
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+    rng = random.Random(seed)
+    latencies = []
+    errors = 0
+    for _ in range(num_requests):
+        key_id = rng.randrange(num_keys)
+        body = json.dumps({"license_key": f"KEY-{key_id:06d}", "machine_id": str(key_id)})
+        start = time.perf_counter()
+        try:
+            conn.request('POST', parts.path or '/', body, {'Content-Type': 'application/json'})
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    return latencies, errors
+
+def _client_process(args):
+    url, num_requests, num_keys, threads, seed = args
+    per_thread = num_requests // threads
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(
+            lambda i: _client_thread(url, per_thread, num_keys, seed * 1000 + i), range(threads)))
+    latencies = [lat for lats, _ in results for lat in lats]
+    return latencies, sum(errors for _, errors in results)
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def _wait_for_port(port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+def start_local_relay(upstream_delay):
+    """Start a fake upstream and a relay as subprocesses; return (relay_url, processes)"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    upstream_port, relay_port = _free_port(), _free_port()
+    upstream = subprocess.Popen(
+        [sys.executable, '-c',
+         "from fake_license_server import FakeLicenseServer; "
+         f"s = FakeLicenseServer(port={upstream_port}, delay={upstream_delay}); s.serve_forever()"],
+        cwd=here)
+    relay = subprocess.Popen(
+        [sys.executable, os.path.join(here, 'license_relay.py'),
+         '--upstream', f"http://127.0.0.1:{upstream_port}/license-api/verify_license.php",
+         '--host', '127.0.0.1', '--port', str(relay_port)],
+        cwd=here, stdout=subprocess.DEVNULL)
+    if not (_wait_for_port(upstream_port) and _wait_for_port(relay_port)):
+        upstream.kill()
+        relay.kill()
+        raise RuntimeError("Local relay did not start")
+    return f"http://127.0.0.1:{relay_port}/", [upstream, relay]
+
+def run_load_test(url, num_requests, num_keys, processes, threads):
+    per_process = num_requests // processes
+    jobs = [(url, per_process, num_keys, threads, i + 1) for i in range(processes)]
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.map(_client_process, jobs)
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(lat for lats, _ in results for lat in lats)
+    errors = sum(errors for _, errors in results)
+    total = len(latencies)
+
+    def percentile(p):
+        return latencies[min(total - 1, int(total * p))] * 1000
+
+    print(f"Requests:   {total} ({errors} errors) over {num_keys} distinct keys")
+    print(f"Clients:    {processes} processes x {threads} threads")
+    print(f"Throughput: {total / elapsed:.0f} req/s in {elapsed:.2f}s")
+    print(f"Latency:    p50 {percentile(0.50):.2f} ms, p95 {percentile(0.95):.2f} ms, "
+          f"p99 {percentile(0.99):.2f} ms, max {latencies[-1] * 1000:.2f} ms")
+
+    parts = urlsplit(url)
+    try:
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=5)
+        conn.request('GET', '/stats')
+        print(f"Relay:      {conn.getresponse().read().decode('utf-8')}")
+        conn.close()
+    except (OSError, http.client.HTTPException):
+        pass
+    return errors == 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the license relay")
+    parser.add_argument('--url', help="Relay URL; a local relay is started if omitted")
+    parser.add_argument('--requests', type=int, default=50000)
+    parser.add_argument('--keys', type=int, default=1000, help="Number of distinct license keys")
+    parser.add_argument('--processes', type=int, default=max(1, min(4, (os.cpu_count() or 2) // 2)))
+    parser.add_argument('--threads', type=int, default=16, help="Client threads per process")
+    parser.add_argument('--upstream-delay', type=float, default=0.2,
+                        help="Simulated upstream latency for the local setup")
+    args = parser.parse_args()
+
+    processes = []
+    url = args.url
+    if not url:
+        url, processes = start_local_relay(args.upstream_delay)
+        print(f"Started local relay at {url}")
+    try:
+        ok = run_load_test(url, args.requests, args.keys, args.processes, args.threads)
+    finally:
+        for proc in processes:
+            proc.terminate()
+            proc.wait()
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
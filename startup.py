@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Pipelined app startup: license check and heavy imports in parallel.
+
+torch, pyannote.audio and speechbrain take several seconds to import, and
+the license check may wait on the network or a dialog. Running them one
+after the other costs their sum; here the heavy imports (and optionally
+model loads) are warmed on a background thread while check_license runs on
+the main thread, which wx requires for the license dialog:
+
+    from startup import run_startup
+    licensed, warmup = run_startup(API_URL, model_loader=load_pipeline)
+    if not licensed:
+        sys.exit(1)
+    pipeline = warmup.wait()
+
+If the license check fails the warm-up is cancelled between steps. An import
+that is already running cannot be interrupted, but the thread is a daemon so
+it does not keep the process alive.
+
+Usage:
+    python startup.py [--api-url URL] [--modules torch,pyannote.audio,...]
+"""
+import sys
+import time
+import argparse
+import importlib
+import threading
+
+# In the order main.py needs them; torch first since the others import it
+WARM_MODULES = ['torch', 'torchaudio', 'speechbrain', 'pyannote.audio']
+
+class StartupTimeline:
+    """Thread-safe record of (name, thread, start, end) for each startup step"""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.events = []
+        self._lock = threading.Lock()
+
+    def step(self, name):
+        return _TimelineStep(self, name)
+
+    def add(self, name, start, end, status='ok'):
+        with self._lock:
+            self.events.append((name, threading.current_thread().name, start - self.origin,
+                                end - self.origin, status))
+
+    def total(self):
+        with self._lock:
+            return max((end for _, _, _, end, _ in self.events), default=0.0)
+
+    def report(self):
+        """Print each step's offsets and compare the run against a serial startup"""
+        with self._lock:
+            events = sorted(self.events, key=lambda e: e[2])
+        width = max((len(name) for name, *_ in events), default=0)
+        print("\n⏱️  Startup timeline:")
+        for name, thread, start, end, status in events:
+            print(f"  {name:<{width}}  {start:7.3f}s -> {end:7.3f}s  ({end - start:6.3f}s)  "
+                  f"[{thread}]{'' if status == 'ok' else f' {status}'}")
+        serial = sum(end - start for _, _, start, end, _ in events)
+        total = self.total()
+        print(f"  Total {total:.3f}s vs {serial:.3f}s if run serially "
+              f"({serial - total:.3f}s saved)")
+
+class _TimelineStep:
+    def __init__(self, timeline, name):
+        self.timeline = timeline
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        status = 'ok' if exc_type is None else f'failed: {exc_type.__name__}'
+        self.timeline.add(self.name, self.start, time.perf_counter(), status)
+        return False
+
+class Warmup:
+    """Imports modules and runs an optional model loader on a daemon thread"""
+
+    def __init__(self, modules=WARM_MODULES, model_loader=None, timeline=None):
+        self.modules = list(modules)
+        self.model_loader = model_loader
+        self.timeline = timeline or StartupTimeline()
+        self.result = None  # Return value of model_loader
+        self.errors = {}  # Step name -> exception
+        self.cancelled = threading.Event()
+        self._done = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def cancel(self):
+        """Skip the remaining steps; a step already running finishes in the background"""
+        self.cancelled.set()
+
+    def done(self):
+        return self._done.is_set()
+
+    def join(self, timeout=None):
+        """Wait for the warm-up to finish or be cancelled; True if it did"""
+        return self._done.wait(timeout)
+
+    def wait(self, timeout=None):
+        """Wait for the warm-up and return the model loader's result
+
+        Raises the first error so a failed warm-up surfaces where the
+        modules are used, not on the background thread.
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError("Warm-up did not finish in time")
+        if self.errors:
+            raise next(iter(self.errors.values()))
+        return self.result
+
+    def _run(self):
+        try:
+            for module in self.modules:
+                if self.cancelled.is_set():
+                    return
+                try:
+                    with self.timeline.step(f"import {module}"):
+                        importlib.import_module(module)
+                except Exception as e:
+                    self.errors[f"import {module}"] = e
+
+            if self.model_loader is not None and not self.cancelled.is_set() and not self.errors:
+                try:
+                    with self.timeline.step("load models"):
+                        self.result = self.model_loader(self.cancelled)
+                except Exception as e:
+                    self.errors["load models"] = e
+        finally:
+            self._done.set()
+
+def run_startup(api_url, modules=WARM_MODULES, model_loader=None, report=True, **check_kwargs):
+    """Check the license on this thread while warming heavy imports in the background
+
+    `model_loader(cancel_event)` runs after the imports. Extra keyword
+    arguments go to check_license. Returns (licensed, warmup); the warm-up
+    is already cancelled when licensed is False.
+    """
+    timeline = StartupTimeline()
+    warmup = Warmup(modules, model_loader, timeline).start()
+
+    from license_client import check_license
+    licensed = False
+    try:
+        with timeline.step("license check"):
+            licensed = check_license(api_url, **check_kwargs)
+    finally:
+        if not licensed:
+            warmup.cancel()
+
+    if report:
+        if licensed:
+            # Report once the warm-up is finished, without blocking startup on it
+            threading.Thread(target=lambda: (warmup.join(), timeline.report()),
+                             name="startup-report", daemon=True).start()
+        else:
+            timeline.report()
+    return licensed, warmup
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure pipelined startup")
+    parser.add_argument('--api-url', default="https://demo.freshlook.hu/license-api/verify_license.php")
+    parser.add_argument('--modules', default=','.join(WARM_MODULES),
+                        help="Comma-separated modules to warm up")
+    args = parser.parse_args()
+
+    modules = [m for m in args.modules.split(',') if m]
+    licensed, warmup = run_startup(args.api_url, modules, report=False)
+    if licensed:
+        warmup.join()
+    warmup.timeline.report()
+    for step, error in warmup.errors.items():
+        print(f"⚠️ {step}: {error}")
+    if not licensed:
+        print("❌ License check failed, warm-up cancelled")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""Shared fixture: license_client with its cache in a temporary directory"""
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import license_client
+from fake_license_server import FakeLicenseServer
+
+class LicenseCacheTestCase(unittest.TestCase):
+    # What the patched license prompt "types in"; None means the user cancels
+    prompt_key = None
+
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp(prefix="license-test-")
+        self.addCleanup(shutil.rmtree, cache_dir, True)
+        self.cache_file = os.path.join(cache_dir, "license_cache.json")
+        for name, value in (('get_cache_file_path', lambda: self.cache_file),
+                            ('prompt_license_key_gui', lambda machine_id: self.prompt_key),
+                            ('_revocation_list', None)):
+            patcher = mock.patch.object(license_client, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        license_client.license_revoked.clear()
+        license_client._license_checked.clear()
+        self.addCleanup(license_client._license_checked.clear)
+        self.machine_id = license_client.get_machine_id()
+
+    def start_server(self, **kwargs):
+        server = FakeLicenseServer(**kwargs).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def seed_cache(self, license_key, api_url, server_response=None):
+        license_client.save_license_cache(license_key, self.machine_id, api_url,
+                                          server_response or {"status": "valid", "seeded": True})
+
+    def read_cache(self):
+        with open(self.cache_file, 'r') as f:
+            return json.load(f)
@@ -0,0 +1,69 @@
+"""Chunked diarization: global labels stay consistent across chunk boundaries"""
+import os
+import unittest
+from unittest import mock
+
+import chunk_diarization
+from chunk_diarization import label_segments, plan_chunks, run_chunk_stage, diarization_workers
+
+# Voices as speaker embeddings; local labels are chunk-scoped, like pyannote's
+VOICES = {'alice': [1.0, 0.1, 0.0], 'bob': [0.0, 1.0, 0.2], 'carol': [0.1, 0.0, 1.0]}
+# Who speaks when; alice's 8-12 turn and carol's 18-23 turn cross a boundary
+TURNS = [(0.0, 4.0, 'bob'), (5.0, 12.0, 'alice'), (13.0, 16.0, 'bob'),
+         (18.0, 23.0, 'carol'), (24.0, 28.0, 'alice')]
+
+def fake_chunk(path, index, start, end):
+    """Stand-in for diarize_chunk that labels local speakers in order of appearance"""
+    segments = []
+    locals_ = {}
+    for turn_start, turn_end, voice in TURNS:
+        seg_start, seg_end = max(turn_start, start), min(turn_end, end)
+        if seg_start < seg_end:
+            label = locals_.setdefault(voice, f"SPEAKER_{len(locals_):02d}")
+            segments.append((seg_start, seg_end, label))
+    # Scale each chunk's embeddings differently; cosine distance must not care
+    embeddings = {label: [x * (index + 1) for x in VOICES[voice]] for voice, label in locals_.items()}
+    return {'index': index, 'start': start, 'end': end, 'segments': segments, 'embeddings': embeddings}
+
+class ChunkLabelTest(unittest.TestCase):
+    def setUp(self):
+        self.chunks = plan_chunks(30.0, 10.0)
+
+    def speakers_by_voice(self, diarized):
+        """Map each voice to the set of global labels its segments got"""
+        voices = {}
+        for seg_start, seg_end, speaker, _, _ in diarized:
+            voice = next(v for s, e, v in TURNS if s <= seg_start and seg_end <= e)
+            voices.setdefault(voice, set()).add(speaker)
+        return voices
+
+    def test_speaker_keeps_label_across_boundaries(self):
+        diarized = label_segments(run_chunk_stage('audio.wav', self.chunks, 1, fake_chunk))
+        self.assertEqual(self.speakers_by_voice(diarized),
+                         {'bob': {'Speaker 1'}, 'alice': {'Speaker 2'}, 'carol': {'Speaker 3'}})
+        # alice's turn is split at 10s into two chunks with different local labels
+        split = [s for s in diarized if s[0] in (5.0, 10.0)]
+        self.assertEqual([(s[3], s[4]) for s in split], [(0, 'SPEAKER_01'), (1, 'SPEAKER_00')])
+        self.assertEqual({s[2] for s in split}, {'Speaker 2'})
+
+    def test_worker_count_does_not_change_labels(self):
+        sequential = label_segments(run_chunk_stage('audio.wav', self.chunks, 1, fake_chunk))
+        pooled = label_segments(run_chunk_stage('audio.wav', self.chunks, 2, fake_chunk))
+        self.assertEqual(pooled, sequential)
+
+    def test_chunk_order_does_not_change_labels(self):
+        results = run_chunk_stage('audio.wav', self.chunks, 1, fake_chunk)
+        self.assertEqual(label_segments(results[::-1]), label_segments(results))
+
+class WorkerSettingTest(unittest.TestCase):
+    def test_argument_wins_over_environment(self):
+        with mock.patch.dict(os.environ, {'KESZAUDIO_DIARIZATION_WORKERS': '3'}):
+            self.assertEqual(diarization_workers(2), 2)
+            self.assertEqual(diarization_workers(), 3)
+
+    def test_default_is_capped_by_cpu_count(self):
+        with mock.patch.dict(os.environ, {}, clear=True), mock.patch.object(os, 'cpu_count', return_value=2):
+            self.assertEqual(diarization_workers(), min(2, chunk_diarization.DEFAULT_WORKERS))
+
+if __name__ == '__main__':
+    unittest.main()
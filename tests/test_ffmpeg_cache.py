@@ -0,0 +1,141 @@
+"""FFmpeg download cache: checksum verification and resumed downloads from a local HTTP server"""
+import io
+import os
+import shutil
+import hashlib
+import tarfile
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+try:
+    import build_app
+except ImportError:
+    build_app = None
+
+def make_archive():
+    """A tar.gz shaped like the static Linux builds, with incompressible binaries"""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as tar:
+        for name, size in (('ffmpeg', 300_000), ('ffprobe', 200_000), ('readme.txt', 1_000)):
+            data = os.urandom(size)
+            info = tarfile.TarInfo(f"ffmpeg-7.0-amd64-static/{name}")
+            info.size = len(data)
+            info.mode = 0o755
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+class ArchiveServer(ThreadingHTTPServer):
+    """Serves one archive with Range support; can cut the first response short"""
+    daemon_threads = True
+
+    def __init__(self, archive, truncate_first=False, honor_range=True):
+        super().__init__(('127.0.0.1', 0), ArchiveHandler)
+        self.archive = archive
+        self.truncate_first = truncate_first
+        self.honor_range = honor_range
+        self.requests = []  # Range header of each request, or None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/ffmpeg-release-amd64-static.tar.gz"
+
+class ArchiveHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        range_header = self.headers.get('Range')
+        server.requests.append(range_header)
+        body = server.archive
+        if range_header and server.honor_range:
+            start = int(range_header.split('=')[1].rstrip('-'))
+            if start >= len(body):
+                self.send_response(416)
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{len(body) - 1}/{len(body)}")
+            body = body[start:]
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if server.truncate_first and len(server.requests) == 1:
+            # Drop the connection halfway through the body
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+@unittest.skipIf(build_app is None, "build_app needs PyInstaller")
+class FFmpegCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix="ffmpeg-cache-")
+        self.addCleanup(shutil.rmtree, self.cache_dir, True)
+        self.archive = make_archive()
+        self.sha256 = hashlib.sha256(self.archive).hexdigest()
+
+    def start_server(self, **kwargs):
+        server = ArchiveServer(self.archive, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def download(self, server, sha256=None, **kwargs):
+        return build_app.download_ffmpeg(cache_dir=self.cache_dir, url=server.url, sha256=sha256, **kwargs)
+
+    def assert_binaries(self, bin_dir):
+        self.assertIsNotNone(bin_dir)
+        self.assertEqual(sorted(os.listdir(bin_dir)), ['ffmpeg', 'ffprobe'])
+        self.assertTrue(os.access(os.path.join(bin_dir, 'ffmpeg'), os.X_OK))
+
+    def test_download_is_cached(self):
+        server = self.start_server()
+        bin_dir = self.download(server, self.sha256)
+        self.assert_binaries(bin_dir)
+        self.assertEqual(self.download(server, self.sha256), bin_dir)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_checksum_mismatch_is_rejected(self):
+        server = self.start_server()
+        self.assertIsNone(self.download(server, '0' * 64))
+        entry_dir = os.path.join(self.cache_dir, 'ffmpeg', os.listdir(os.path.join(self.cache_dir, 'ffmpeg'))[0])
+        self.assertFalse(os.path.exists(os.path.join(entry_dir, 'archive')))
+        # A later build with the right checksum downloads it again
+        self.assert_binaries(self.download(server, self.sha256))
+        self.assertEqual(len(server.requests), 2)
+
+    def test_changed_checksum_refetches(self):
+        server = self.start_server()
+        self.assert_binaries(self.download(server))
+        self.assertIsNone(self.download(server, 'f' * 64))
+        self.assertEqual(len(server.requests), 2)
+
+    def test_interrupted_download_resumes(self):
+        server = self.start_server(truncate_first=True)
+        self.assert_binaries(self.download(server, self.sha256))
+        self.assertEqual(len(server.requests), 2)
+        self.assertIsNone(server.requests[0])
+        self.assertEqual(server.requests[1], f"bytes={len(self.archive) // 2}-")
+
+    def test_server_without_range_support_restarts(self):
+        server = self.start_server(truncate_first=True, honor_range=False)
+        self.assert_binaries(self.download(server, self.sha256))
+        self.assertEqual(len(server.requests), 2)
+
+    def test_offline_mirror(self):
+        server = self.start_server()
+        mirror = tempfile.mkdtemp(prefix="ffmpeg-mirror-")
+        self.addCleanup(shutil.rmtree, mirror, True)
+        with open(os.path.join(mirror, os.path.basename(server.url)), 'wb') as f:
+            f.write(self.archive)
+        self.assert_binaries(self.download(server, self.sha256, mirror=mirror))
+        self.assertEqual(server.requests, [])
+
+if __name__ == "__main__":
+    unittest.main()
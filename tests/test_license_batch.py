@@ -0,0 +1,59 @@
+"""Batch validation: malformed and failing pairs only fail themselves"""
+import io
+import json
+import unittest
+from unittest import mock
+
+import license_client
+from license_batch import run_batch
+from fake_license_server import FakeLicenseServer
+
+class BatchValidationTest(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeLicenseServer().start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        # A dropped connection is what the failing pairs should look like, not a traceback
+        self.server.handle_error = lambda request, client_address: None
+        verify = self.server.verify
+
+        def answer(license_key, machine_id):
+            if license_key.startswith('MALFORMED'):
+                return ["not", "an", "object"]
+            if license_key.startswith('BROKEN'):
+                raise RuntimeError("injected server failure")
+            return verify(license_key, machine_id)
+        self.server.verify = answer
+        patcher = mock.patch.object(license_client, '_backoff_delay', lambda attempt: 0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_pairs(self, pairs, **kwargs):
+        output = io.StringIO()
+        counts = run_batch(pairs, self.server.url, output=output, **kwargs)
+        results = {}
+        for line in output.getvalue().splitlines():
+            result = json.loads(line)
+            results[result['license_key']] = result
+        return counts, results
+
+    def test_malformed_entry_fails_only_its_pair(self):
+        pairs = [(f"KEY-{i}", str(i)) for i in range(9)] + [("MALFORMED-1", "9")]
+        for batch_url in (None, self.server.batch_url):
+            counts, results = self.run_pairs(pairs, batch_url=batch_url)
+            self.assertEqual(counts, (9, 0, 1))
+            self.assertEqual(results["MALFORMED-1"]['status'], "error")
+            self.assertEqual(results["MALFORMED-1"]['reason'], "Malformed result entry")
+
+    def test_failing_pairs_do_not_fail_the_rest(self):
+        # More consecutive failures than a shared breaker tolerates, then good pairs
+        pairs = [(f"BROKEN-{i}", str(i)) for i in range(5)] + [(f"KEY-{i}", str(i)) for i in range(5, 20)]
+        counts, results = self.run_pairs(pairs, workers=1)
+        self.assertEqual(counts, (15, 0, 5))
+        self.assertEqual(sorted(key for key, result in results.items() if result['status'] == "error"),
+                         sorted(key for key, _ in pairs if key.startswith('BROKEN')))
+        # Nor do they trip the breaker the app's own checks go through
+        self.assertEqual(license_client.get_circuit_breaker(self.server.url).state, 'closed')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""Several processes validating and rewriting one license cache at once
+
+Every process runs check_license against a FakeLicenseServer (which
+rewrites the cache after each successful validation), saves the cache
+directly and re-reads the raw file in between. A reader must never see
+a torn or half-written JSON file.
+"""
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import contextlib
+import multiprocessing
+from unittest import mock
+
+import license_client
+from fake_license_server import FakeLicenseServer
+
+PROCESSES = 6
+ITERATIONS = 25
+
+@contextlib.contextmanager
+def _use_cache_dir(cache_dir):
+    """Point license_client at cache_dir; only used inside the child processes"""
+    cache_file = os.path.join(cache_dir, "license_cache.json")
+    # A prompt would mean the cache could not be read
+    with mock.patch.object(license_client, 'get_cache_file_path', lambda: cache_file), \
+            mock.patch.object(license_client, 'prompt_license_key_gui', lambda machine_id: None):
+        yield cache_file
+
+def _seed(cache_dir, api_url, result):
+    """Write the cache and the machine fingerprint every worker will read"""
+    with _use_cache_dir(cache_dir):
+        machine_id = license_client.get_machine_id()
+        result.put((machine_id, license_client.save_license_cache("KEY-0", machine_id, api_url, {"status": "valid"})))
+
+def _worker(cache_dir, api_url, start, errors):
+    with _use_cache_dir(cache_dir) as cache_file:
+        machine_id = license_client.get_machine_id()
+        start.wait()
+        for i in range(ITERATIONS):
+            license_client._license_checked.clear()
+            if not license_client.check_license(api_url):
+                errors.put(f"pid {os.getpid()}: check_license failed on iteration {i}")
+            license_client.save_license_cache(f"KEY-{os.getpid()}", machine_id, api_url, {"status": "valid", "n": i})
+            try:
+                with open(cache_file, 'r') as f:
+                    json.load(f)
+            except ValueError as e:
+                errors.put(f"pid {os.getpid()}: torn cache on iteration {i}: {e}")
+
+class LicenseCacheConcurrencyTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix="license-cache-")
+        self.addCleanup(shutil.rmtree, self.cache_dir, True)
+        self.server = FakeLicenseServer().start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def test_concurrent_processes_never_tear_the_cache(self):
+        context = multiprocessing.get_context('spawn')
+        # This process's license_client is left alone; the children patch their own
+        result = context.Queue()
+        seeder = context.Process(target=_seed, args=(self.cache_dir, self.server.url, result))
+        seeder.start()
+        machine_id, saved = result.get(timeout=60)
+        seeder.join(60)
+        self.assertTrue(saved)
+
+        start = context.Event()
+        errors = context.Queue()
+        workers = [context.Process(target=_worker, args=(self.cache_dir, self.server.url, start, errors))
+                   for _ in range(PROCESSES)]
+        for worker in workers:
+            worker.start()
+        start.set()
+        for worker in workers:
+            worker.join(120)
+            self.assertEqual(worker.exitcode, 0)
+
+        problems = []
+        while not errors.empty():
+            problems.append(errors.get())
+        self.assertEqual(problems, [])
+        with open(os.path.join(self.cache_dir, "license_cache.json"), 'r') as f:
+            self.assertEqual(json.load(f)['machine_id'], machine_id)
+        # Temp files from the atomic writes are all renamed or removed
+        self.assertEqual(sorted(os.listdir(self.cache_dir)),
+                         ["license_cache.json", "license_cache.json.lock", "machine_fingerprint.json"])
+        self.assertGreaterEqual(self.server.request_count, PROCESSES * ITERATIONS)
+
+if __name__ == "__main__":
+    unittest.main()
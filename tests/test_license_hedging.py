@@ -0,0 +1,74 @@
+"""Hedged license requests against several local FakeLicenseServer mirrors"""
+import time
+import threading
+import unittest
+
+import license_client
+from fake_license_server import FakeLicenseServer
+
+PAYLOAD = {"license_key": "KEY-1", "machine_id": "MACHINE-1"}
+
+class HedgingTest(unittest.TestCase):
+    def start_server(self, **kwargs):
+        server = FakeLicenseServer(**kwargs).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def test_slow_mirror_is_hedged(self):
+        slow = self.start_server(delay=2.0)
+        fast = self.start_server()
+        start = time.monotonic()
+        success, data, error = license_client._hedged_post_json([slow.url, fast.url], PAYLOAD, hedge_delay=0.1)
+        self.assertTrue(success, error)
+        self.assertEqual(data["status"], "valid")
+        self.assertLess(time.monotonic() - start, 1.5)
+        # Known-fast mirror now goes first
+        self.assertEqual(license_client.order_endpoints([slow.url, fast.url])[0], fast.url)
+
+    def test_failing_mirror_falls_over(self):
+        broken = self.start_server(fail_rate=1.0)
+        good = self.start_server()
+        success, data, error = license_client.validate_license_with_server(
+            "KEY-1", "MACHINE-1", [broken.url, good.url], hedge_delay=5.0)
+        self.assertTrue(success, error)
+        self.assertEqual(broken.request_count, 1)
+        self.assertEqual(good.request_count, 1)
+
+    def test_all_mirrors_failing(self):
+        first = self.start_server(fail_rate=1.0)
+        second = self.start_server(fail_rate=1.0)
+        success, data, error = license_client._hedged_post_json([first.url, second.url], PAYLOAD, hedge_delay=0.1)
+        self.assertFalse(success)
+        self.assertIn("503", error)
+
+    def test_no_endpoints(self):
+        for urls in ([], [None, ""]):
+            self.assertEqual(license_client.validate_license_with_server("KEY-1", "MACHINE-1", urls),
+                             (False, None, "No license endpoints configured"))
+
+    def test_single_endpoint_list(self):
+        server = self.start_server()
+        success, data, error = license_client.validate_license_with_server("KEY-1", "MACHINE-1", [server.url, server.url])
+        self.assertTrue(success, error)
+        self.assertEqual(server.request_count, 1)
+
+    def test_cancelled_before_sending(self):
+        server = self.start_server()
+        cancel = threading.Event()
+        cancel.set()
+        self.assertEqual(license_client._post_json(server.url, PAYLOAD, cancel, max_retries=0),
+                         (False, None, "Cancelled"))
+        self.assertEqual(server.request_count, 0)
+
+    def test_cancelled_while_waiting(self):
+        server = self.start_server(delay=0.5)
+        cancel = threading.Event()
+        threading.Timer(0.1, cancel.set).start()
+        self.assertEqual(license_client._post_json(server.url, PAYLOAD, cancel, max_retries=0),
+                         (False, None, "Cancelled"))
+        # The server did answer, so its breaker stays closed
+        self.assertEqual(license_client.get_circuit_breaker(server.url).state, 'closed')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""License relay: coalesced upstream failures and upstream status pass-through"""
+import json
+import time
+import threading
+import unittest
+from unittest import mock
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import license_relay
+
+FOLLOWERS = 4
+
+class RejectingHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        body = json.dumps({"error": "forbidden"}).encode('utf-8')
+        self.send_response(403)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class LicenseRelayTest(unittest.TestCase):
+    def test_leader_failure_is_raised_in_followers(self):
+        relay = license_relay.LicenseRelay("http://127.0.0.1:9/unused")
+        release = threading.Event()
+
+        def failing_upstream(license_key, machine_id, api_url):
+            release.wait(10)
+            raise RuntimeError("upstream client crashed")
+
+        errors = []
+
+        def verify():
+            try:
+                errors.append(relay.verify("KEY-1", "machine"))
+            except RuntimeError as e:
+                errors.append(e)
+
+        with mock.patch.object(license_relay, 'validate_license_with_server', failing_upstream):
+            threads = [threading.Thread(target=verify) for _ in range(FOLLOWERS + 1)]
+            threads[0].start()
+            while not relay._inflight:
+                time.sleep(0.001)
+            for thread in threads[1:]:
+                thread.start()
+            while relay.stats_snapshot()['coalesced'] < FOLLOWERS:
+                time.sleep(0.001)
+            release.set()
+            for thread in threads:
+                thread.join(10)
+
+        self.assertEqual(len(errors), FOLLOWERS + 1)
+        for error in errors:
+            self.assertIsInstance(error, RuntimeError)
+        self.assertEqual(relay._inflight, {})
+
+    def test_upstream_client_error_keeps_its_status(self):
+        upstream = ThreadingHTTPServer(('127.0.0.1', 0), RejectingHandler)
+        threading.Thread(target=upstream.serve_forever, daemon=True).start()
+        self.addCleanup(upstream.server_close)
+        self.addCleanup(upstream.shutdown)
+        relay = license_relay.LicenseRelay(f"http://127.0.0.1:{upstream.server_address[1]}/verify")
+
+        status, data = relay.verify("KEY-1", "machine")
+        self.assertEqual(status, 403)
+        self.assertEqual(data['status'], "error")
+        self.assertEqual(relay.stats_snapshot()['upstream_errors'], 0)
+        # Not cached: the next request goes upstream again
+        self.assertEqual(relay.cache.get(("KEY-1", "machine")), (None, False))
+
+if __name__ == "__main__":
+    unittest.main()
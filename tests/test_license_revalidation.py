@@ -0,0 +1,72 @@
+"""Background revalidation and on_revoked against a local FakeLicenseServer"""
+import os
+import threading
+import unittest
+
+import license_client
+from tests.license_support import LicenseCacheTestCase
+
+class RevalidationTest(LicenseCacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.revoked_reasons = []
+
+    def check_in_background(self, api_url):
+        accepted = license_client.check_license(api_url, revalidate_in_background=True,
+                                                on_revoked=self.revoked_reasons.append)
+        for thread in threading.enumerate():
+            if thread.name == "license-revalidation":
+                thread.join(30)
+        return accepted
+
+    def test_valid_license_refreshes_cache(self):
+        server = self.start_server()
+        self.seed_cache("KEY-1", server.url)
+        self.assertTrue(self.check_in_background(server.url))
+        self.assertEqual(server.request_count, 1)
+        response = self.read_cache()['server_response']
+        self.assertEqual(response['status'], "valid")
+        self.assertNotIn('seeded', response)
+        self.assertFalse(license_client.license_revoked.is_set())
+        self.assertEqual(self.revoked_reasons, [])
+
+    def test_revoked_license_calls_on_revoked(self):
+        server = self.start_server()
+        self.seed_cache("REVOKED-1", server.url)
+        # Accepted from cache at once; the revocation arrives from the background thread
+        self.assertTrue(self.check_in_background(server.url))
+        self.assertTrue(license_client.license_revoked.is_set())
+        self.assertEqual(self.revoked_reasons, ["License revoked"])
+        self.assertFalse(os.path.exists(self.cache_file))
+        self.assertEqual(license_client._license_checked, {})
+
+    def test_unreachable_server_keeps_cache(self):
+        server = self.start_server()
+        url = server.url
+        server.shutdown()
+        server.server_close()
+        self.seed_cache("KEY-1", url)
+        self.assertTrue(self.check_in_background(url))
+        self.assertTrue(self.read_cache()['server_response']['seeded'])
+        self.assertFalse(license_client.license_revoked.is_set())
+        self.assertEqual(self.revoked_reasons, [])
+
+    def test_failing_callback_does_not_break_revalidation(self):
+        server = self.start_server()
+        self.seed_cache("REVOKED-1", server.url)
+
+        def on_revoked(reason):
+            raise RuntimeError("callback failed")
+
+        self.assertFalse(license_client.revalidate_cached_license("REVOKED-1", self.machine_id, server.url, on_revoked))
+        self.assertTrue(license_client.license_revoked.is_set())
+
+    def test_revoked_license_in_foreground(self):
+        server = self.start_server()
+        self.seed_cache("REVOKED-1", server.url)
+        # The cache is cleared and the (patched) prompt returns no new key
+        self.assertFalse(license_client.check_license(server.url))
+        self.assertFalse(os.path.exists(self.cache_file))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+"""Revocation deltas apply only on top of the version they were made against"""
+import hashlib
+import unittest
+
+from license_revocation import RevocationList
+
+def digests(*keys):
+    return [hashlib.sha256(key.encode('utf-8')).hexdigest() for key in keys]
+
+class ApplyDeltaTest(unittest.TestCase):
+    def setUp(self):
+        self.revocations = RevocationList()
+        self.revocations.apply_delta({'version': 5, 'full': True, 'added': digests('KEY-A', 'KEY-B')})
+
+    def test_delta_on_current_version_applies(self):
+        self.assertTrue(self.revocations.apply_delta(
+            {'version': 6, 'since': 5, 'added': digests('KEY-C'), 'removed': digests('KEY-A')}))
+        self.assertEqual(self.revocations.version, 6)
+        self.assertFalse(self.revocations.is_revoked('KEY-A'))
+        self.assertTrue(self.revocations.is_revoked('KEY-C'))
+
+    def test_delta_on_other_base_is_ignored(self):
+        for since in (3, 6, None):
+            delta = {'version': 7, 'added': digests('KEY-C'), 'removed': digests('KEY-A')}
+            if since is not None:
+                delta['since'] = since
+            self.assertFalse(self.revocations.apply_delta(delta))
+        self.assertEqual(self.revocations.version, 5)
+        self.assertTrue(self.revocations.is_revoked('KEY-A'))
+        self.assertFalse(self.revocations.is_revoked('KEY-C'))
+
+    def test_version_never_decreases(self):
+        self.assertFalse(self.revocations.apply_delta({'version': 4, 'full': True, 'added': digests('KEY-C')}))
+        self.assertFalse(self.revocations.apply_delta({'version': 4, 'since': 5, 'added': digests('KEY-C')}))
+        self.assertEqual(self.revocations.version, 5)
+        self.assertTrue(self.revocations.is_revoked('KEY-B'))
+        self.assertFalse(self.revocations.is_revoked('KEY-C'))
+
+    def test_full_sync_replaces_list(self):
+        self.assertTrue(self.revocations.apply_delta({'version': 9, 'full': True, 'added': digests('KEY-C')}))
+        self.assertEqual(self.revocations.version, 9)
+        self.assertFalse(self.revocations.is_revoked('KEY-A'))
+        self.assertTrue(self.revocations.is_revoked('KEY-C'))
+
+if __name__ == '__main__':
+    unittest.main()
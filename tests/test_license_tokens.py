@@ -0,0 +1,106 @@
+"""Signed license tokens: a local Ed25519 key pair and a signing FakeLicenseServer"""
+import os
+import sys
+import base64
+import tempfile
+import subprocess
+import unittest
+
+import license_client
+from tests.license_support import LicenseCacheTestCase
+
+try:
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+    from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+except ImportError:
+    Ed25519PrivateKey = None
+
+try:
+    import build_app
+except ImportError:
+    build_app = None
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def generate_key_pair():
+    """(private key, base64 raw public key)"""
+    private_key = Ed25519PrivateKey.generate()
+    raw = private_key.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)
+    return private_key, base64.b64encode(raw).decode('ascii')
+
+@unittest.skipIf(Ed25519PrivateKey is None, "cryptography is not installed")
+class LicenseTokenTest(LicenseCacheTestCase):
+    prompt_key = "KEY-1"
+
+    def setUp(self):
+        super().setUp()
+        self.private_key, self.public_key = generate_key_pair()
+
+    def check(self, server):
+        license_client._license_checked.clear()
+        return license_client.check_license(server.url, public_key=self.public_key)
+
+    def test_signed_activation_then_offline(self):
+        server = self.start_server(signing_key=self.private_key)
+        self.assertTrue(self.check(server))
+        token = self.read_cache()['server_response']['token']
+        self.assertIsNotNone(license_client.verify_license_token(token, "KEY-1", self.machine_id, self.public_key))
+        # refresh_after has not passed, so the token alone is enough
+        self.assertTrue(self.check(server))
+        self.assertEqual(server.request_count, 1)
+
+    def test_token_due_for_refresh_goes_to_server(self):
+        server = self.start_server(signing_key=self.private_key, refresh_after=0)
+        self.assertTrue(self.check(server))
+        self.assertTrue(self.check(server))
+        self.assertEqual(server.request_count, 2)
+
+    def test_unsigned_response_is_rejected(self):
+        server = self.start_server()
+        self.assertFalse(self.check(server))
+        self.assertFalse(os.path.exists(self.cache_file))
+
+    def test_token_from_another_key_is_rejected(self):
+        other_key, _ = generate_key_pair()
+        server = self.start_server(signing_key=other_key)
+        self.assertFalse(self.check(server))
+
+    def test_token_bound_to_machine_and_expiry(self):
+        server = self.start_server(signing_key=self.private_key)
+        token = server.sign_token("KEY-1", self.machine_id)
+        self.assertIsNone(license_client.verify_license_token(token, "KEY-1", "OTHER-MACHINE", self.public_key))
+        self.assertIsNone(license_client.verify_license_token(token, "KEY-2", self.machine_id, self.public_key))
+        server.token_ttl = -1
+        expired = server.sign_token("KEY-1", self.machine_id)
+        self.assertIsNone(license_client.verify_license_token(expired, "KEY-1", self.machine_id, self.public_key))
+        tampered = token[:-4] + ("AAAA" if not token.endswith("AAAA") else "BBBB")
+        self.assertIsNone(license_client.verify_license_token(tampered, "KEY-1", self.machine_id, self.public_key))
+
+    def test_unsigned_cache_is_not_trusted_offline(self):
+        server = self.start_server(signing_key=self.private_key)
+        url = server.url
+        server.shutdown()
+        server.server_close()
+        self.seed_cache("KEY-1", url)
+        self.prompt_key = None
+        self.assertFalse(license_client.check_license(url, public_key=self.public_key))
+
+@unittest.skipIf(Ed25519PrivateKey is None, "cryptography is not installed")
+@unittest.skipIf(build_app is None, "build_app needs PyInstaller")
+class StampedKeyTest(unittest.TestCase):
+    def test_stamped_key_is_used_and_environment_ignored(self):
+        _, public_key = generate_key_pair()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            build_app.create_license_key_module(temp_dir, build_app.load_license_public_key(public_key))
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join([temp_dir, REPO_DIR]),
+                       LICENSE_PUBLIC_KEY=generate_key_pair()[1])
+            output = subprocess.run([sys.executable, '-c', 'import license_client; print(license_client.LICENSE_PUBLIC_KEY)'],
+                                    env=env, cwd=temp_dir, capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), public_key)
+
+    def test_invalid_key_is_refused(self):
+        with self.assertRaises(ValueError):
+            build_app.load_license_public_key("not-a-key")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""Link strategies, the content-addressed store and its pruning"""
+import os
+import errno
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import link_strategy
+
+def failing(name):
+    def strategy(src, dst, target_is_directory=False):
+        raise PermissionError(errno.EPERM, f"injected {name} failure")
+    return (name, strategy)
+
+class LinkStrategyTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="link-strategy-")
+        self.addCleanup(shutil.rmtree, self.temp_dir, True)
+        self.cas = os.path.join(self.temp_dir, 'cas')
+        self.src = self.path('weights.bin')
+        with open(self.src, 'wb') as f:
+            f.write(os.urandom(64 * 1024))
+
+    def path(self, *parts):
+        return os.path.join(self.temp_dir, *parts)
+
+    def cas_linker(self):
+        cas = lambda src, dst, target_is_directory=False: link_strategy.content_addressed_copy(
+            src, dst, target_is_directory, root=self.cas)
+        return link_strategy.Linker([failing('symlink'), failing('hardlink'), ('cas', cas), ('copy', link_strategy.copy)])
+
+    def blobs(self):
+        return [name for shard in os.listdir(self.cas) for name in os.listdir(os.path.join(self.cas, shard))]
+
+    def test_falls_through_failing_strategies(self):
+        linker = link_strategy.Linker([failing('symlink')] + link_strategy.DEFAULT_STRATEGIES[1:])
+        self.assertEqual(linker.link(self.src, self.path('a')), 'hardlink')
+        self.assertEqual(linker.failures, {'symlink': {'count': 1}})
+        self.assertEqual(linker.bytes_saved(), 64 * 1024)
+
+    def test_cas_stores_each_file_once(self):
+        linker = self.cas_linker()
+        self.assertEqual(linker.link(self.src, self.path('a')), 'cas')
+        self.assertEqual(linker.link(self.src, self.path('b')), 'cas')
+        self.assertEqual(len(self.blobs()), 1)
+        # The blob plus the two links
+        self.assertEqual(os.stat(self.path('a')).st_nlink, 3)
+        self.assertEqual(linker.stats['cas'], {'files': 2, 'bytes_saved': 64 * 1024})
+
+    def test_cas_on_another_volume_is_skipped(self):
+        devices = {os.path.abspath(self.cas): 1}
+        with mock.patch.object(link_strategy, '_device', lambda path: devices.get(os.path.abspath(path), 2)):
+            linker = self.cas_linker()
+            self.assertEqual(linker.link(self.src, self.path('a')), 'copy')
+        self.assertEqual(linker.failures['cas'], {'count': 1})
+        # Nothing was hashed into the store
+        self.assertFalse(os.path.exists(self.cas))
+
+    def test_existing_destination_propagates(self):
+        open(self.path('a'), 'w').close()
+        with self.assertRaises(FileExistsError):
+            self.cas_linker().link(self.src, self.path('a'))
+
+    def test_directory_without_symlinks_is_linked_file_by_file(self):
+        os.makedirs(self.path('model', 'sub'))
+        shutil.copy(self.src, self.path('model', 'sub', 'weights.bin'))
+        self.assertEqual(self.cas_linker().link(self.path('model'), self.path('linked')), 'tree')
+        self.assertTrue(os.path.isfile(self.path('linked', 'sub', 'weights.bin')))
+
+    def test_prune_removes_unreferenced_blobs(self):
+        other = self.path('other.bin')
+        with open(other, 'wb') as f:
+            f.write(os.urandom(1000))
+        linker = self.cas_linker()
+        linker.link(self.src, self.path('a'))
+        linker.link(other, self.path('b'))
+        os.remove(self.path('b'))
+        self.assertEqual(link_strategy.prune_cas(self.cas), (1, 1000))
+        self.assertEqual(len(self.blobs()), 1)
+        self.assertEqual(link_strategy.prune_cas(self.cas), (0, 0))
+        # A pruned blob is stored again the next time it is needed
+        linker.link(other, self.path('c'))
+        self.assertEqual(len(self.blobs()), 2)
+
+if __name__ == "__main__":
+    unittest.main()
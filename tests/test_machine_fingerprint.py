@@ -0,0 +1,58 @@
+"""Adopting machine IDs issued by older versions"""
+import os
+import json
+import uuid
+import unittest
+from unittest import mock
+
+import license_client
+import machine_fingerprint
+from tests.license_support import LicenseCacheTestCase
+
+LEGACY_ID = str(0x0242AC110002)
+
+class LegacyMachineIdTest(LicenseCacheTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(machine_fingerprint, '_fingerprint', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def first_run_machine_id(self):
+        """get_machine_id as on the first run after an upgrade"""
+        machine_fingerprint._fingerprint = None
+        if os.path.exists(license_client.get_fingerprint_file_path()):
+            os.remove(license_client.get_fingerprint_file_path())
+        return license_client.get_machine_id()
+
+    def write_cache(self, machine_id, cached_time):
+        with open(self.cache_file, 'w') as f:
+            json.dump({'schema': license_client.CACHE_SCHEMA_VERSION, 'license_key': 'KEY-1',
+                       'machine_id': machine_id, 'cached_time': cached_time, 'status': 'valid'}, f)
+
+    def test_expired_cache_still_hands_over_its_id(self):
+        self.write_cache(LEGACY_ID, '2000-01-01T00:00:00')
+        self.assertIsNone(license_client.load_cached_license())
+        with mock.patch.object(machine_fingerprint, 'legacy_machine_ids', lambda: {LEGACY_ID}):
+            self.assertEqual(self.first_run_machine_id(), LEGACY_ID)
+
+    def test_id_of_another_machine_is_not_adopted(self):
+        self.write_cache(LEGACY_ID, '2000-01-01T00:00:00')
+        with mock.patch.object(machine_fingerprint, 'legacy_machine_ids', lambda: {'1'}):
+            self.assertNotEqual(self.first_run_machine_id(), LEGACY_ID)
+
+    def test_no_uuid_getnode_where_macs_cannot_be_listed(self):
+        with mock.patch.object(machine_fingerprint.sys, 'platform', 'darwin'), \
+                mock.patch.object(uuid, 'getnode', side_effect=AssertionError("uuid.getnode() called")):
+            self.assertIsNone(machine_fingerprint.legacy_machine_ids())
+            self.write_cache(LEGACY_ID, '2000-01-01T00:00:00')
+            self.assertEqual(self.first_run_machine_id(), LEGACY_ID)
+
+    def test_malformed_legacy_id_is_not_adopted(self):
+        with mock.patch.object(machine_fingerprint, 'legacy_machine_ids', lambda: None):
+            for machine_id in ('not-a-mac', str(1 << 48), 12345):
+                self.write_cache(machine_id, '2000-01-01T00:00:00')
+                self.assertNotEqual(self.first_run_machine_id(), machine_id)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+"""Model pins and store lookups that need neither huggingface_hub nor the network"""
+import os
+import json
+import socket
+import shutil
+import hashlib
+import tempfile
+import unittest
+from unittest import mock
+
+import model_store
+from user_cache import sha256_file
+
+COMMIT = "0123456789abcdef0123456789abcdef01234567"
+REPO_ID = 'pyannote/segmentation-3.0'
+
+class ModelStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="model-store-")
+        self.addCleanup(shutil.rmtree, self.temp_dir, True)
+        self.pins_file = os.path.join(self.temp_dir, "model_pins.json")
+
+    def write_pins(self, pins):
+        with open(self.pins_file, 'w') as f:
+            json.dump(pins, f)
+
+    def test_missing_pins_file(self):
+        with self.assertRaisesRegex(ValueError, "--pin"):
+            model_store.pinned_models(self.pins_file)
+
+    def test_branch_is_not_a_pin(self):
+        self.write_pins([{'repo_id': 'pyannote/segmentation-3.0', 'revision': 'main'}])
+        with self.assertRaisesRegex(ValueError, "not a commit hash"):
+            model_store.pinned_models(self.pins_file)
+
+    def test_commit_pins_load(self):
+        pins = [{'repo_id': 'pyannote/segmentation-3.0', 'revision': COMMIT}]
+        self.write_pins(pins)
+        self.assertEqual(model_store.pinned_models(self.pins_file), pins)
+
+    def test_prefetch_refuses_unpinned_models(self):
+        with self.assertRaisesRegex(ValueError, "not a commit hash"):
+            model_store.prefetch_models(self.temp_dir, [{'repo_id': 'pyannote/segmentation-3.0', 'revision': 'main'}])
+
+    def test_model_file_uses_manifest_pin(self):
+        repo_dir = os.path.join(self.temp_dir, model_store.HUB_DIR, 'models--pyannote--segmentation-3.0')
+        os.makedirs(os.path.join(repo_dir, 'snapshots', COMMIT))
+        with open(os.path.join(repo_dir, 'snapshots', COMMIT, 'config.yaml'), 'w') as f:
+            f.write("model: {}\n")
+        with open(os.path.join(self.temp_dir, model_store.MANIFEST_NAME), 'w') as f:
+            json.dump({'models': [{'repo_id': 'pyannote/segmentation-3.0', 'revision': COMMIT}], 'files': {}}, f)
+        path = model_store.model_file('pyannote/segmentation-3.0', 'config.yaml', store_dir=self.temp_dir)
+        self.assertEqual(os.path.basename(os.path.dirname(path)), COMMIT)
+        with self.assertRaises(FileNotFoundError):
+            model_store.model_file('pyannote/segmentation-3.0', 'missing.bin', store_dir=self.temp_dir)
+
+def _no_network(*args, **kwargs):
+    raise OSError("network access attempted")
+
+class OfflineStoreTest(unittest.TestCase):
+    """A store in Hugging Face cache layout, used with every socket refused"""
+
+    def setUp(self):
+        for name in ('socket', 'create_connection', 'getaddrinfo'):
+            patcher = mock.patch.object(socket, name, _no_network)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.store_dir = tempfile.mkdtemp(prefix="model-store-")
+        self.addCleanup(shutil.rmtree, self.store_dir, True)
+        self.hub_dir = os.path.join(self.store_dir, model_store.HUB_DIR)
+        self.repo_dir = os.path.join(self.hub_dir, 'models--' + REPO_ID.replace('/', '--'))
+        self.blobs = {}
+        for filename, content in (('config.yaml', b"model: {}\n"), ('pytorch_model.bin', os.urandom(4096))):
+            self.add_file(filename, content)
+        os.makedirs(os.path.join(self.repo_dir, 'refs'))
+        with open(os.path.join(self.repo_dir, 'refs', 'main'), 'w') as f:
+            f.write(COMMIT)
+        # The manifest as prefetch_models writes it
+        files = {}
+        for name in model_store._store_files(self.store_dir):
+            path = os.path.join(self.store_dir, *name.split('/'))
+            files[name] = {'sha256': sha256_file(path), 'size': os.path.getsize(path)}
+        with open(os.path.join(self.store_dir, model_store.MANIFEST_NAME), 'w') as f:
+            json.dump({'models': [{'repo_id': REPO_ID, 'revision': COMMIT, 'commit': COMMIT}], 'files': files}, f)
+
+    def add_file(self, filename, content):
+        """Write content as a blob and link it from the snapshot, as huggingface_hub does"""
+        blob_hash = hashlib.sha256(content).hexdigest()
+        blob_path = os.path.join(self.repo_dir, 'blobs', blob_hash)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        with open(blob_path, 'wb') as f:
+            f.write(content)
+        snapshot_dir = os.path.join(self.repo_dir, 'snapshots', COMMIT)
+        os.makedirs(snapshot_dir, exist_ok=True)
+        try:
+            os.symlink(os.path.join('..', '..', 'blobs', blob_hash), os.path.join(snapshot_dir, filename))
+        except OSError as e:
+            self.skipTest(f"symlinks not available: {e}")
+        self.blobs[filename] = blob_path
+
+    def test_network_is_disabled(self):
+        with self.assertRaises(OSError):
+            socket.create_connection(('huggingface.co', 443))
+
+    def test_manifest_lists_blobs_not_snapshot_links(self):
+        paths = [os.path.join(self.store_dir, *name.split('/'))
+                 for name in model_store.load_manifest(self.store_dir)['files']]
+        self.assertLessEqual(set(self.blobs.values()), set(paths))
+        self.assertFalse([path for path in paths if os.sep + 'snapshots' + os.sep in path])
+
+    def test_intact_store_verifies(self):
+        self.assertEqual(model_store.verify_store(self.store_dir, full=True), (True, []))
+
+    def test_corrupted_blob_is_rejected(self):
+        path = self.blobs['pytorch_model.bin']
+        with open(path, 'r+b') as f:
+            data = f.read()
+            f.seek(0)
+            f.write(bytes(b ^ 0xFF for b in data))
+        ok, problems = model_store.verify_store(self.store_dir, full=True)
+        self.assertFalse(ok)
+        self.assertEqual(len(problems), 1)
+        self.assertRegex(problems[0], "^Checksum mismatch: .*" + os.path.basename(path))
+
+    def test_truncated_blob_fails_the_size_check(self):
+        with open(self.blobs['pytorch_model.bin'], 'r+b') as f:
+            f.truncate(100)
+        ok, problems = model_store.verify_store(self.store_dir)
+        self.assertFalse(ok)
+        self.assertRegex(problems[0], "^Size mismatch")
+
+    def test_missing_blob_is_reported(self):
+        os.remove(self.blobs['config.yaml'])
+        ok, problems = model_store.verify_store(self.store_dir, full=True)
+        self.assertFalse(ok)
+        self.assertRegex(problems[0], "^Missing: ")
+
+    def test_missing_manifest_is_reported(self):
+        os.remove(os.path.join(self.store_dir, model_store.MANIFEST_NAME))
+        self.assertFalse(model_store.verify_store(self.store_dir)[0])
+        with mock.patch.dict(os.environ):
+            self.assertFalse(model_store.activate_offline_store(self.store_dir))
+
+    def test_activate_points_caches_at_store_and_goes_offline(self):
+        with mock.patch.dict(os.environ):
+            self.assertTrue(model_store.activate_offline_store(self.store_dir))
+            for name in ('HF_HUB_CACHE', 'HUGGINGFACE_HUB_CACHE', 'PYANNOTE_CACHE'):
+                self.assertEqual(os.environ[name], self.hub_dir)
+            for name in ('HF_HUB_OFFLINE', 'TRANSFORMERS_OFFLINE', 'HF_DATASETS_OFFLINE'):
+                self.assertEqual(os.environ[name], '1')
+
+    def test_offline_lookup_reads_the_pinned_snapshot(self):
+        with mock.patch.dict(os.environ, KESZAUDIO_MODEL_STORE=self.store_dir):
+            self.assertTrue(model_store.activate_offline_store())
+            path = model_store.model_file(REPO_ID, 'pytorch_model.bin')
+            by_ref = model_store.model_file(REPO_ID, 'pytorch_model.bin', revision='main')
+        self.assertEqual(path, by_ref)
+        self.assertIn(os.path.join('snapshots', COMMIT), path)
+        self.assertEqual(sha256_file(path), os.path.basename(self.blobs['pytorch_model.bin']))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+"""Extraction, locking and cleanup of the cached one-file launcher"""
+import os
+import sys
+import json
+import shutil
+import struct
+import zipfile
+import tempfile
+import unittest
+import multiprocessing
+from unittest import mock
+
+import onefile_launcher
+
+BUILD_HASH = "0123456789abcdef0123456789abcdef"
+POSIX = not sys.platform.startswith('win')
+
+def make_exe(path, build_hash=BUILD_HASH, exit_code=0):
+    """Stand-in launcher executable with an appended payload and trailer"""
+    zip_path = path + '.zip'
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+        entry = zipfile.ZipInfo('KeszAudio/KeszAudio')
+        entry.external_attr = 0o755 << 16
+        zip_ref.writestr(entry, f"#!/bin/sh\nexit {exit_code}\n")
+        for i in range(20):
+            zip_ref.writestr(f'KeszAudio/_internal/lib{i}.so', os.urandom(50_000))
+        zip_ref.comment = json.dumps({'entry': 'KeszAudio/KeszAudio'}).encode('utf-8')
+    with open(path, 'wb') as out, open(zip_path, 'rb') as payload:
+        out.write(b'MZ' + os.urandom(4096))
+        out.write(payload.read())
+        out.write(struct.pack(onefile_launcher.TRAILER_FORMAT, onefile_launcher.TRAILER_MAGIC,
+                              os.path.getsize(zip_path), build_hash.encode('ascii')))
+    os.remove(zip_path)
+    return path
+
+def _extract_in_child(runtime_dir, exe_path):
+    os.environ['KESZAUDIO_RUNTIME_DIR'] = runtime_dir
+    target_dir, metadata, in_use = onefile_launcher.ensure_extracted(exe_path)
+    if in_use is not None:
+        in_use.release()
+    return target_dir
+
+def lock_is_free(path):
+    try:
+        onefile_launcher._Lock(path, blocking=False).acquire().release()
+        return True
+    except OSError:
+        return False
+
+class OnefileLauncherTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="onefile-launcher-")
+        self.addCleanup(shutil.rmtree, self.temp_dir, True)
+        self.runtime_dir = os.path.join(self.temp_dir, 'runtime')
+        patcher = mock.patch.dict(os.environ, KESZAUDIO_RUNTIME_DIR=self.runtime_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.exe = make_exe(os.path.join(self.temp_dir, 'KeszAudio'))
+
+    def extract(self):
+        target_dir, metadata, in_use = onefile_launcher.ensure_extracted(self.exe)
+        if in_use is not None:
+            self.addCleanup(in_use.release)
+        return target_dir, metadata, in_use
+
+    def test_extracts_once_then_reuses(self):
+        target_dir, metadata, _ = self.extract()
+        self.assertEqual(target_dir, os.path.join(self.runtime_dir, BUILD_HASH))
+        self.assertEqual(metadata, {'entry': 'KeszAudio/KeszAudio'})
+        self.assertTrue(onefile_launcher.verify(target_dir))
+        marker = os.path.join(target_dir, onefile_launcher.MARKER_NAME)
+        extracted = os.path.getmtime(marker)
+        self.assertEqual(self.extract()[0], target_dir)
+        self.assertEqual(os.path.getmtime(marker), extracted)
+
+    def test_damaged_copy_is_extracted_again(self):
+        target_dir = self.extract()[0]
+        os.remove(os.path.join(target_dir, 'KeszAudio', '_internal', 'lib3.so'))
+        self.assertFalse(onefile_launcher.verify(target_dir))
+        self.extract()
+        self.assertTrue(onefile_launcher.verify(target_dir))
+
+    @unittest.skipUnless(POSIX, "shared locks are POSIX only")
+    def test_copy_in_use_survives_clean_stale(self):
+        _, _, in_use = self.extract()
+        self.assertFalse(lock_is_free(os.path.join(self.runtime_dir, BUILD_HASH + '.lock')))
+        onefile_launcher.clean_stale(self.runtime_dir, keep='newer-build')
+        self.assertTrue(onefile_launcher.verify(os.path.join(self.runtime_dir, BUILD_HASH)))
+        in_use.release()
+        onefile_launcher.clean_stale(self.runtime_dir, keep='newer-build')
+        self.assertFalse(os.path.exists(os.path.join(self.runtime_dir, BUILD_HASH)))
+        # Lock files stay, so a launcher that already opened one keeps a valid lock
+        self.assertTrue(os.path.exists(os.path.join(self.runtime_dir, BUILD_HASH + '.lock')))
+
+    def test_clean_stale_removes_unused_builds_and_leftovers(self):
+        target_dir, _, in_use = self.extract()
+        for name in ('oldbuild', 'oldbuild.stale-1', BUILD_HASH + '.tmp-999999'):
+            os.makedirs(os.path.join(self.runtime_dir, name, 'KeszAudio'))
+        onefile_launcher.clean_stale(self.runtime_dir, keep=BUILD_HASH)
+        remaining = sorted(name for name in os.listdir(self.runtime_dir) if not name.endswith('.lock'))
+        if in_use is None:
+            self.assertEqual(remaining, [BUILD_HASH])
+        else:
+            # The .tmp- leftover shares the running build's in-use lock, so it waits for a later launch
+            self.assertEqual(remaining, [BUILD_HASH, BUILD_HASH + '.tmp-999999'])
+
+    def test_concurrent_launches_share_one_copy(self):
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(4) as pool:
+            targets = pool.starmap(_extract_in_child, [(self.runtime_dir, self.exe)] * 4)
+        self.assertEqual(set(targets), {os.path.join(self.runtime_dir, BUILD_HASH)})
+        self.assertEqual(sorted(name for name in os.listdir(self.runtime_dir) if not name.endswith('.lock')),
+                         [BUILD_HASH])
+        self.assertTrue(onefile_launcher.verify(targets[0]))
+
+    @unittest.skipUnless(POSIX, "the stand-in entry point is a shell script")
+    def test_main_runs_entry_and_releases_lock(self):
+        make_exe(self.exe, exit_code=3)
+        with mock.patch.object(sys, 'argv', [self.exe, '--flag']):
+            self.assertEqual(onefile_launcher.main(), 3)
+        self.assertTrue(lock_is_free(os.path.join(self.runtime_dir, BUILD_HASH + '.lock')))
+
+    def test_missing_trailer(self):
+        with open(self.exe, 'wb') as f:
+            f.write(b'MZ' + bytes(100))
+        with self.assertRaises(ValueError):
+            onefile_launcher.ensure_extracted(self.exe)
+
+if __name__ == "__main__":
+    unittest.main()
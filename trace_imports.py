@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Record the modules, data files and shared libraries a workload loads.
+
+Runs a script as __main__ under an audit hook and writes what it used to a
+JSON trace when it exits, however it exits. build_app.py --pruned turns the
+trace into precise hiddenimports, datas and binaries for the spec.
+
+Usage:
+    python trace_imports.py --output TRACE.json SCRIPT [ARGS...]
+"""
+import os
+import sys
+import json
+import time
+import runpy
+import argparse
+import threading
+
+# Files that the module graph accounts for; everything else is a data file
+_CODE_SUFFIXES = ('.py', '.pyc', '.pyo', '.pyd', '.so', '.dll', '.dylib')
+
+def _site_dirs():
+    return [os.path.normcase(os.path.abspath(p)) for p in sys.path
+            if p and os.path.isdir(p) and os.path.basename(p) in ('site-packages', 'dist-packages')]
+
+class ImportTracer:
+    """Collects opened package files and dlopen'ed libraries through sys.addaudithook"""
+
+    def __init__(self):
+        self.site_dirs = _site_dirs()
+        # Loaded by site or this script, not by the workload
+        self.baseline_modules = set(sys.modules)
+        self.data_files = set()
+        self.libraries = set()
+        self.active = False
+        self._lock = threading.Lock()
+
+    def _in_site(self, path):
+        path = os.path.normcase(path)
+        return any(path.startswith(site_dir + os.sep) for site_dir in self.site_dirs)
+
+    def hook(self, event, args):
+        if not self.active:
+            return
+        if event == 'open':
+            path, mode = args[0], args[1]
+            if not isinstance(path, str) or (mode and any(c in mode for c in 'wax+')):
+                return
+            path = os.path.abspath(path)
+            if not path.endswith(_CODE_SUFFIXES) and self._in_site(path) and os.path.isfile(path):
+                with self._lock:
+                    self.data_files.add(path)
+        elif event == 'ctypes.dlopen':
+            name = args[0]
+            if isinstance(name, str) and os.path.isabs(name) and self._in_site(name):
+                with self._lock:
+                    self.libraries.add(os.path.abspath(name))
+
+    def snapshot(self, argv, seconds):
+        modules = {}
+        for name, module in list(sys.modules.items()):
+            if name not in self.baseline_modules:
+                modules[name] = getattr(module, '__file__', None)
+        with self._lock:
+            return {
+                'argv': argv,
+                'seconds': seconds,
+                'python': sys.version.split()[0],
+                'platform': sys.platform,
+                'site_dirs': self.site_dirs,
+                'modules': dict(sorted(modules.items())),
+                'data_files': sorted(self.data_files),
+                'libraries': sorted(self.libraries),
+            }
+
+def run_traced(script, args, output):
+    """Run script with args as __main__ and write the trace to output; returns the exit code"""
+    tracer = ImportTracer()
+    sys.addaudithook(tracer.hook)
+    sys.argv = [script] + list(args)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+
+    exit_code = 0
+    start = time.perf_counter()
+    tracer.active = True
+    try:
+        runpy.run_path(script, run_name='__main__')
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    finally:
+        tracer.active = False
+        trace = tracer.snapshot(sys.argv, time.perf_counter() - start)
+        trace['exit_code'] = exit_code
+        with open(output, 'w') as f:
+            json.dump(trace, f, indent=1)
+        print(f"Import trace: {len(trace['modules'])} modules, {len(trace['data_files'])} data files, "
+              f"{len(trace['libraries'])} libraries -> {output}", file=sys.stderr)
+    return exit_code
+
+def main():
+    parser = argparse.ArgumentParser(description="Trace the imports and data files of a workload")
+    parser.add_argument('--output', required=True)
+    parser.add_argument('script')
+    parser.add_argument('args', nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+    return run_traced(args.script, args.args, args.output)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+"""Per-user cache location and file hashing shared by the build and the app.
+
+Everything KeszAudio caches per user lives in one directory:
+
+    Windows   %LOCALAPPDATA%\\KeszAudio
+    macOS     ~/Library/Caches/KeszAudio
+    Linux     $XDG_CACHE_HOME/keszaudio (default ~/.cache/keszaudio)
+
+Linux keeps the lowercase name of earlier releases, so existing caches are
+found after an upgrade; the default Windows and macOS file systems ignore
+case, so there the older 'keszaudio' spelling is the same directory.
+Only the standard library is used, so the one-file launcher can import it.
+"""
+import os
+import sys
+import hashlib
+
+def user_cache_dir(*parts):
+    """Per-user cache directory, or a path inside it"""
+    if sys.platform.startswith('win'):
+        base = os.path.join(os.environ.get('LOCALAPPDATA') or os.path.expanduser('~'), 'KeszAudio')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches/KeszAudio')
+    else:
+        base = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'keszaudio')
+    return os.path.join(base, *parts)
+
+def sha256_file(path):
+    """Hex SHA-256 of a file, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()